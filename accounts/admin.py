@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Classroom, Enrollment
+from .models import User, XPTransaction, Classroom, Enrollment
 
 
 @admin.register(User)
@@ -22,6 +22,14 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+@admin.register(XPTransaction)
+class XPTransactionAdmin(admin.ModelAdmin):
+    list_display = ['user', 'amount', 'reason', 'source', 'created_at']
+    list_filter = ['reason', 'created_at']
+    search_fields = ['user__username', 'user__pseudo', 'source']
+    readonly_fields = ['user', 'amount', 'reason', 'source', 'created_at']
+
+
 @admin.register(Classroom)
 class ClassroomAdmin(admin.ModelAdmin):
     list_display = ['name', 'school_name', 'teacher', 'join_code', 'created_at']
@@ -1,9 +1,18 @@
 """
 Management command to create sample data for testing
+
+Without options, creates one user of each role, a course, an exercise and
+the badges. With --students/--attempts, also generates a large synthetic
+dataset for load tests (see accounts.sample_data).
 """
-from django.core.management.base import BaseCommand
+import time
+from datetime import datetime, time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from accounts.models import Classroom, Enrollment
+from accounts.sample_data import Volume, generate
 from courses.models import Course, Chapter, ContentBlock
 from exercises.models import Exercise
 from gamification.models import Badge, Achievement
@@ -12,9 +21,65 @@ User = get_user_model()
 
 
 class Command(BaseCommand):
-    help = 'Create sample data for testing'
+    help = 'Create sample data for testing, optionally with high volumes for load tests'
+
+    def add_arguments(self, parser):
+        defaults = Volume()
+        parser.add_argument('--students', type=int, default=0, help='Number of synthetic students to generate')
+        parser.add_argument('--classrooms', type=int, default=defaults.classrooms, help='Number of classrooms')
+        parser.add_argument('--attempts', type=int, default=defaults.attempts, help='Number of attempts to simulate')
+        parser.add_argument('--days', type=int, default=defaults.days, help='Length of the simulated period, in days')
+        parser.add_argument(
+            '--exercises-per-chapter',
+            type=int,
+            default=defaults.exercises_per_chapter,
+            help='Exercises created in published chapters that have none'
+        )
+        parser.add_argument(
+            '--end',
+            type=datetime.fromisoformat,
+            help='Last day of the simulated period (YYYY-MM-DD), today by default'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the generator, same seed same data')
+        parser.add_argument('--prefix', default='load', help='Prefix of the generated usernames')
+        parser.add_argument('--password', default='eleve123', help='Password of the generated users')
+
+    def handle(self, *args, **options):
+        self._create_sample()
+        if options['students']:
+            self._generate(options)
+
+    def _generate(self, options):
+        volume = Volume(
+            students=options['students'],
+            classrooms=max(options['classrooms'], 1),
+            attempts=options['attempts'],
+            days=options['days'],
+            exercises_per_chapter=options['exercises_per_chapter'],
+        )
+        end = None
+        if options['end']:
+            end = timezone.make_aware(datetime.combine(options['end'].date(), dt_time(23)))
+        started = time.monotonic()
+        try:
+            counts = generate(
+                volume,
+                seed=options['seed'],
+                prefix=options['prefix'],
+                password=options['password'],
+                end=end,
+                stdout=self.stdout,
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Generated {counts['students']} students, {counts['classrooms']} classrooms, "
+            f"{counts['attempts']} attempts and {counts['hint_usages']} hint usages "
+            f"in {time.monotonic() - started:.0f}s"
+        ))
+        self.stdout.write(f"  Students: {options['prefix']}_student0..{volume.students - 1} / {options['password']}")
 
-    def handle(self, *args, **kwargs):
+    def _create_sample(self):
         self.stdout.write('Creating sample data...')
 
         # Create users
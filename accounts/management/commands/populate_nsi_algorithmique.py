@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -14,10 +15,10 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('Course not found'))
             return
         
-        course.chapters.all().delete()
+        sync = ContentSync(course)
         
         # Chapter 1: Complexité algorithmique
-        chapter1 = Chapter.objects.create(
+        chapter1 = sync.chapter(
             course=course,
             title="Complexité et efficacité des algorithmes",
             description="Mesurer et optimiser les performances",
@@ -25,7 +26,7 @@ class Command(BaseCommand):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Qu'est-ce que la complexité?",
@@ -95,7 +96,7 @@ for i in range(n):      # O(n)
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='CODE_SAMPLE',
             title="Pratique: Mesurer la complexité",
@@ -183,7 +184,7 @@ for taille in [10, 50, 100]:
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='QUIZ',
             title="Quiz: Complexité",
@@ -214,7 +215,7 @@ for taille in [10, 50, 100]:
         )
         
         # Chapter 2: Algorithmes de tri
-        chapter2 = Chapter.objects.create(
+        chapter2 = sync.chapter(
             course=course,
             title="Algorithmes de tri",
             description="Trier des données efficacement",
@@ -222,7 +223,7 @@ for taille in [10, 50, 100]:
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='TEXT',
             title="Les algorithmes de tri",
@@ -329,7 +330,7 @@ Construit la liste triée élément par élément, comme trier des cartes.
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='CODE_SAMPLE',
             title="Pratique: Implémentation des tris",
@@ -454,7 +455,7 @@ print(f"Fin:   {liste}")""",
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='EXERCISE',
             title="Exercice: Tri personnalisé",
@@ -485,7 +486,7 @@ resultat = trier_par_cle(etudiants, "note", decroissant=True)
             order=3
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='QUIZ',
             title="Quiz: Algorithmes de tri",
@@ -516,7 +517,7 @@ resultat = trier_par_cle(etudiants, "note", decroissant=True)
         )
         
         # Chapter 3: Algorithmes de recherche
-        chapter3 = Chapter.objects.create(
+        chapter3 = sync.chapter(
             course=course,
             title="Algorithmes de recherche",
             description="Trouver efficacement un élément",
@@ -524,7 +525,7 @@ resultat = trier_par_cle(etudiants, "note", decroissant=True)
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Les algorithmes de recherche",
@@ -633,7 +634,7 @@ Pour une liste de **1 million** d'éléments:
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='CODE_SAMPLE',
             title="Pratique: Recherche linéaire vs dichotomique",
@@ -750,7 +751,7 @@ for n in [10, 100, 1000, 10000, 100000, 1000000]:
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='EXERCISE',
             title="Exercice: Recherche dans un annuaire",
@@ -789,7 +790,7 @@ if contact:
             order=3
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='QUIZ',
             title="Quiz: Recherche",
@@ -819,7 +820,6 @@ if contact:
             order=4
         )
         
-        self.stdout.write(self.style.SUCCESS(
-            f'✓ Created {course.chapters.count()} chapters with '
-            f'{ContentBlock.objects.filter(chapter__course=course).count()} blocks'
-        ))
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -9,10 +10,10 @@ class Command(BaseCommand):
         self.stdout.write("Creating NSI Architecture Materielle content...")
         
         course = Course.objects.get(slug='nsi-1-architecture')
-        course.chapters.all().delete()
+        sync = ContentSync(course)
         
         # Chapter 1: Le Processeur (CPU)
-        chapter1 = Chapter.objects.create(
+        chapter1 = sync.chapter(
             course=course,
             title="Le Processeur (CPU)",
             slug="le-processeur-cpu",
@@ -20,7 +21,7 @@ class Command(BaseCommand):
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Le Processeur",
@@ -72,7 +73,7 @@ Les processeurs modernes ont plusieurs **coeurs** :
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='CODE_SAMPLE',
             title="Simulation d'un processeur",
@@ -146,7 +147,7 @@ cpu.run()
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='QUIZ',
             title="Quiz sur le processeur",
@@ -176,7 +177,7 @@ cpu.run()
         )
         
         # Chapter 2: La Memoire
-        chapter2 = Chapter.objects.create(
+        chapter2 = sync.chapter(
             course=course,
             title="La Memoire",
             slug="la-memoire",
@@ -185,7 +186,7 @@ cpu.run()
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='TEXT',
             title="Les types de memoire",
@@ -240,7 +241,7 @@ Chaque octet en memoire a une **adresse** unique :
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='CODE_SAMPLE',
             title="Exploration memoire en Python",
@@ -307,7 +308,7 @@ print(f"\\nHits: {cache.hits}, Misses: {cache.misses}")
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='QUIZ',
             title="Quiz sur la memoire",
@@ -337,7 +338,7 @@ print(f"\\nHits: {cache.hits}, Misses: {cache.misses}")
         )
         
         # Chapter 3: Architecture Von Neumann
-        chapter3 = Chapter.objects.create(
+        chapter3 = sync.chapter(
             course=course,
             title="Architecture de Von Neumann",
             slug="architecture-de-von-neumann",
@@ -345,10 +346,8 @@ print(f"\\nHits: {cache.hits}, Misses: {cache.misses}")
             order=3,
             is_published=True
         )
-            is_published=True
-        )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="L'architecture Von Neumann",
@@ -415,7 +414,7 @@ Alternative a Von Neumann :
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='CODE_SAMPLE',
             title="Simulation Von Neumann",
@@ -488,7 +487,7 @@ ordi.run()  # Output: 42
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='QUIZ',
             title="Quiz Von Neumann",
@@ -517,4 +516,6 @@ ordi.run()  # Output: 42
             order=3
         )
         
-        self.stdout.write(self.style.SUCCESS('Created 3 chapters with 9 blocks for NSI Architecture Materielle'))
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -14,10 +15,10 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('Course not found'))
             return
         
-        course.chapters.all().delete()
+        sync = ContentSync(course)
         
         # Chapter 1: Types et variables
-        chapter1 = Chapter.objects.create(
+        chapter1 = sync.chapter(
             course=course,
             title="Types de données et variables",
             description="Maîtriser les types de base en Python",
@@ -25,7 +26,7 @@ class Command(BaseCommand):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Les types de données",
@@ -73,7 +74,7 @@ Une variable est un **nom** qui référence une **valeur** en mémoire.
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='CODE_SAMPLE',
             title="Pratique: Manipulation des types",
@@ -124,7 +125,7 @@ print(f"{moyenne} converti en str: '{moyenne_str}'")""",
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='QUIZ',
             title="Quiz: Types et variables",
@@ -155,7 +156,7 @@ print(f"{moyenne} converti en str: '{moyenne_str}'")""",
         )
         
         # Chapter 2: Structures conditionnelles
-        chapter2 = Chapter.objects.create(
+        chapter2 = sync.chapter(
             course=course,
             title="Structures conditionnelles",
             description="Prendre des décisions avec if, elif, else",
@@ -163,7 +164,7 @@ print(f"{moyenne} converti en str: '{moyenne_str}'")""",
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='TEXT',
             title="Les instructions conditionnelles",
@@ -246,7 +247,7 @@ else:
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='CODE_SAMPLE',
             title="Pratique: Conditions",
@@ -317,7 +318,7 @@ else:
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='EXERCISE',
             title="Exercice: Calculateur d'IMC",
@@ -356,7 +357,7 @@ else:
             order=3
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='QUIZ',
             title="Quiz: Conditions",
@@ -387,7 +388,7 @@ else:
         )
         
         # Chapter 3: Boucles
-        chapter3 = Chapter.objects.create(
+        chapter3 = sync.chapter(
             course=course,
             title="Boucles for et while",
             description="Répéter des actions avec les boucles",
@@ -395,7 +396,7 @@ else:
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Les boucles en Python",
@@ -499,7 +500,7 @@ i=2, j=1
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='CODE_SAMPLE',
             title="Pratique: Boucles",
@@ -578,7 +579,7 @@ print()""",
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='EXERCISE',
             title="Exercice: Jeu du nombre mystère",
@@ -620,7 +621,7 @@ while not trouve:
             order=3
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='QUIZ',
             title="Quiz: Boucles",
@@ -650,7 +651,6 @@ while not trouve:
             order=4
         )
         
-        self.stdout.write(self.style.SUCCESS(
-            f'✓ Created {course.chapters.count()} chapters with '
-            f'{ContentBlock.objects.filter(chapter__course=course).count()} blocks'
-        ))
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -14,10 +15,10 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('Course not found'))
             return
         
-        course.chapters.all().delete()
+        sync = ContentSync(course)
         
         # Chapter 1: Binaire et hexadécimal
-        chapter1 = Chapter.objects.create(
+        chapter1 = sync.chapter(
             course=course,
             title="Systèmes de numération",
             description="Binaire, décimal, hexadécimal",
@@ -25,7 +26,7 @@ class Command(BaseCommand):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Les systèmes de numération",
@@ -157,7 +158,7 @@ Résultat: B7₁₆
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='CODE_SAMPLE',
             title="Pratique: Conversions",
@@ -264,7 +265,7 @@ for unite in ["octet", "Ko", "Mo", "Go", "To"]:
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='EXERCISE',
             title="Exercice: Convertisseur multi-bases",
@@ -318,7 +319,7 @@ convertir_multi_bases("0xFF")
             order=3
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='QUIZ',
             title="Quiz: Systèmes de numération",
@@ -349,7 +350,7 @@ convertir_multi_bases("0xFF")
         )
         
         # Chapter 2: Encodage des caractères
-        chapter2 = Chapter.objects.create(
+        chapter2 = sync.chapter(
             course=course,
             title="Encodage des caractères",
             description="ASCII, Unicode, UTF-8",
@@ -357,7 +358,7 @@ convertir_multi_bases("0xFF")
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='TEXT',
             title="Comment encoder du texte?",
@@ -469,7 +470,7 @@ Encodage **variable**: 1 à 4 octets selon le caractère
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='CODE_SAMPLE',
             title="Pratique: Encodage de caractères",
@@ -573,7 +574,7 @@ print(f"Nombre d'octets UTF-16: {len(texte.encode('utf-16-le'))}")""",
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='EXERCISE',
             title="Exercice: Analyseur de texte",
@@ -638,7 +639,7 @@ analyser_texte("Hello 世界 😀")
             order=3
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='QUIZ',
             title="Quiz: Encodage",
@@ -669,7 +670,7 @@ analyser_texte("Hello 世界 😀")
         )
         
         # Chapter 3: Nombres à virgule
-        chapter3 = Chapter.objects.create(
+        chapter3 = sync.chapter(
             course=course,
             title="Représentation des nombres réels",
             description="Virgule fixe et virgule flottante",
@@ -677,7 +678,7 @@ analyser_texte("Hello 世界 😀")
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Les nombres à virgule",
@@ -833,7 +834,7 @@ total = prix + prix + prix
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='CODE_SAMPLE',
             title="Pratique: Nombres flottants",
@@ -967,7 +968,7 @@ print(f"Ratio: {temps_decimal / temps_float:.1f}x plus lent")""",
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='EXERCISE',
             title="Exercice: Calculatrice de précision",
@@ -1028,7 +1029,7 @@ print(f"\n{prix_ht} € HT → {ttc:.2f} € TTC (TVA: {tva:.2f} €)")
             order=3
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='QUIZ',
             title="Quiz: Nombres flottants",
@@ -1058,7 +1059,6 @@ print(f"\n{prix_ht} € HT → {ttc:.2f} € TTC (TVA: {tva:.2f} €)")
             order=4
         )
         
-        self.stdout.write(self.style.SUCCESS(
-            f'✓ Created {course.chapters.count()} chapters with '
-            f'{ContentBlock.objects.filter(chapter__course=course).count()} blocks'
-        ))
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -9,10 +10,10 @@ class Command(BaseCommand):
         self.stdout.write("Creating NSI Reseaux content...")
         
         course = Course.objects.get(slug='nsi-1-reseaux')
-        course.chapters.all().delete()
+        sync = ContentSync(course)
         
         # Chapter 1: Le Modele OSI
-        chapter1 = Chapter.objects.create(
+        chapter1 = sync.chapter(
             course=course,
             title="Le Modele OSI",
             slug="le-modele-osi",
@@ -21,7 +22,7 @@ class Command(BaseCommand):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Le Modele OSI",
@@ -87,7 +88,7 @@ Livraison bout-en-bout :
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='CODE_SAMPLE',
             title="Simulation encapsulation",
@@ -138,7 +139,7 @@ print("\\nDonnees recues:", paquet.paquet)
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='QUIZ',
             title="Quiz modele OSI",
@@ -168,7 +169,7 @@ print("\\nDonnees recues:", paquet.paquet)
         )
         
         # Chapter 2: Protocole TCP/IP
-        chapter2 = Chapter.objects.create(
+        chapter2 = sync.chapter(
             course=course,
             title="Le Protocole TCP/IP",
             slug="le-protocole-tcp-ip",
@@ -177,7 +178,7 @@ print("\\nDonnees recues:", paquet.paquet)
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='TEXT',
             title="TCP/IP",
@@ -250,7 +251,7 @@ Client          Serveur
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='CODE_SAMPLE',
             title="Calculs reseau en Python",
@@ -303,7 +304,7 @@ print(f"Adresse reseau: {calculer_adresse_reseau(ip, masque)}")
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='QUIZ',
             title="Quiz TCP/IP",
@@ -333,7 +334,7 @@ print(f"Adresse reseau: {calculer_adresse_reseau(ip, masque)}")
         )
         
         # Chapter 3: Routage
-        chapter3 = Chapter.objects.create(
+        chapter3 = sync.chapter(
             course=course,
             title="Le Routage",
             slug="le-routage",
@@ -342,7 +343,7 @@ print(f"Adresse reseau: {calculer_adresse_reseau(ip, masque)}")
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Le Routage",
@@ -406,7 +407,7 @@ La derniere ligne (0.0.0.0/0) est la **route par defaut** (gateway).
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='CODE_SAMPLE',
             title="Simulation de routage",
@@ -467,7 +468,7 @@ r1.router("8.8.8.8")        # Route par defaut
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='QUIZ',
             title="Quiz routage",
@@ -496,4 +497,6 @@ r1.router("8.8.8.8")        # Route par defaut
             order=3
         )
         
-        self.stdout.write(self.style.SUCCESS('Created 3 chapters with 9 blocks for NSI Reseaux'))
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -9,10 +10,10 @@ class Command(BaseCommand):
         self.stdout.write("Creating NSI Traitement de Donnees content...")
         
         course = Course.objects.get(slug='nsi-1-traitement-donnees')
-        course.chapters.all().delete()
+        sync = ContentSync(course)
         
         # Chapter 1: Tables de donnees
-        chapter1 = Chapter.objects.create(
+        chapter1 = sync.chapter(
             course=course,
             title="Tables de donnees",
             slug="tables-de-donnees",
@@ -21,7 +22,7 @@ class Command(BaseCommand):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Les tables de donnees",
@@ -129,7 +130,7 @@ age_max = max(ages)
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='CODE_SAMPLE',
             title="Analyser des donnees CSV",
@@ -201,7 +202,7 @@ for emp in hauts_salaires:
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='QUIZ',
             title="Quiz : Tables de donnees",
@@ -232,7 +233,7 @@ for emp in hauts_salaires:
         )
         
         # Chapter 2: Recherche et tri dans les donnees
-        chapter2 = Chapter.objects.create(
+        chapter2 = sync.chapter(
             course=course,
             title="Recherche et tri dans les donnees",
             description="Algorithmes de recherche et de tri appliques aux tables",
@@ -241,7 +242,7 @@ for emp in hauts_salaires:
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='TEXT',
             title="Recherche dans les donnees",
@@ -341,7 +342,7 @@ for emp in employes:
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='CODE_SAMPLE',
             title="Moteur de recherche de produits",
@@ -433,7 +434,7 @@ print(f"  Stock total: {stock_total} unites")""",
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='QUIZ',
             title="Quiz : Recherche et tri",
@@ -464,7 +465,7 @@ print(f"  Stock total: {stock_total} unites")""",
         )
         
         # Chapter 3: Visualisation de donnees
-        chapter3 = Chapter.objects.create(
+        chapter3 = sync.chapter(
             course=course,
             title="Visualisation de donnees",
             description="Creer des graphiques et representations visuelles des donnees",
@@ -473,7 +474,7 @@ print(f"  Stock total: {stock_total} unites")""",
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Visualiser les donnees",
@@ -577,7 +578,7 @@ plt.show()
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='CODE_SAMPLE',
             title="Creer des visualisations ASCII",
@@ -658,7 +659,7 @@ for mois, valeur in ventes.items():
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='QUIZ',
             title="Quiz : Visualisation",
@@ -694,7 +695,6 @@ for mois, valeur in ventes.items():
             order=3
         )
         
-        blocks_count = sum(ch.content_blocks.count() for ch in [chapter1, chapter2, chapter3])
-        self.stdout.write(
-            self.style.SUCCESS(f'Created 3 chapters with {blocks_count} blocks for NSI Traitement de Donnees')
-        )
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -9,10 +10,10 @@ class Command(BaseCommand):
         self.stdout.write("Creating NSI Le Web content...")
         
         course = Course.objects.get(slug='nsi-1-web')
-        course.chapters.all().delete()
+        sync = ContentSync(course)
         
         # Chapter 1: HTML et Structure du Web
-        chapter1 = Chapter.objects.create(
+        chapter1 = sync.chapter(
             course=course,
             title="HTML et Structure du Web",
             slug="html-et-structure-du-web",
@@ -21,7 +22,7 @@ class Command(BaseCommand):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Le langage HTML",
@@ -91,7 +92,7 @@ Les balises peuvent avoir des attributs :
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='CODE_SAMPLE',
             title="Creer une page HTML complete",
@@ -152,7 +153,7 @@ Les balises peuvent avoir des attributs :
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='QUIZ',
             title="Quiz : HTML et structure",
@@ -183,7 +184,7 @@ Les balises peuvent avoir des attributs :
         )
         
         # Chapter 2: CSS et Mise en Forme
-        chapter2 = Chapter.objects.create(
+        chapter2 = sync.chapter(
             course=course,
             title="CSS et Mise en Forme",
             description="Apprendre a styliser les pages web avec CSS",
@@ -192,7 +193,7 @@ Les balises peuvent avoir des attributs :
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='TEXT',
             title="Les bases du CSS",
@@ -291,7 +292,7 @@ Flexbox est un systeme de disposition moderne :
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='CODE_SAMPLE',
             title="Creer une mise en page avec CSS",
@@ -387,7 +388,7 @@ article:hover {
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='QUIZ',
             title="Quiz : CSS",
@@ -418,7 +419,7 @@ article:hover {
         )
         
         # Chapter 3: Protocoles Web et Securite
-        chapter3 = Chapter.objects.create(
+        chapter3 = sync.chapter(
             course=course,
             title="Protocoles Web et Securite",
             description="Comprendre HTTP, HTTPS et les enjeux de securite sur le web",
@@ -427,7 +428,7 @@ article:hover {
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Le protocole HTTP",
@@ -512,7 +513,7 @@ Attributs importants :
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='CODE_SAMPLE',
             title="Simulateur de requetes HTTP",
@@ -609,7 +610,7 @@ for code in codes:
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='QUIZ',
             title="Quiz : Protocoles et securite",
@@ -645,7 +646,6 @@ for code in codes:
             order=3
         )
         
-        blocks_count = sum(ch.content_blocks.count() for ch in [chapter1, chapter2, chapter3])
-        self.stdout.write(
-            self.style.SUCCESS(f'Created 3 chapters with {blocks_count} blocks for NSI Le Web')
-        )
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
@@ -2,7 +2,8 @@
 Management command to populate SNT Python course with interactive content
 """
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -18,25 +19,24 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('❌ Cours SNT Python non trouvé'))
             return
 
+        sync = ContentSync(course)
+
         # Chapter 1: Variables et Types
-        chapter1, created = Chapter.objects.get_or_create(
+        chapter1 = sync.chapter(
             course=course,
             slug='variables-et-types',
-            defaults={
-                'title': 'Variables et Types de Données',
-                'description': 'Découvrez les variables, les types de données et les opérations de base en Python',
-                'order': 1,
-                'is_published': True,
-            }
+            title='Variables et Types de Données',
+            description='Découvrez les variables, les types de données et les opérations de base en Python',
+            order=1,
+            is_published=True
         )
 
-        if created:
-            # Block 1: Introduction
-            ContentBlock.objects.create(
-                chapter=chapter1,
-                type='TEXT',
-                title='Qu\'est-ce qu\'une variable?',
-                content_markdown='''
+        # Block 1: Introduction
+        sync.block(
+            chapter=chapter1,
+            type='TEXT',
+            title='Qu\'est-ce qu\'une variable?',
+            content_markdown='''
 <p>Une <strong>variable</strong> est comme une boîte qui contient une valeur. En Python, on crée une variable en lui donnant un nom et une valeur.</p>
 
 <p>Par exemple:</p>
@@ -52,15 +52,15 @@ class Command(BaseCommand):
     <li>Évitez les accents</li>
 </ul>
 ''',
-                order=1
-            )
-
-            # Block 2: Interactive Code - Variables
-            ContentBlock.objects.create(
-                chapter=chapter1,
-                type='CODE_SAMPLE',
-                title='💻 Essayez vous-même!',
-                content_markdown='''# Créer des variables
+            order=1
+        )
+
+        # Block 2: Interactive Code - Variables
+        sync.block(
+            chapter=chapter1,
+            type='CODE_SAMPLE',
+            title='💻 Essayez vous-même!',
+            content_markdown='''# Créer des variables
 prenom = "Alice"
 age = 15
 taille = 1.65
@@ -73,15 +73,15 @@ print("Taille:", taille, "m")
 # Calculer avec des variables
 annee_naissance = 2025 - age
 print("Année de naissance:", annee_naissance)''',
-                order=2
-            )
-
-            # Block 3: Types de données
-            ContentBlock.objects.create(
-                chapter=chapter1,
-                type='TEXT',
-                title='Les types de données',
-                content_markdown='''
+            order=2
+        )
+
+        # Block 3: Types de données
+        sync.block(
+            chapter=chapter1,
+            type='TEXT',
+            title='Les types de données',
+            content_markdown='''
 <p>Python comprend plusieurs <strong>types de données</strong>:</p>
 
 <table class="min-w-full border border-gray-300">
@@ -118,15 +118,15 @@ print("Année de naissance:", annee_naissance)''',
 
 <p class="mt-4">Utilisez la fonction <code>type()</code> pour connaître le type d'une variable!</p>
 ''',
-                order=3
-            )
-
-            # Block 4: Interactive Code - Types
-            ContentBlock.objects.create(
-                chapter=chapter1,
-                type='CODE_SAMPLE',
-                title='💻 Découvrez les types',
-                content_markdown='''# Créer différents types de variables
+            order=3
+        )
+
+        # Block 4: Interactive Code - Types
+        sync.block(
+            chapter=chapter1,
+            type='CODE_SAMPLE',
+            title='💻 Découvrez les types',
+            content_markdown='''# Créer différents types de variables
 nombre_entier = 42
 nombre_decimal = 3.14
 texte = "Python"
@@ -143,15 +143,15 @@ age_texte = "15"
 age_nombre = int(age_texte)  # Convertir en nombre
 print("Age converti:", age_nombre)
 print("Type:", type(age_nombre))''',
-                order=4
-            )
-
-            # Block 5: Exercise
-            ContentBlock.objects.create(
-                chapter=chapter1,
-                type='EXERCISE',
-                title='✏️ Exercice: Créez votre carte d\'identité',
-                content_markdown='''
+            order=4
+        )
+
+        # Block 5: Exercise
+        sync.block(
+            chapter=chapter1,
+            type='EXERCISE',
+            title='✏️ Exercice: Créez votre carte d\'identité',
+            content_markdown='''
 <p>Créez un programme qui affiche votre carte d'identité virtuelle avec:</p>
 <ul>
     <li>Votre prénom et nom</li>
@@ -172,30 +172,25 @@ Classe: Seconde 3
 
 <p><em>Astuce: Utilisez <code>print()</code> et créez une variable pour chaque information!</em></p>
 ''',
-                order=5
-            )
-
-            self.stdout.write(self.style.SUCCESS(f'  ✓ Chapitre "{chapter1.title}" créé avec {chapter1.content_blocks.count()} blocs'))
+            order=5
+        )
 
         # Chapter 2: Conditions
-        chapter2, created = Chapter.objects.get_or_create(
+        chapter2 = sync.chapter(
             course=course,
             slug='conditions-if-else',
-            defaults={
-                'title': 'Les Conditions (if, else)',
-                'description': 'Apprenez à prendre des décisions dans vos programmes',
-                'order': 2,
-                'is_published': True,
-            }
+            title='Les Conditions (if, else)',
+            description='Apprenez à prendre des décisions dans vos programmes',
+            order=2,
+            is_published=True
         )
 
-        if created:
-            # Block 1: Introduction aux conditions
-            ContentBlock.objects.create(
-                chapter=chapter2,
-                type='TEXT',
-                title='Prendre des décisions',
-                content_markdown='''
+        # Block 1: Introduction aux conditions
+        sync.block(
+            chapter=chapter2,
+            type='TEXT',
+            title='Prendre des décisions',
+            content_markdown='''
 <p>Les <strong>conditions</strong> permettent à votre programme de prendre des décisions. C'est comme dans la vraie vie:</p>
 
 <ul>
@@ -212,15 +207,15 @@ else:
 
 <p><em>Important: remarquez l'indentation (les espaces) avant les lignes après <code>if</code> et <code>else</code>!</em></p>
 ''',
-                order=1
-            )
-
-            # Block 2: Interactive Code - Conditions simples
-            ContentBlock.objects.create(
-                chapter=chapter2,
-                type='CODE_SAMPLE',
-                title='💻 Testez les conditions',
-                content_markdown='''# Exemple 1: Test d'âge
+            order=1
+        )
+
+        # Block 2: Interactive Code - Conditions simples
+        sync.block(
+            chapter=chapter2,
+            type='CODE_SAMPLE',
+            title='💻 Testez les conditions',
+            content_markdown='''# Exemple 1: Test d'âge
 age = 16
 
 if age >= 18:
@@ -244,15 +239,15 @@ if a > b:
     print(a, "est plus grand que", b)
 else:
     print(a, "est plus petit que", b)''',
-                order=2
-            )
-
-            # Block 3: Les opérateurs de comparaison
-            ContentBlock.objects.create(
-                chapter=chapter2,
-                type='QUIZ',
-                title='Les opérateurs de comparaison',
-                content_markdown='''
+            order=2
+        )
+
+        # Block 3: Les opérateurs de comparaison
+        sync.block(
+            chapter=chapter2,
+            type='QUIZ',
+            title='Les opérateurs de comparaison',
+            content_markdown='''
 <table class="min-w-full border border-gray-300">
     <thead class="bg-yellow-100">
         <tr>
@@ -295,9 +290,9 @@ else:
     </tbody>
 </table>
 ''',
-                order=3
-            )
-
-            self.stdout.write(self.style.SUCCESS(f'  ✓ Chapitre "{chapter2.title}" créé avec {chapter2.content_blocks.count()} blocs'))
+            order=3
+        )
 
-        self.stdout.write(self.style.SUCCESS('\n✅ Contenu interactif créé avec succès!'))
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -16,10 +17,10 @@ class Command(BaseCommand):
             return
         
         # Clear existing chapters
-        course.chapters.all().delete()
+        sync = ContentSync(course)
         
         # Chapter 1: Introduction aux données
-        chapter1 = Chapter.objects.create(
+        chapter1 = sync.chapter(
             course=course,
             title="Qu'est-ce qu'une donnée?",
             description="Comprendre ce qu'est une donnée et son importance",
@@ -27,7 +28,7 @@ class Command(BaseCommand):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Définition et types de données",
@@ -62,7 +63,7 @@ Les données sont appelées **"le pétrole du 21ème siècle"** car elles ont un
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='CODE_SAMPLE',
             title="Exemple Python: Manipuler des données",
@@ -92,7 +93,7 @@ else:
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='QUIZ',
             title="Quiz: Les données",
@@ -117,7 +118,7 @@ else:
         )
         
         # Chapter 2: Tables et CSV
-        chapter2 = Chapter.objects.create(
+        chapter2 = sync.chapter(
             course=course,
             title="Tables et fichiers CSV",
             description="Apprendre à organiser des données dans des tables",
@@ -125,7 +126,7 @@ else:
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='TEXT',
             title="Les tables de données",
@@ -162,7 +163,7 @@ Caractéristiques:
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='CODE_SAMPLE',
             title="Exemple Python: Lire un fichier CSV",
@@ -194,7 +195,7 @@ print(f"Plus basse moyenne: {min(moyennes)}")""",
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='EXERCISE',
             title="Exercice: Analyser des données CSV",
@@ -227,7 +228,7 @@ JavaScript,Douglas,34.99,120\"\"\"
         )
         
         # Chapter 3: JSON et données structurées
-        chapter3 = Chapter.objects.create(
+        chapter3 = sync.chapter(
             course=course,
             title="Le format JSON",
             description="Découvrir JSON, le format de données du Web",
@@ -235,7 +236,7 @@ JavaScript,Douglas,34.99,120\"\"\"
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Qu'est-ce que JSON?",
@@ -276,7 +277,7 @@ JavaScript,Douglas,34.99,120\"\"\"
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='CODE_SAMPLE',
             title="Exemple Python: Manipuler du JSON",
@@ -323,7 +324,7 @@ for eleve in data['eleves']:
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='EXERCISE',
             title="Exercice: Créer une API météo",
@@ -354,4 +355,6 @@ Ensuite, écris un programme Python qui:
             order=3
         )
         
-        self.stdout.write(self.style.SUCCESS(f'✓ Created {course.chapters.count()} chapters with {ContentBlock.objects.filter(chapter__course=course).count()} content blocks'))
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -16,10 +17,10 @@ class Command(BaseCommand):
             return
         
         # Clear existing chapters
-        course.chapters.all().delete()
+        sync = ContentSync(course)
         
         # Chapter 1: Qu'est-ce qu'Internet?
-        chapter1 = Chapter.objects.create(
+        chapter1 = sync.chapter(
             course=course,
             title="Qu'est-ce qu'Internet?",
             description="Découvrir les fondamentaux d'Internet et son histoire",
@@ -27,7 +28,7 @@ class Command(BaseCommand):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Introduction à Internet",
@@ -45,7 +46,7 @@ Internet est né dans les années **1960** aux États-Unis avec le projet **ARPA
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Comment fonctionne Internet?",
@@ -64,7 +65,7 @@ Système qui traduit les noms de domaine (comme `google.com`) en adresses IP (co
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='QUIZ',
             title="Quiz: Les bases d'Internet",
@@ -89,7 +90,7 @@ Système qui traduit les noms de domaine (comme `google.com`) en adresses IP (co
         )
         
         # Chapter 2: Les adresses IP
-        chapter2 = Chapter.objects.create(
+        chapter2 = sync.chapter(
             course=course,
             title="Les adresses IP et le routage",
             description="Comprendre le système d'adressage sur Internet",
@@ -97,7 +98,7 @@ Système qui traduit les noms de domaine (comme `google.com`) en adresses IP (co
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='TEXT',
             title="Qu'est-ce qu'une adresse IP?",
@@ -119,7 +120,7 @@ Système qui traduit les noms de domaine (comme `google.com`) en adresses IP (co
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='CODE_SAMPLE',
             title="Exemple Python: Extraire les octets d'une adresse IPv4",
@@ -141,7 +142,7 @@ print(f"\\nAdresse valide: {valid}")""",
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='EXERCISE',
             title="Exercice: Valider une adresse IPv4",
@@ -163,7 +164,7 @@ is_valid_ipv4("192.168.1")    # False (seulement 3 octets)
         )
         
         # Chapter 3: Le Web et les navigateurs
-        chapter3 = Chapter.objects.create(
+        chapter3 = sync.chapter(
             course=course,
             title="Le Web et les navigateurs",
             description="Comprendre la différence entre Internet et le Web",
@@ -171,7 +172,7 @@ is_valid_ipv4("192.168.1")    # False (seulement 3 octets)
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Internet vs Web",
@@ -192,7 +193,7 @@ is_valid_ipv4("192.168.1")    # False (seulement 3 octets)
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Comment fonctionne un navigateur?",
@@ -217,7 +218,7 @@ is_valid_ipv4("192.168.1")    # False (seulement 3 octets)
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='QUIZ',
             title="Quiz: Internet et le Web",
@@ -241,4 +242,6 @@ is_valid_ipv4("192.168.1")    # False (seulement 3 octets)
             order=3
         )
         
-        self.stdout.write(self.style.SUCCESS(f'✓ Created {course.chapters.count()} chapters with {ContentBlock.objects.filter(chapter__course=course).count()} content blocks'))
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -14,10 +15,10 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('Course SNT Localisation not found'))
             return
         
-        course.chapters.all().delete()
+        sync = ContentSync(course)
         
         # Chapter 1: Le système GPS
-        chapter1 = Chapter.objects.create(
+        chapter1 = sync.chapter(
             course=course,
             title="Le système GPS et la géolocalisation",
             description="Comprendre le fonctionnement du GPS",
@@ -25,7 +26,7 @@ class Command(BaseCommand):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Comment fonctionne le GPS?",
@@ -75,7 +76,7 @@ Exemples:
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='CODE_SAMPLE',
             title="Exemple Python: Calculer une distance GPS",
@@ -144,7 +145,7 @@ for mode, vitesse in vitesses.items():
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='EXERCISE',
             title="Exercice: Calculateur d'itinéraire",
@@ -185,7 +186,7 @@ EN TRAIN (200 km/h): 3.4 heures
         )
         
         # Chapter 2: La cartographie numérique
-        chapter2 = Chapter.objects.create(
+        chapter2 = sync.chapter(
             course=course,
             title="Cartographie et services de géolocalisation",
             description="Comment fonctionnent Google Maps et OpenStreetMap",
@@ -193,7 +194,7 @@ EN TRAIN (200 km/h): 3.4 heures
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='TEXT',
             title="Les services de cartographie",
@@ -256,7 +257,7 @@ Les cartes en ligne utilisent des **tuiles** (tiles):
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='QUIZ',
             title="Quiz: Cartographie numérique",
@@ -287,7 +288,7 @@ Les cartes en ligne utilisent des **tuiles** (tiles):
         )
         
         # Chapter 3: Vie privée et géolocalisation
-        chapter3 = Chapter.objects.create(
+        chapter3 = sync.chapter(
             course=course,
             title="Géolocalisation et vie privée",
             description="Enjeux de confidentialité et protection des données",
@@ -295,7 +296,7 @@ Les cartes en ligne utilisent des **tuiles** (tiles):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Les dangers de la géolocalisation",
@@ -359,7 +360,7 @@ Les cartes en ligne utilisent des **tuiles** (tiles):
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='CODE_SAMPLE',
             title="Exemple: Analyser les métadonnées d'une photo",
@@ -438,7 +439,7 @@ print(f"Après: {len(photo1_propre)} métadonnées")""",
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='EXERCISE',
             title="Projet: Audit de confidentialité",
@@ -485,4 +486,6 @@ Application: WhatsApp
             order=3
         )
         
-        self.stdout.write(self.style.SUCCESS(f'✓ Created {course.chapters.count()} chapters with {ContentBlock.objects.filter(chapter__course=course).count()} content blocks'))
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
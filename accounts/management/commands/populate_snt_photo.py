@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -14,10 +15,10 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('Course SNT Photo Numérique not found'))
             return
         
-        course.chapters.all().delete()
+        sync = ContentSync(course)
         
         # Chapter 1: Photographie argentique vs numérique
-        chapter1 = Chapter.objects.create(
+        chapter1 = sync.chapter(
             course=course,
             title="De l'argentique au numérique",
             description="Comprendre la révolution de la photographie numérique",
@@ -25,7 +26,7 @@ class Command(BaseCommand):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Histoire de la photographie",
@@ -75,7 +76,7 @@ class Command(BaseCommand):
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='QUIZ',
             title="Quiz: Histoire de la photo",
@@ -100,7 +101,7 @@ class Command(BaseCommand):
         )
         
         # Chapter 2: Les pixels et la résolution
-        chapter2 = Chapter.objects.create(
+        chapter2 = sync.chapter(
             course=course,
             title="Pixels et résolution d'image",
             description="Comprendre comment sont codées les images numériques",
@@ -108,7 +109,7 @@ class Command(BaseCommand):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='TEXT',
             title="Qu'est-ce qu'un pixel?",
@@ -151,7 +152,7 @@ Un **pixel** (Picture Element) est le plus petit point qui compose une image num
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='CODE_SAMPLE',
             title="Exemple Python: Créer un dégradé de couleur",
@@ -194,7 +195,7 @@ print(f"  ~{taille_mo/12:.1f} Mo en JPEG")""",
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='EXERCISE',
             title="Exercice: Calculateur de taille d'image",
@@ -227,7 +228,7 @@ Sur une carte SD 32 Go:
         )
         
         # Chapter 3: Formats d'image
-        chapter3 = Chapter.objects.create(
+        chapter3 = sync.chapter(
             course=course,
             title="Formats et compression d'images",
             description="Comprendre JPEG, PNG, RAW et la compression",
@@ -235,7 +236,7 @@ Sur une carte SD 32 Go:
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Les formats d'image",
@@ -289,7 +290,7 @@ Sur une carte SD 32 Go:
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='CODE_SAMPLE',
             title="Exemple: Simuler la compression",
@@ -342,7 +343,7 @@ for nom, ratio in formats.items():
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='QUIZ',
             title="Quiz: Formats et compression",
@@ -372,4 +373,6 @@ for nom, ratio in formats.items():
             order=3
         )
         
-        self.stdout.write(self.style.SUCCESS(f'✓ Created {course.chapters.count()} chapters with {ContentBlock.objects.filter(chapter__course=course).count()} content blocks'))
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -16,10 +17,10 @@ class Command(BaseCommand):
             return
         
         # Clear existing chapters
-        course.chapters.all().delete()
+        sync = ContentSync(course)
         
         # Chapter 1: Introduction aux réseaux sociaux
-        chapter1 = Chapter.objects.create(
+        chapter1 = sync.chapter(
             course=course,
             title="Qu'est-ce qu'un réseau social?",
             description="Découvrir les réseaux sociaux et leur impact",
@@ -27,7 +28,7 @@ class Command(BaseCommand):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Définition et histoire",
@@ -62,7 +63,7 @@ class Command(BaseCommand):
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Fonctionnement d'un réseau social",
@@ -95,7 +96,7 @@ Les réseaux sociaux utilisent des algorithmes d'**Intelligence Artificielle** p
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='QUIZ',
             title="Quiz: Les réseaux sociaux",
@@ -120,7 +121,7 @@ Les réseaux sociaux utilisent des algorithmes d'**Intelligence Artificielle** p
         )
         
         # Chapter 2: Données personnelles et vie privée
-        chapter2 = Chapter.objects.create(
+        chapter2 = sync.chapter(
             course=course,
             title="Vie privée et données personnelles",
             description="Protéger ses données sur les réseaux sociaux",
@@ -128,7 +129,7 @@ Les réseaux sociaux utilisent des algorithmes d'**Intelligence Artificielle** p
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='TEXT',
             title="Vos données ont de la valeur",
@@ -172,7 +173,7 @@ En Europe, le RGPD protège vos droits:
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='CODE_SAMPLE',
             title="Exemple Python: Analyser les métadonnées d'une photo",
@@ -213,7 +214,7 @@ print("💡 Conseil: Désactivez la géolocalisation sur vos photos!")""",
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='EXERCISE',
             title="Exercice: Audit de vie privée",
@@ -262,7 +263,7 @@ Recommandations:
         )
         
         # Chapter 3: Cyberharcèlement et fake news
-        chapter3 = Chapter.objects.create(
+        chapter3 = sync.chapter(
             course=course,
             title="Cyberharcèlement et désinformation",
             description="Se protéger et identifier les risques en ligne",
@@ -270,7 +271,7 @@ Recommandations:
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Le cyberharcèlement",
@@ -321,7 +322,7 @@ Pour la victime:
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Les fake news (infox)",
@@ -377,7 +378,7 @@ Avant de partager:
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='QUIZ',
             title="Quiz: Cybersécurité et désinformation",
@@ -407,4 +408,6 @@ Avant de partager:
             order=3
         )
         
-        self.stdout.write(self.style.SUCCESS(f'✓ Created {course.chapters.count()} chapters with {ContentBlock.objects.filter(chapter__course=course).count()} content blocks'))
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
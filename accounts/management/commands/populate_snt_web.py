@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from courses.models import Course, Chapter, ContentBlock
+from courses.models import Course
+from courses.sync import ContentSync
 
 
 class Command(BaseCommand):
@@ -16,10 +17,10 @@ class Command(BaseCommand):
             return
         
         # Clear existing chapters
-        course.chapters.all().delete()
+        sync = ContentSync(course)
         
         # Chapter 1: HTML - Structure du Web
-        chapter1 = Chapter.objects.create(
+        chapter1 = sync.chapter(
             course=course,
             title="HTML - La structure des pages web",
             description="Apprendre à créer la structure d'une page web avec HTML",
@@ -27,7 +28,7 @@ class Command(BaseCommand):
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='TEXT',
             title="Qu'est-ce que le HTML?",
@@ -52,7 +53,7 @@ Le HTML utilise des **balises** (tags) pour définir les différents éléments
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='CODE_SAMPLE',
             title="Exemple: Structure HTML de base",
@@ -79,7 +80,7 @@ Le HTML utilise des **balises** (tags) pour définir les différents éléments
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter1,
             type='EXERCISE',
             title="Exercice: Créer une page HTML",
@@ -106,7 +107,7 @@ Le HTML utilise des **balises** (tags) pour définir les différents éléments
         )
         
         # Chapter 2: CSS - Le style du Web
-        chapter2 = Chapter.objects.create(
+        chapter2 = sync.chapter(
             course=course,
             title="CSS - Styliser les pages web",
             description="Apprendre à donner du style aux pages avec CSS",
@@ -114,7 +115,7 @@ Le HTML utilise des **balises** (tags) pour définir les différents éléments
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='TEXT',
             title="Qu'est-ce que le CSS?",
@@ -149,7 +150,7 @@ p {
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='CODE_SAMPLE',
             title="Exemple: HTML avec CSS",
@@ -194,7 +195,7 @@ p {
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter2,
             type='QUIZ',
             title="Quiz: HTML et CSS",
@@ -219,7 +220,7 @@ p {
         )
         
         # Chapter 3: JavaScript - Interactivité
-        chapter3 = Chapter.objects.create(
+        chapter3 = sync.chapter(
             course=course,
             title="JavaScript - Rendre les pages interactives",
             description="Introduction à JavaScript pour l'interactivité web",
@@ -227,7 +228,7 @@ p {
             is_published=True
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='TEXT',
             title="Qu'est-ce que JavaScript?",
@@ -249,7 +250,7 @@ p {
             order=1
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='CODE_SAMPLE',
             title="Exemple: Bouton interactif avec JavaScript",
@@ -292,7 +293,7 @@ p {
             order=2
         )
         
-        ContentBlock.objects.create(
+        sync.block(
             chapter=chapter3,
             type='EXERCISE',
             title="Exercice: Créer un changeur de couleur",
@@ -318,4 +319,6 @@ function changerCouleur() {
             order=3
         )
         
-        self.stdout.write(self.style.SUCCESS(f'✓ Created {course.chapters.count()} chapters with {ContentBlock.objects.filter(chapter__course=course).count()} content blocks'))
+        report = sync.commit()
+        self.stdout.write(self.style.SUCCESS(f'✓ {course.title} synchronisé'))
+        self.stdout.write(str(report))
@@ -0,0 +1,55 @@
+"""
+Management command to rebuild user XP and levels from the XP ledger
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from accounts.models import User, XPTransaction
+
+
+class Command(BaseCommand):
+    help = 'Rebuild xp/level for all users by replaying the XP ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of users rebuilt per transaction'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        users = User.objects.only('id', 'xp', 'level').order_by('pk')
+
+        updated = 0
+        last_pk = 0
+        while True:
+            chunk = list(users.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+
+            totals = {user.pk: [0, 1] for user in chunk}
+            ledger = XPTransaction.objects.filter(
+                user_id__in=totals
+            ).order_by('user_id', 'created_at', 'pk').values_list('user_id', 'amount')
+
+            # Replay with the same rules as User.add_xp: XP never drops
+            # below 0 and the level never goes down
+            for user_id, amount in ledger.iterator(chunk_size=5000):
+                xp, level = totals[user_id]
+                xp = max(0, xp + amount)
+                totals[user_id] = [xp, max(level, xp // 100 + 1)]
+
+            changed = []
+            for user in chunk:
+                xp, level = totals[user.pk]
+                if (user.xp, user.level) != (xp, level):
+                    user.xp, user.level = xp, level
+                    changed.append(user)
+
+            with transaction.atomic():
+                User.objects.bulk_update(changed, ['xp', 'level'])
+            updated += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt XP for {updated} users'))
@@ -0,0 +1,45 @@
+# Generated by Django 5.0 on 2026-10-17 22:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def record_opening_balances(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    XPTransaction = apps.get_model('accounts', 'XPTransaction')
+    XPTransaction.objects.bulk_create(
+        [
+            XPTransaction(user_id=user_id, amount=xp, reason='OPENING', source='migration')
+            for user_id, xp in User.objects.exclude(xp=0).values_list('id', 'xp')
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='XPTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField(verbose_name='Montant')),
+                ('reason', models.CharField(choices=[('EXERCISE', 'Exercice réussi'), ('ACHIEVEMENT', 'Accomplissement'), ('HINT', 'Indice utilisé'), ('OPENING', 'Solde initial'), ('ADJUSTMENT', 'Ajustement')], max_length=20, verbose_name='Motif')),
+                ('source', models.CharField(blank=True, help_text="Objet à l'origine du mouvement, par exemple exercise:12", max_length=100, verbose_name='Source')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='xp_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': "Mouvement d'XP",
+                'verbose_name_plural': "Mouvements d'XP",
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'created_at'], name='accounts_xp_user_id_19b3e6_idx')],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
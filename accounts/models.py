@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
 from django.utils.crypto import get_random_string
 import string
 
@@ -30,13 +32,24 @@ class User(AbstractUser):
             return self.pseudo
         return self.username
     
-    def add_xp(self, points):
-        """Add XP and check for level up"""
-        self.xp += points
-        new_level = (self.xp // 100) + 1
-        if new_level > self.level:
-            self.level = new_level
-        self.save()
+    def add_xp(self, points, reason=None, source=''):
+        """Add XP and check for level up
+
+        The change is recorded in the XP ledger and applied with a single
+        UPDATE so concurrent requests for the same user never lose points.
+        Negative amounts are allowed (hints) and XP never drops below 0.
+        """
+        if reason is None:
+            reason = XPTransaction.Reason.ADJUSTMENT
+
+        new_xp = Greatest(F('xp') + points, Value(0))
+        with transaction.atomic():
+            XPTransaction.objects.create(user=self, amount=points, reason=reason, source=source)
+            User.objects.filter(pk=self.pk).update(
+                xp=new_xp,
+                level=Greatest(F('level'), new_xp / 100 + 1)
+            )
+        self.refresh_from_db(fields=['xp', 'level'])
     
     @property
     def is_student(self):
@@ -51,6 +64,47 @@ class User(AbstractUser):
         return self.role == self.Role.ADMIN
 
 
+class XPTransaction(models.Model):
+    """Append-only ledger of every XP change"""
+    
+    class Reason(models.TextChoices):
+        EXERCISE = 'EXERCISE', 'Exercice réussi'
+        ACHIEVEMENT = 'ACHIEVEMENT', 'Accomplissement'
+        HINT = 'HINT', 'Indice utilisé'
+        OPENING = 'OPENING', 'Solde initial'
+        ADJUSTMENT = 'ADJUSTMENT', 'Ajustement'
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='xp_transactions'
+    )
+    amount = models.IntegerField(verbose_name='Montant')
+    reason = models.CharField(
+        max_length=20,
+        choices=Reason.choices,
+        verbose_name='Motif'
+    )
+    source = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Source',
+        help_text='Objet à l\'origine du mouvement, par exemple exercise:12'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Mouvement d\'XP'
+        verbose_name_plural = 'Mouvements d\'XP'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user} {self.amount:+d} XP ({self.get_reason_display()})"
+
+
 def generate_join_code():
     """Generate a unique 6-character classroom join code"""
     return get_random_string(6, allowed_chars=string.ascii_uppercase + string.digits)
@@ -87,6 +141,10 @@ class Classroom(models.Model):
     def get_students(self):
         """Get all students enrolled in this classroom"""
         return User.objects.filter(enrollments__classroom=self)
+    
+    @property
+    def students(self):
+        return self.get_students()
 
 
 class Enrollment(models.Model):
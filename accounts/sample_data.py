@@ -0,0 +1,347 @@
+"""
+High-volume synthetic data for load tests.
+
+generate() creates teachers, classrooms and enrolled students, then
+simulates each student working through the published exercises over a
+school year: sessions on weekdays (less often at the weekend) during the
+day, retries until the exercise is passed or given up, hints taken after
+a few failures. Stronger students pass in fewer tries, and the number of
+attempts per student is heavy-tailed like on the real site.
+
+Every row is derived from the seed and the end of the simulated period
+(the current hour by default), so two runs with the same seed and end on
+the same content produce the same data. Attempts, hint usages and the XP ledger
+carry their simulated timestamps, so they are not written with
+bulk_create (auto_now_add would overwrite them) but with write_rows():
+COPY on PostgreSQL, batched executemany elsewhere. Progress, counters,
+XP, badges and the leaderboard are then derived with the same code as in
+production.
+"""
+import csv
+import io
+import json
+import random
+import string
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import accumulate
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from accounts.models import User, Classroom, Enrollment, XPTransaction
+from courses.models import Chapter
+from exercises.models import Exercise, Attempt, Hint, HintUsage
+from gamification.leaderboard import rebuild_leaderboard
+from gamification.models import DailyXP
+
+
+@dataclass
+class Volume:
+    students: int = 1000
+    classrooms: int = 40
+    attempts: int = 100_000
+    days: int = 270
+    exercises_per_chapter: int = 3
+    hints_per_exercise: int = 2
+
+
+# Relative activity by hour of the day (8h-22h) and by weekday (Monday first)
+HOUR_WEIGHTS = {8: 3, 9: 6, 10: 8, 11: 8, 12: 3, 13: 4, 14: 8, 15: 8, 16: 7, 17: 5, 18: 4, 19: 3, 20: 4, 21: 3, 22: 1}
+WEEKDAY_WEIGHTS = (10, 10, 8, 10, 9, 3, 2)
+
+# Pools drawn from with _pick() in the per-attempt loop, faster than choices()
+PARTIAL_SCORES = [score for score, weight in zip(range(0, 100, 10), (8, 4, 5, 6, 7, 8, 7, 6, 5, 3)) for _ in range(weight)]
+ATTEMPT_DATA = [json.dumps({'type': 'PYTHON', 'duration': seconds}) for seconds in range(5, 605, 5)]
+GAPS = [timedelta(seconds=seconds) for seconds in range(20, 401)]
+
+
+def _pick(rng, pool):
+    return pool[int(rng.random() * len(pool))]
+
+
+def write_rows(model, fields, rows, batch_size=50_000):
+    """Insert raw rows (tuples of field values, in `fields` order)
+
+    Uses COPY on PostgreSQL and executemany on the other backends. JSON
+    values must already be serialized. Returns the number of rows.
+    """
+    opts = model._meta
+    columns = [opts.get_field(name).column for name in fields]
+    table = connection.ops.quote_name(opts.db_table)
+    quoted = ', '.join(connection.ops.quote_name(column) for column in columns)
+    datetimes = [
+        i for i, name in enumerate(fields)
+        if isinstance(opts.get_field(name), models.DateTimeField)
+    ]
+
+    if connection.vendor == 'postgresql':
+        sql = f'COPY {table} ({quoted}) FROM STDIN WITH (FORMAT csv)'
+        flush = lambda cursor, batch: _copy(cursor, sql, batch)
+    else:
+        sql = f'INSERT INTO {table} ({quoted}) VALUES ({", ".join(["%s"] * len(fields))})'
+        adapt = connection.ops.adapt_datetimefield_value
+
+        def flush(cursor, batch):
+            if datetimes:
+                batch = [list(row) for row in batch]
+                for row in batch:
+                    for i in datetimes:
+                        row[i] = adapt(row[i])
+            cursor.executemany(sql, batch)
+
+    written = 0
+    batch = []
+    with connection.cursor() as cursor:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush(cursor, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            flush(cursor, batch)
+            written += len(batch)
+    return written
+
+
+def _copy(cursor, sql, rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    raw = cursor.cursor
+    if hasattr(raw, 'copy_expert'):
+        raw.copy_expert(sql, buffer)
+    else:
+        # psycopg 3
+        with raw.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def ensure_exercises(per_chapter, hints_per_exercise, rng):
+    """Give every published chapter without exercises a few, with hints"""
+    created = []
+    for chapter in Chapter.objects.filter(is_published=True, course__is_published=True).order_by('pk'):
+        if chapter.exercises.exists():
+            continue
+        created += [
+            Exercise(
+                chapter=chapter,
+                title=f'{chapter.title} - exercice {n}',
+                type=Exercise.ExerciseType.PYTHON,
+                statement_markdown='Écrire une fonction qui renvoie la somme des éléments d\'une liste.',
+                starter_code='def somme(t):\n    # À compléter\n    pass\n',
+                xp_reward=rng.choice((10, 10, 20, 30)),
+                order=n,
+                is_published=True,
+            )
+            for n in range(1, per_chapter + 1)
+        ]
+    Exercise.objects.bulk_create(created)
+    Hint.objects.bulk_create([
+        Hint(exercise=exercise, content=f'Indice {n}', order=n, xp_cost=5 * n)
+        for exercise in Exercise.objects.filter(is_published=True, hints__isnull=True).order_by('pk')
+        for n in range(1, hints_per_exercise + 1)
+    ])
+    return len(created)
+
+
+class _Student:
+    """Simulates the attempts of one student"""
+
+    def __init__(self, rng, user_id, exercises, hints):
+        self.rng = rng
+        self.user_id = user_id
+        self.exercises = exercises
+        self.hints = hints
+        self.skill = rng.betavariate(2, 2)
+        self.position = 0
+        self.failures = 0
+        self.give_up_after = rng.randint(3, 8)
+        self.passed = set()
+        self.used_hints = set()
+
+    def next_exercise(self):
+        self.failures = 0
+        self.give_up_after = self.rng.randint(3, 8)
+        if self.position < len(self.exercises) - 1 and self.rng.random() < 0.95:
+            self.position += 1
+        else:
+            # Done with the course, or skipping around: revisit any exercise
+            self.position = self.rng.randrange(len(self.exercises))
+
+    def attempt(self, at, out):
+        """Write one attempt, and its hint or XP rows, into the out lists"""
+        rng = self.rng
+        exercise_id, difficulty, xp_reward = self.exercises[self.position]
+        chance = 0.2 + 0.6 * self.skill - 0.4 * difficulty + 0.08 * self.failures
+        passed = rng.random() < min(max(chance, 0.05), 0.95)
+        score = 100 if passed else _pick(rng, PARTIAL_SCORES)
+        out['attempts'].append((self.user_id, exercise_id, passed, score, _pick(rng, ATTEMPT_DATA), at))
+
+        if passed:
+            if exercise_id not in self.passed:
+                self.passed.add(exercise_id)
+                out['xp'].append((self.user_id, xp_reward, XPTransaction.Reason.EXERCISE, f'exercise:{exercise_id}', at))
+            self.next_exercise()
+            return
+        self.failures += 1
+        if self.failures >= 2 and rng.random() < 0.25:
+            for hint_id, xp_cost in self.hints.get(exercise_id, ()):
+                if hint_id not in self.used_hints:
+                    self.used_hints.add(hint_id)
+                    used_at = at + timedelta(seconds=rng.randint(5, 60))
+                    out['hints'].append((self.user_id, hint_id, used_at))
+                    if xp_cost:
+                        out['xp'].append((self.user_id, -xp_cost, XPTransaction.Reason.HINT, f'hint:{hint_id}', used_at))
+                    break
+        if self.failures >= self.give_up_after:
+            self.next_exercise()
+
+
+def _allocate(rng, total, count):
+    """Split total attempts between count students, heavy-tailed"""
+    weights = [rng.lognormvariate(0, 1) for _ in range(count)]
+    scale = total / sum(weights)
+    shares = [int(weight * scale) for weight in weights]
+    for i in rng.sample(range(count), total - sum(shares)):
+        shares[i] += 1
+    return shares
+
+
+class _Calendar:
+    """Draws study session start times over the days before end"""
+
+    def __init__(self, days, end):
+        first = end.date() - timedelta(days=days)
+        self.days = [first + timedelta(days=d) for d in range(days)]
+        self.day_weights = list(accumulate(WEEKDAY_WEIGHTS[day.weekday()] for day in self.days))
+        self.hours = list(HOUR_WEIGHTS)
+        self.hour_weights = list(accumulate(HOUR_WEIGHTS.values()))
+        self.end = end
+        self.tz = timezone.get_current_timezone()
+
+    def sessions(self, rng, count):
+        days = rng.choices(self.days, cum_weights=self.day_weights, k=count)
+        hours = rng.choices(self.hours, cum_weights=self.hour_weights, k=count)
+        starts = [
+            datetime.combine(day, time(hour, rng.randrange(60), rng.randrange(60)), tzinfo=self.tz)
+            for day, hour in zip(days, hours)
+        ]
+        return sorted(start for start in starts if start < self.end) or [self.end - timedelta(hours=1)]
+
+
+def _simulate(rng, student_ids, shares, exercises, hints, days, end):
+    """Attempts, hint usages and ledger rows of every student, in batches"""
+    calendar = _Calendar(days, end)
+    out = {'attempts': [], 'hints': [], 'xp': []}
+    for user_id, share in zip(student_ids, shares):
+        if not share:
+            continue
+        student = _Student(rng, user_id, exercises, hints)
+        sessions = calendar.sessions(rng, max(share // rng.randint(5, 20), 1))
+        per_session, extra = divmod(share, len(sessions))
+        for n, at in enumerate(sessions):
+            for _ in range(per_session + (n < extra)):
+                at += _pick(rng, GAPS)
+                student.attempt(at, out)
+        if len(out['attempts']) >= 100_000:
+            yield out
+            out = {'attempts': [], 'hints': [], 'xp': []}
+    yield out
+
+
+def generate(volume, seed=0, prefix='load', password='eleve123', end=None, stdout=None):
+    """Create the synthetic dataset, returns the counts of created rows"""
+    rng = random.Random(seed)
+    end = end or timezone.now().replace(minute=0, second=0, microsecond=0)
+    log = (lambda message: stdout.write(message + '\n')) if stdout is not None else (lambda message: None)
+
+    if User.objects.filter(username__startswith=f'{prefix}_').exists():
+        raise ValueError(f'Users prefixed with "{prefix}_" already exist')
+
+    # Own generator, so a second run on the same content simulates the same attempts
+    ensure_exercises(volume.exercises_per_chapter, volume.hints_per_exercise, random.Random(seed))
+    exercises = [
+        (pk, rng.random(), xp_reward)
+        for pk, xp_reward in Exercise.objects.filter(
+            is_published=True, chapter__is_published=True
+        ).order_by('chapter__course__order', 'chapter__order', 'order', 'pk').values_list('pk', 'xp_reward')
+    ]
+    if not exercises:
+        raise ValueError('No published exercise to attempt')
+    hints = defaultdict(list)
+    for hint_id, exercise_id, xp_cost in Hint.objects.order_by('exercise_id', 'order', 'pk').values_list(
+        'pk', 'exercise_id', 'xp_cost'
+    ):
+        hints[exercise_id].append((hint_id, xp_cost))
+
+    log(f'Creating {volume.students} students in {volume.classrooms} classrooms...')
+    hashed = make_password(password)
+    joined = end - timedelta(days=volume.days)
+    teacher_count = max(volume.classrooms // 2, 1)
+    User.objects.bulk_create([
+        User(username=f'{prefix}_teacher{i}', password=hashed, role=User.Role.TEACHER, date_joined=joined)
+        for i in range(teacher_count)
+    ], batch_size=5000)
+    User.objects.bulk_create([
+        User(username=f'{prefix}_student{i}', pseudo=f'Élève {i}', password=hashed,
+             role=User.Role.STUDENT, date_joined=joined + timedelta(days=rng.randint(0, 20)))
+        for i in range(volume.students)
+    ], batch_size=5000)
+    users = dict(User.objects.filter(username__startswith=f'{prefix}_').values_list('username', 'pk'))
+    teacher_ids = [users[f'{prefix}_teacher{i}'] for i in range(teacher_count)]
+    student_ids = [users[f'{prefix}_student{i}'] for i in range(volume.students)]
+
+    codes = set(Classroom.objects.values_list('join_code', flat=True))
+    # Retries on existing codes must not shift the generator of the attempts
+    code_rng = random.Random(seed)
+    classrooms = []
+    for i in range(volume.classrooms):
+        code = None
+        while code is None or code in codes:
+            code = ''.join(code_rng.choices(string.ascii_uppercase + string.digits, k=6))
+        codes.add(code)
+        classrooms.append(Classroom(
+            name=f'NSI {"Première" if i % 2 else "Terminale"} {i // 2 + 1}',
+            school_name=f'Lycée {prefix} {i // 4 + 1}',
+            teacher_id=teacher_ids[i % teacher_count],
+            join_code=code,
+        ))
+    Classroom.objects.bulk_create(classrooms)
+    classroom_ids = list(Classroom.objects.filter(join_code__in=[c.join_code for c in classrooms]).order_by('pk').values_list('pk', flat=True))
+    Enrollment.objects.bulk_create([
+        Enrollment(user_id=student_id, classroom_id=classroom_ids[i % len(classroom_ids)])
+        for i, student_id in enumerate(student_ids)
+    ], batch_size=5000)
+
+    log(f'Simulating {volume.attempts} attempts over {volume.days} days...')
+    counts = {'students': volume.students, 'classrooms': volume.classrooms, 'attempts': 0, 'hint_usages': 0}
+    daily = defaultdict(int)
+    shares = _allocate(rng, volume.attempts, volume.students)
+    for out in _simulate(rng, student_ids, shares, exercises, hints, volume.days, end):
+        with transaction.atomic():
+            counts['attempts'] += write_rows(
+                Attempt, ['user', 'exercise', 'passed', 'score', 'attempt_data', 'created_at'], out['attempts']
+            )
+            counts['hint_usages'] += write_rows(HintUsage, ['user', 'hint', 'used_at'], out['hints'])
+            write_rows(XPTransaction, ['user', 'amount', 'reason', 'source', 'created_at'], out['xp'])
+        for user_id, amount, _, _, at in out['xp']:
+            daily[user_id, timezone.localdate(at)] += amount
+        log(f'  {counts["attempts"]} attempts')
+    DailyXP.objects.bulk_create(
+        [DailyXP(user_id=user_id, day=day, xp=xp) for (user_id, day), xp in sorted(daily.items())],
+        batch_size=5000
+    )
+
+    log('Deriving progress, counters, XP, badges and leaderboard...')
+    quiet = io.StringIO()
+    call_command('backfill_progress', stdout=quiet)
+    call_command('reconcile_exercise_stats', stdout=quiet)
+    call_command('rebuild_xp', stdout=quiet)
+    call_command('award_badges', stdout=quiet)
+    rebuild_leaderboard()
+    return counts
@@ -44,7 +44,7 @@ def success_rate(classrooms):
 @register.filter
 def total_exercises_solved(user):
     """Get number of unique exercises solved by user"""
-    return user.attempts.filter(passed=True).values('exercise').distinct().count()
+    return user.exercise_progress.passed().count()
 
 
 @register.filter
@@ -1,10 +1,17 @@
 """
 Tests for accounts models
 """
+import io
+from datetime import datetime, timedelta
 from typing import TYPE_CHECKING
-from django.test import TestCase
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from django.contrib.auth import get_user_model
-from accounts.models import Classroom, Enrollment
+from django.core.management import call_command
+from accounts.models import Classroom, Enrollment, XPTransaction
+from accounts.sample_data import Volume, generate
+from exercises.models import Attempt
 
 if TYPE_CHECKING:
     from accounts.models import User
@@ -53,6 +60,39 @@ class UserModelTest(TestCase):
         self.assertEqual(self.student.xp, 210)
         self.assertEqual(self.student.level, 3)
     
+    def test_add_xp_records_ledger(self):
+        """Test every XP change is written to the ledger"""
+        self.student.add_xp(30, reason=XPTransaction.Reason.EXERCISE, source='exercise:1')
+        self.student.add_xp(-50, reason=XPTransaction.Reason.HINT, source='hint:1')
+        
+        self.assertEqual(self.student.xp, 0)
+        self.assertEqual(
+            list(self.student.xp_transactions.order_by('pk').values_list('amount', 'reason')),
+            [(30, 'EXERCISE'), (-50, 'HINT')]
+        )
+    
+    def test_add_xp_does_not_overwrite_other_fields(self):
+        """Test add_xp only touches xp and level on the user row"""
+        stale = User.objects.get(pk=self.student.pk)
+        self.student.add_xp(40)
+        stale.add_xp(70)
+        
+        self.assertEqual(stale.xp, 110)
+        self.assertEqual(stale.level, 2)
+    
+    def test_rebuild_xp_from_ledger(self):
+        """Test totals can be rebuilt from the ledger"""
+        self.student.add_xp(120)
+        self.student.add_xp(-30)
+        User.objects.filter(pk=self.student.pk).update(xp=0, level=1)
+        
+        out = io.StringIO()
+        call_command('rebuild_xp', stdout=out)
+        self.assertIn('✓ Rebuilt XP for 1 users', out.getvalue())
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.xp, 90)
+        self.assertEqual(self.student.level, 2)
+    
     def test_role_choices(self):
         """Test role field choices"""
         self.assertEqual(self.student.role, 'STUDENT')
@@ -110,3 +150,58 @@ class ClassroomModelTest(TestCase):
         # Test reverse relation through enrollment
         self.assertEqual(student.enrollments.count(), 1)
         self.assertEqual(student.enrollments.first().classroom, self.classroom)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SampleDataGeneratorTest(TestCase):
+    def setUp(self):
+        call_command('create_sample_data', stdout=io.StringIO())
+        self.end = timezone.make_aware(datetime(2026, 6, 1, 18))
+        self.volume = Volume(students=20, classrooms=3, attempts=600, days=30)
+    
+    def generate(self, prefix):
+        generate(self.volume, seed=3, prefix=prefix, end=self.end)
+        return [
+            (username.split('_', 1)[1], *row)
+            for username, *row in Attempt.objects.filter(
+                user__username__startswith=f'{prefix}_'
+            ).order_by('pk').values_list('user__username', 'exercise_id', 'passed', 'score', 'created_at')
+        ]
+    
+    def test_generates_the_requested_volumes(self):
+        """Test users, classrooms and attempts are created with their timestamps"""
+        attempts = self.generate('gen')
+        
+        self.assertEqual(len(attempts), 600)
+        self.assertEqual(User.objects.filter(username__startswith='gen_student').count(), 20)
+        self.assertEqual(Classroom.objects.filter(teacher__username__startswith='gen_').count(), 3)
+        self.assertEqual(Enrollment.objects.filter(user__username__startswith='gen_').count(), 20)
+        self.assertTrue(all(self.end - timedelta(days=31) < row[-1] < self.end + timedelta(days=1) for row in attempts))
+        self.assertTrue(any(row[2] for row in attempts))
+        self.assertTrue(any(not row[2] for row in attempts))
+    
+    def test_derived_rows_match_the_attempts(self):
+        """Test XP, progress and hint usages are consistent with the generated history"""
+        self.generate('gen')
+        student = User.objects.filter(username__startswith='gen_student', xp__gt=0).first()
+        
+        ledger = student.xp_transactions.aggregate(total=Sum('amount'))['total']
+        self.assertEqual(student.xp, max(ledger, 0))
+        self.assertEqual(
+            student.exercise_progress.passed().count(),
+            student.attempts.filter(passed=True).values('exercise').distinct().count()
+        )
+        self.assertEqual(
+            student.hint_usages.count(),
+            student.xp_transactions.filter(reason=XPTransaction.Reason.HINT).count()
+        )
+    
+    def test_same_seed_same_data(self):
+        """Test two runs with the same seed generate the same attempts"""
+        self.assertEqual(self.generate('first'), self.generate('second'))
+    
+    def test_existing_prefix_is_rejected(self):
+        """Test generating twice with the same prefix fails instead of mixing users"""
+        self.generate('gen')
+        with self.assertRaises(ValueError):
+            generate(self.volume, prefix='gen', end=self.end)
@@ -3,6 +3,8 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.views.generic import CreateView, DetailView, TemplateView, FormView, View, UpdateView
 from django.urls import reverse_lazy
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import Coalesce
 from .models import User, Classroom, Enrollment
 from .forms import StudentRegistrationForm, TeacherRegistrationForm, JoinClassroomForm, ClassroomCreateForm
 
@@ -46,8 +48,11 @@ class ProfileView(LoginRequiredMixin, TemplateView):
 
         if user.is_student:
             context['classrooms'] = Classroom.objects.filter(enrollments__user=user)
-            context['total_attempts'] = user.attempts.count()
-            context['passed_exercises'] = user.attempts.filter(passed=True).values('exercise').distinct().count()
+            progress = user.exercise_progress.aggregate(
+                total_attempts=Coalesce(Sum('attempt_count'), 0),
+                passed_exercises=Count('pk', filter=Q(first_passed_at__isnull=False)),
+            )
+            context.update(progress)
         elif user.is_teacher:
             context['classrooms'] = user.classrooms_taught.all()
         
@@ -80,21 +85,38 @@ class ClassroomDetailView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         classroom = self.object
         
-        # Get students with their stats
-        students = []
-        for enrollment in classroom.enrollments.select_related('user'):
-            student = enrollment.user
-            students.append({
-                'user': student,
-                'total_xp': student.xp,
-                'level': student.level,
-                'exercises_passed': student.attempts.filter(passed=True).values('exercise').distinct().count(),
-            })
+        # Get students with their stats in a single query
+        students = list(
+            classroom.get_students().annotate(
+                exercises_solved=Count(
+                    'exercise_progress',
+                    filter=Q(exercise_progress__first_passed_at__isnull=False)
+                ),
+                exercises_tried=Count('exercise_progress'),
+                attempts_total=Coalesce(Sum('exercise_progress__attempt_count'), 0),
+                last_attempt_at=Max('exercise_progress__last_attempt_at'),
+            ).order_by('-xp')
+        )
+        for student in students:
+            student.success_rate = self._rate(student.exercises_solved, student.exercises_tried)
         
         context['students'] = students
+        context['total_attempts'] = sum(s.attempts_total for s in students)
+        context['success_rate'] = self._rate(
+            sum(s.exercises_solved for s in students),
+            sum(s.exercises_tried for s in students)
+        )
+        context['avg_xp'] = sum(s.xp for s in students) / len(students) if students else 0
         context['is_teacher'] = self.request.user == classroom.teacher
         
         return context
+    
+    @staticmethod
+    def _rate(solved, tried):
+        """Share of attempted exercises that were solved, in percent"""
+        if tried == 0:
+            return 0
+        return round((solved / tried) * 100, 1)
 
 
 class JoinClassroomView(LoginRequiredMixin, FormView):
@@ -0,0 +1,71 @@
+"""
+Benchmark the hot views on a seeded throwaway database.
+
+    python -m benchmarks                 # full dataset, compare with baseline.json
+    python -m benchmarks --scale 0.05    # smaller dataset for a quick run
+    python -m benchmarks --update-baseline
+
+The database is created and destroyed like the test database, so the
+development database is never touched.
+"""
+import argparse
+import os
+import sys
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmark the portal hot views')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Dataset size relative to 2000 students, 60 classrooms and 1M attempts')
+    parser.add_argument('--iterations', type=int, default=30, help='Measured requests per scenario')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='Allowed p95 latency increase over the baseline (0.3 = +30%%)')
+    parser.add_argument('--slack-ms', type=float, default=5,
+                        help='Absolute p95 increase always allowed, in milliseconds')
+    parser.add_argument('--only', nargs='*', help='Scenarios to run')
+    parser.add_argument('--baseline', help='Baseline file (default benchmarks/baseline.json)')
+    parser.add_argument('--update-baseline', action='store_true', help='Store the results as the new baseline')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nsi_project.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+    from benchmarks.dataset import DatasetSize, seed
+    from benchmarks import runner
+
+    size = DatasetSize().scaled(args.scale)
+    baseline_path = args.baseline or runner.BASELINE
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        ids = seed(size, stdout=sys.stdout)
+        print(f'\nRunning {args.iterations} iterations per scenario...\n')
+        results = runner.run(ids, args.iterations, args.only)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    dataset = {'students': size.students, 'classrooms': size.classrooms, 'attempts': size.attempts}
+    baseline = runner.load_baseline(baseline_path)
+    if baseline and baseline.get('dataset') != dataset:
+        print(f'Warning: the baseline was measured on {baseline.get("dataset")}, not {dataset}\n')
+    lines, failures = runner.compare(results, baseline, args.tolerance, args.slack_ms)
+    print('\n'.join(lines))
+
+    if args.update_baseline:
+        runner.save_baseline(results, dataset, baseline_path)
+        print(f'\n✓ Baseline written to {baseline_path}')
+        return 0
+    if failures:
+        print(f'\n✗ {failures} scenario(s) regressed')
+        return 1
+    print('\n✓ No regression')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Seed a realistic dataset for the benchmarks.
+
+The course content is loaded, then students, classrooms and attempts are
+generated by accounts.sample_data, which also derives the progress rows,
+counters, XP and leaderboard with the production code.
+"""
+from dataclasses import dataclass
+
+from django.core.management import call_command
+
+from accounts.models import User, Classroom
+from accounts.sample_data import Volume, generate
+from courses.models import Chapter
+from exercises.models import Exercise, Attempt
+
+
+@dataclass
+class DatasetSize:
+    students: int = 2000
+    classrooms: int = 60
+    attempts: int = 1_000_000
+
+    def scaled(self, scale):
+        return DatasetSize(
+            students=max(int(self.students * scale), 10),
+            classrooms=max(int(self.classrooms * scale), 2),
+            attempts=max(int(self.attempts * scale), 100),
+        )
+
+
+SAMPLE_CODE = [
+    'def somme(t):\n    s = 0\n    for x in t:\n        s += x\n    return s\n',
+    'def somme(t):\n    return sum(t)\n',
+    'def maximum(t):\n    m = t[0]\n    for x in t:\n        if x > m:\n            m = x\n    return m\n',
+]
+
+
+def seed(size, stdout=None, seed_value=42):
+    """Fill the current database, returns the ids the scenarios need"""
+    if stdout is not None:
+        stdout.write('Loading course content...\n')
+    call_command('load_content', force=True, verbosity=0)
+    generate(
+        Volume(students=size.students, classrooms=size.classrooms, attempts=size.attempts),
+        seed=seed_value,
+        prefix='bench',
+        stdout=stdout,
+    )
+
+    student = User.objects.get(username='bench_student0')
+    classroom = Classroom.objects.filter(enrollments__user=student).get()
+    exercise = Exercise.objects.filter(is_published=True).order_by('pk').first()
+    Attempt.objects.bulk_create([
+        Attempt(user=student, exercise=exercise, score=50, attempt_data={'code': code})
+        for code in SAMPLE_CODE
+    ])
+    chapters = Chapter.objects.filter(is_published=True, course__is_published=True).select_related('course')
+    chapter = max(chapters, key=lambda chapter: chapter.content_blocks.count())
+    return {
+        'student': student.pk,
+        'teacher': classroom.teacher_id,
+        'classroom': classroom.pk,
+        'course_slug': chapter.course.slug,
+        'chapter_slug': chapter.slug,
+        'exercise': exercise.pk,
+    }
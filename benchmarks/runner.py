@@ -0,0 +1,143 @@
+"""
+Drive the hot views through the test client and compare with a baseline.
+
+Each scenario is requested `iterations` times after a warm-up, as the
+user it is meant for. The query count of every request and the p50/p95
+latencies are reported, and compared with benchmarks/baseline.json:
+a scenario fails when it runs more queries than its baseline, or when its
+p95 latency exceeds the baseline by more than the tolerance (relative,
+plus a few milliseconds of slack so that fast views are not flagged by
+scheduler noise).
+"""
+import json
+import logging
+import statistics
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from accounts.models import User
+from nsi_project.querybudget import QueryStats
+
+
+BASELINE = Path(__file__).with_name('baseline.json')
+
+
+@dataclass
+class Scenario:
+    name: str
+    user: str
+    url: str
+    method: str = 'get'
+    body: dict = None
+
+
+def scenarios(ids):
+    """The benchmarked requests, built from the ids returned by the seeder"""
+    submit = reverse('exercises:submit_attempt', args=[ids['exercise']])
+    return [
+        Scenario('dashboard', 'student', reverse('dashboard')),
+        Scenario('course_list', 'student', reverse('courses:course_list')),
+        Scenario('chapter_detail', 'student', reverse('courses:chapter_detail', args=[ids['course_slug'], ids['chapter_slug']])),
+        Scenario('exercise_detail', 'student', reverse('exercises:exercise_detail', args=[ids['exercise']])),
+        Scenario('submit_attempt', 'student', submit, 'post', {'passed': False, 'score': 40, 'attempt_data': {'code': 'x = 1'}}),
+        Scenario('leaderboard', 'student', reverse('gamification:leaderboard')),
+        Scenario('leaderboard_week', 'student', reverse('gamification:leaderboard') + '?period=week'),
+        Scenario('classroom_detail', 'teacher', reverse('accounts:classroom_detail', args=[ids['classroom']])),
+    ]
+
+
+@dataclass
+class Result:
+    name: str
+    p50_ms: float
+    p95_ms: float
+    queries: int
+
+    def check(self, baseline, tolerance, slack_ms=5):
+        """Regressions against a baseline entry, as messages"""
+        problems = []
+        if self.queries > baseline['queries']:
+            problems.append(f'{self.queries} queries (baseline {baseline["queries"]})')
+        limit = baseline['p95_ms'] * (1 + tolerance) + slack_ms
+        if self.p95_ms > limit:
+            problems.append(f'p95 {self.p95_ms:.1f} ms > {limit:.1f} ms (baseline {baseline["p95_ms"]:.1f} ms)')
+        return problems
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def run_scenario(client, scenario, iterations, warmup=2):
+    latencies, queries = [], []
+    for i in range(warmup + iterations):
+        kwargs = {}
+        if scenario.body is not None:
+            kwargs = {'data': json.dumps(scenario.body), 'content_type': 'application/json'}
+        stats = QueryStats()
+        with connection.execute_wrapper(stats):
+            start = time.perf_counter()
+            response = getattr(client, scenario.method)(scenario.url, **kwargs)
+            elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            raise RuntimeError(f'{scenario.name}: HTTP {response.status_code}')
+        if i >= warmup:
+            latencies.append(elapsed * 1000)
+            queries.append(stats.count)
+    return Result(
+        name=scenario.name,
+        p50_ms=round(statistics.median(latencies), 2),
+        p95_ms=round(percentile(latencies, 0.95), 2),
+        queries=max(queries),
+    )
+
+
+def run(ids, iterations=30, only=None):
+    # N+1 warnings of the query budget middleware would drown the report
+    logging.getLogger('nsi_project.querybudget').setLevel(logging.ERROR)
+    clients = {}
+    for role in ('student', 'teacher'):
+        clients[role] = Client()
+        clients[role].force_login(User.objects.get(pk=ids[role]))
+    return [
+        run_scenario(clients[scenario.user], scenario, iterations)
+        for scenario in scenarios(ids)
+        if not only or scenario.name in only
+    ]
+
+
+def load_baseline(path=BASELINE):
+    if not Path(path).exists():
+        return None
+    return json.loads(Path(path).read_text())
+
+
+def save_baseline(results, dataset, path=BASELINE):
+    Path(path).write_text(json.dumps({
+        'dataset': dataset,
+        'results': {result.name: asdict(result) for result in results},
+    }, indent=2) + '\n')
+
+
+def compare(results, baseline, tolerance, slack_ms=5):
+    """Report lines and the number of failing scenarios"""
+    lines = [f'{"scenario":<18} {"p50 ms":>9} {"p95 ms":>9} {"queries":>8}   baseline']
+    failures = 0
+    for result in results:
+        reference = (baseline or {}).get('results', {}).get(result.name)
+        if reference is None:
+            status = 'no baseline'
+        else:
+            problems = result.check(reference, tolerance, slack_ms)
+            failures += bool(problems)
+            status = 'REGRESSION: ' + ', '.join(problems) if problems else (
+                f'ok (p95 {reference["p95_ms"]:.1f} ms, {reference["queries"]} queries)'
+            )
+        lines.append(f'{result.name:<18} {result.p50_ms:>9.1f} {result.p95_ms:>9.1f} {result.queries:>8}   {status}')
+    return lines, failures
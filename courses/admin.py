@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Course, Chapter, ContentBlock, ChapterAssignment
+from .models import Course, Chapter, ContentBlock, ChapterAssignment, ContentFingerprint
 
 
 @admin.register(Course)
@@ -29,3 +29,9 @@ class ChapterAssignmentAdmin(admin.ModelAdmin):
     list_display = ['chapter', 'classroom', 'assigned_at', 'due_date']
     list_filter = ['classroom', 'assigned_at']
     search_fields = ['chapter__title', 'classroom__name']
+
+
+@admin.register(ContentFingerprint)
+class ContentFingerprintAdmin(admin.ModelAdmin):
+    list_display = ['name', 'fingerprint', 'loaded_at']
+    readonly_fields = ['name', 'fingerprint', 'loaded_at']
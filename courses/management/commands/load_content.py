@@ -0,0 +1,85 @@
+"""
+Management command to load all course content in a single process
+"""
+import hashlib
+from io import StringIO
+from importlib import import_module
+from pathlib import Path
+
+from django.core.management import call_command, get_commands
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from courses.models import ContentFingerprint
+from courses import sync
+
+
+# Content commands, in the order they must run
+CONTENT_COMMANDS = [
+    'create_snt_content',
+    'populate_python_content',
+    'init_gamification',
+    'populate_snt_internet',
+    'populate_snt_web',
+    'populate_snt_donnees',
+    'populate_snt_reseaux_sociaux',
+    'populate_snt_photo',
+    'populate_snt_localisation',
+    'populate_nsi_python',
+    'populate_nsi_algorithmique',
+    'populate_nsi_representation',
+    'populate_nsi_web',
+    'populate_nsi_traitement_donnees',
+    'populate_nsi_architecture',
+    'populate_nsi_reseaux',
+]
+
+FINGERPRINT_NAME = 'content'
+
+
+def compute_fingerprint(commands=CONTENT_COMMANDS):
+    """sha256 of the source of every content command and of the sync layer"""
+    apps = get_commands()
+    digest = hashlib.sha256()
+    for name in commands:
+        module = import_module(f'{apps[name]}.management.commands.{name}')
+        digest.update(name.encode())
+        digest.update(Path(module.__file__).read_bytes())
+    digest.update(Path(sync.__file__).read_bytes())
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = 'Load all course content in one transaction, skipped when the sources are unchanged, then pre-render it'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Load the content even if its fingerprint is unchanged'
+        )
+
+    def handle(self, *args, **options):
+        fingerprint = compute_fingerprint()
+        current = ContentFingerprint.objects.filter(name=FINGERPRINT_NAME).values_list('fingerprint', flat=True).first()
+        if current == fingerprint and not options['force']:
+            self.stdout.write(self.style.SUCCESS(f'✓ Content unchanged ({fingerprint[:12]}), nothing to load'))
+        else:
+            self._load(fingerprint, options)
+
+        # Only blocks whose markdown changed are rendered, so no visitor
+        # pays for the first rendering of a block
+        call_command('prerender_content', stdout=self.stdout)
+
+    def _load(self, fingerprint, options):
+        # Sub-command output is only shown with -v 2
+        stdout = self.stdout if options['verbosity'] > 1 else StringIO()
+        with transaction.atomic():
+            for name in CONTENT_COMMANDS:
+                self.stdout.write(f'  → {name}')
+                call_command(name, stdout=stdout)
+            ContentFingerprint.objects.update_or_create(
+                name=FINGERPRINT_NAME,
+                defaults={'fingerprint': fingerprint}
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Content loaded ({fingerprint[:12]})'))
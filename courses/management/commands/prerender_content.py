@@ -0,0 +1,54 @@
+"""
+Management command to pre-render the markdown of every content block
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from courses.models import ContentBlock
+from courses.rendering import content_hash, render_markdown
+
+
+class Command(BaseCommand):
+    help = 'Render and cache the HTML of all content blocks using a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of worker processes (defaults to the number of CPUs)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-render blocks whose cached HTML is still up to date'
+        )
+
+    def handle(self, *args, **options):
+        blocks = list(ContentBlock.objects.only('id', 'content_markdown', 'rendered_hash'))
+        if not options['force']:
+            blocks = [
+                block for block in blocks
+                if block.rendered_hash != content_hash(block.content_markdown)
+            ]
+
+        if not blocks:
+            self.stdout.write(self.style.SUCCESS('✓ All content blocks are already rendered'))
+            return
+
+        # Worker processes only render markdown, they never touch the database
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            rendered = pool.map(
+                render_markdown,
+                [block.content_markdown for block in blocks],
+                chunksize=8
+            )
+            for block, html in zip(blocks, rendered):
+                block.rendered_html = html
+                block.rendered_hash = content_hash(block.content_markdown)
+
+        with transaction.atomic():
+            ContentBlock.objects.bulk_update(blocks, ['rendered_html', 'rendered_hash'], batch_size=200)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ {len(blocks)} content blocks rendered'))
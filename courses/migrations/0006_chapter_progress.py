@@ -0,0 +1,31 @@
+# Generated by Django 5.0 on 2026-10-17 22:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_course_icon_course_image_url'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChapterProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exercises_passed', models.IntegerField(default=0, verbose_name='Exercices réussis')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('chapter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='courses.chapter')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chapter_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Progression sur un chapitre',
+                'verbose_name_plural': 'Progressions sur les chapitres',
+                'unique_together': {('user', 'chapter')},
+            },
+        ),
+    ]
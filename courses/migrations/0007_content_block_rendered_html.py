@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-17 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_chapter_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentblock',
+            name='rendered_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Empreinte du contenu et de la configuration du rendu ayant produit le HTML', max_length=64, verbose_name='Empreinte du rendu'),
+        ),
+        migrations.AddField(
+            model_name='contentblock',
+            name='rendered_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='HTML rendu'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0 on 2026-10-17 22:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_content_block_rendered_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Nom')),
+                ('fingerprint', models.CharField(max_length=64, verbose_name='Empreinte')),
+                ('loaded_at', models.DateTimeField(auto_now=True, verbose_name='Chargé le')),
+            ],
+            options={
+                'verbose_name': 'Empreinte de contenu',
+                'verbose_name_plural': 'Empreintes de contenu',
+            },
+        ),
+    ]
@@ -1,6 +1,11 @@
-from django.db import models
+from django.db import connection, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.text import slugify
 
+from courses.rendering import content_hash, render_markdown
+
 
 class Course(models.Model):
     """A course (SNT for Seconde, NSI for Première/Terminale)"""
@@ -37,6 +42,32 @@ class Course(models.Model):
 
     def __str__(self):
         return f"{self.get_level_display()} - {self.title}"
+
+
+def compute_completion(exercises_passed, exercise_total):
+    """Completion percentage of a chapter (a chapter without exercises is complete)"""
+    if exercise_total == 0:
+        return 100
+    return int((exercises_passed / exercise_total) * 100)
+
+
+class ChapterQuerySet(models.QuerySet):
+    def with_completion(self, user):
+        """Annotate each chapter with the user's passed/total exercise counts
+
+        Completion for any number of chapters is fetched in one query from
+        the ChapterProgress rollup; read it with chapter.completion.
+        """
+        passed = ChapterProgress.objects.filter(
+            user=user,
+            chapter=OuterRef('pk')
+        ).values('exercises_passed')[:1]
+        return self.annotate(
+            exercise_total=Count('exercises', distinct=True),
+            exercises_passed=Coalesce(Subquery(passed), 0),
+        )
+
+
 class Chapter(models.Model):
     """A chapter within a course"""
     
@@ -53,6 +84,8 @@ class Chapter(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ChapterQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Chapitre'
         verbose_name_plural = 'Chapitres'
@@ -67,21 +100,56 @@ class Chapter(models.Model):
             self.slug = slugify(self.title)
         super().save(*args, **kwargs)
     
+    @property
+    def completion(self):
+        """Completion percentage, requires Chapter.objects.with_completion()"""
+        return compute_completion(self.exercises_passed, self.exercise_total)
+    
     def get_completion_for_user(self, user):
         """Calculate completion percentage for a specific user"""
-        from exercises.models import Exercise, Attempt
-        
-        exercises = Exercise.objects.filter(chapter=self)
-        if not exercises.exists():
-            return 100
-        
-        completed = Attempt.objects.filter(
-            user=user,
-            exercise__chapter=self,
-            passed=True
-        ).values('exercise').distinct().count()
-        
-        return int((completed / exercises.count()) * 100)
+        return Chapter.objects.with_completion(user).get(pk=self.pk).completion
+
+
+class ChapterProgressManager(models.Manager):
+    def record_first_pass(self, user_id, chapter_id):
+        """Count a newly passed exercise in the user's chapter rollup"""
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        sql = f"""
+            INSERT INTO {table} (user_id, chapter_id, exercises_passed, updated_at)
+            VALUES (%s, %s, 1, %s)
+            ON CONFLICT (user_id, chapter_id) DO UPDATE SET
+                exercises_passed = {table}.exercises_passed + 1,
+                updated_at = excluded.updated_at
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user_id, chapter_id, timezone.now()])
+
+
+class ChapterProgress(models.Model):
+    """Number of distinct exercises a user has passed in a chapter"""
+    
+    user = models.ForeignKey(
+        'accounts.User',
+        on_delete=models.CASCADE,
+        related_name='chapter_progress'
+    )
+    chapter = models.ForeignKey(
+        Chapter,
+        on_delete=models.CASCADE,
+        related_name='progress'
+    )
+    exercises_passed = models.IntegerField(default=0, verbose_name='Exercices réussis')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = ChapterProgressManager()
+    
+    class Meta:
+        verbose_name = 'Progression sur un chapitre'
+        verbose_name_plural = 'Progressions sur les chapitres'
+        unique_together = ['user', 'chapter']
+    
+    def __str__(self):
+        return f"{self.user} - {self.chapter.title} ({self.exercises_passed})"
 
 
 class ContentBlock(models.Model):
@@ -106,6 +174,14 @@ class ContentBlock(models.Model):
     )
     title = models.CharField(max_length=200, blank=True, verbose_name='Titre')
     content_markdown = models.TextField(verbose_name='Contenu (Markdown)')
+    rendered_html = models.TextField(blank=True, editable=False, verbose_name='HTML rendu')
+    rendered_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        verbose_name='Empreinte du rendu',
+        help_text='Empreinte du contenu et de la configuration du rendu ayant produit le HTML'
+    )
     order = models.IntegerField(default=0, verbose_name='Ordre')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -117,6 +193,26 @@ class ContentBlock(models.Model):
     
     def __str__(self):
         return f"{self.chapter.title} - {self.get_type_display()} #{self.order}"
+    
+    def save(self, *args, **kwargs):
+        # Drop the cached HTML when the markdown changed
+        if self.rendered_hash and self.rendered_hash != content_hash(self.content_markdown):
+            self.rendered_html = ''
+            self.rendered_hash = ''
+        super().save(*args, **kwargs)
+    
+    def get_rendered_html(self):
+        """Sanitized HTML of the block, rendered once and cached in the row"""
+        expected_hash = content_hash(self.content_markdown)
+        if self.rendered_hash != expected_hash:
+            self.rendered_html = render_markdown(self.content_markdown)
+            self.rendered_hash = expected_hash
+            if self.pk:
+                ContentBlock.objects.filter(pk=self.pk).update(
+                    rendered_html=self.rendered_html,
+                    rendered_hash=self.rendered_hash
+                )
+        return self.rendered_html
 
 
 class ChapterAssignment(models.Model):
@@ -144,3 +240,18 @@ class ChapterAssignment(models.Model):
     def __str__(self):
         return f"{self.chapter} → {self.classroom.name}"
 
+
+
+class ContentFingerprint(models.Model):
+    """Hash of the content sources last loaded into the database"""
+    
+    name = models.CharField(max_length=50, unique=True, verbose_name='Nom')
+    fingerprint = models.CharField(max_length=64, verbose_name='Empreinte')
+    loaded_at = models.DateTimeField(auto_now=True, verbose_name='Chargé le')
+    
+    class Meta:
+        verbose_name = 'Empreinte de contenu'
+        verbose_name_plural = 'Empreintes de contenu'
+    
+    def __str__(self):
+        return f"{self.name} ({self.fingerprint[:12]})"
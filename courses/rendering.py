@@ -0,0 +1,48 @@
+"""
+Markdown rendering for content blocks
+"""
+import hashlib
+
+import bleach
+import markdown
+import pygments
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'codehilite', 'tables']
+
+ALLOWED_TAGS = [
+    'p', 'br', 'strong', 'em', 'u', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'ul', 'ol', 'li', 'a', 'code', 'pre', 'blockquote', 'table', 'thead',
+    'tbody', 'tr', 'th', 'td', 'div', 'span',
+]
+
+ALLOWED_ATTRIBUTES = {
+    'a': ['href', 'title'],
+    'code': ['class'],
+    'pre': ['class'],
+    'div': ['class'],
+    'span': ['class'],
+}
+
+# Anything that changes the rendered output must be part of the fingerprint,
+# so cached HTML is thrown away when the renderer configuration changes
+RENDERER_FINGERPRINT = repr((
+    MARKDOWN_EXTENSIONS,
+    ALLOWED_TAGS,
+    sorted(ALLOWED_ATTRIBUTES.items()),
+    markdown.__version__,
+    bleach.__version__,
+    pygments.__version__,
+))
+
+
+def content_hash(text):
+    """Cache key of the rendered HTML for a markdown source"""
+    digest = hashlib.sha256(RENDERER_FINGERPRINT.encode())
+    digest.update(text.encode())
+    return digest.hexdigest()
+
+
+def render_markdown(text):
+    """Convert markdown to sanitized HTML"""
+    html_content = markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+    return bleach.clean(html_content, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES)
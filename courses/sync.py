@@ -0,0 +1,279 @@
+"""
+Diff-based content synchronisation for the populate_* management commands.
+
+Content is declared with ContentSync.chapter()/block()/exercise() and written
+by ContentSync.commit(), which upserts rows by natural key (chapter slug,
+then order inside a chapter) in a single transaction. Unchanged rows are
+left alone, so a redeploy without content changes does almost no writes and
+chapters keep their primary keys, exercises and attempt history.
+"""
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from courses.models import Course, Chapter, ContentBlock
+from exercises.models import Exercise
+
+
+@dataclass
+class SyncStats:
+    """Number of rows created/updated/unchanged/removed for one model"""
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+    @property
+    def changed(self):
+        return self.created + self.updated + self.removed
+
+    def __str__(self):
+        return (
+            f"{self.created} créé(s), {self.updated} modifié(s), "
+            f"{self.unchanged} inchangé(s), {self.removed} retiré(s)"
+        )
+
+
+@dataclass
+class SyncReport:
+    """What a sync changed, per kind of content"""
+    courses: SyncStats = field(default_factory=SyncStats)
+    chapters: SyncStats = field(default_factory=SyncStats)
+    blocks: SyncStats = field(default_factory=SyncStats)
+    exercises: SyncStats = field(default_factory=SyncStats)
+
+    @property
+    def changed(self):
+        return sum(stats.changed for stats in (self.courses, self.chapters, self.blocks, self.exercises))
+
+    def merge(self, other):
+        for name in ('courses', 'chapters', 'blocks', 'exercises'):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            mine.created += theirs.created
+            mine.updated += theirs.updated
+            mine.unchanged += theirs.unchanged
+            mine.removed += theirs.removed
+
+    def __str__(self):
+        lines = [
+            f"Cours : {self.courses}",
+            f"Chapitres : {self.chapters}",
+            f"Blocs : {self.blocks}",
+            f"Exercices : {self.exercises}",
+        ]
+        return '\n'.join(lines)
+
+
+def _diff(instance, values):
+    """Apply values to an instance and return the names of the fields that changed"""
+    changed = []
+    for name, value in values.items():
+        if getattr(instance, name) != value:
+            setattr(instance, name, value)
+            changed.append(name)
+    if changed:
+        # bulk_update does not touch auto_now fields
+        instance.updated_at = timezone.now()
+        changed.append('updated_at')
+    return changed
+
+
+def _sync_children(model, existing, wanted, stats, on_content_change=None):
+    """Upsert children keyed by (chapter_id, order) and delete the leftovers
+
+    existing maps keys to model instances, wanted maps keys to field values.
+    """
+    to_create, to_update, update_fields = [], [], set()
+    for key, values in wanted.items():
+        instance = existing.pop(key, None)
+        if instance is None:
+            to_create.append(model(**values))
+            continue
+        changed = _diff(instance, values)
+        if changed:
+            if on_content_change:
+                changed.extend(on_content_change(instance, changed))
+            to_update.append(instance)
+            update_fields.update(changed)
+        else:
+            stats.unchanged += 1
+
+    model.objects.bulk_create(to_create, batch_size=200)
+    if to_update:
+        model.objects.bulk_update(to_update, sorted(update_fields), batch_size=200)
+    stats.created += len(to_create)
+    stats.updated += len(to_update)
+    return list(existing.values())
+
+
+def _reset_rendered_html(block, changed):
+    """bulk_update bypasses ContentBlock.save, drop the cached HTML by hand"""
+    if 'content_markdown' in changed:
+        block.rendered_html = ''
+        block.rendered_hash = ''
+        return ['rendered_html', 'rendered_hash']
+    return []
+
+
+def sync_courses(course_specs):
+    """Upsert courses by slug; returns a SyncReport"""
+    report = SyncReport()
+    specs = {spec['slug']: spec for spec in course_specs}
+
+    with transaction.atomic():
+        existing = Course.objects.in_bulk(list(specs), field_name='slug')
+        to_create, to_update, update_fields = [], [], set()
+        for slug, spec in specs.items():
+            course = existing.get(slug)
+            if course is None:
+                to_create.append(Course(**spec))
+                continue
+            changed = _diff(course, spec)
+            if changed:
+                to_update.append(course)
+                update_fields.update(changed)
+            else:
+                report.courses.unchanged += 1
+
+        Course.objects.bulk_create(to_create)
+        if to_update:
+            Course.objects.bulk_update(to_update, sorted(update_fields))
+        report.courses.created = len(to_create)
+        report.courses.updated = len(to_update)
+
+    return report
+
+
+class ChapterSpec:
+    """Declared chapter, collects its blocks and exercises"""
+
+    def __init__(self, slug, values):
+        self.slug = slug
+        self.values = values
+        self.blocks = []
+        self.exercises = []
+
+
+class ContentSync:
+    """Declare the content of one course and write it with commit()
+
+    chapter() and block() accept the same keyword arguments as
+    Chapter.objects.create() and ContentBlock.objects.create().
+    """
+
+    def __init__(self, course):
+        self.course = course
+        self.chapters = []
+
+    def chapter(self, title, slug=None, description='', order=0, is_published=False, course=None):
+        spec = ChapterSpec(slug or slugify(title), {
+            'course_id': (course or self.course).pk,
+            'title': title,
+            'description': description,
+            'order': order,
+            'is_published': is_published,
+        })
+        self.chapters.append(spec)
+        return spec
+
+    def block(self, chapter, type, content_markdown, title='', order=None):
+        chapter.blocks.append(self._keyed(chapter.blocks, order, {
+            'type': type,
+            'title': title,
+            'content_markdown': content_markdown,
+        }))
+
+    def exercise(self, chapter, title, type, statement_markdown, order=None, **fields):
+        chapter.exercises.append(self._keyed(chapter.exercises, order, {
+            'title': title,
+            'type': type,
+            'statement_markdown': statement_markdown,
+            **fields,
+        }))
+
+    @staticmethod
+    def _keyed(siblings, order, values):
+        """Give values its natural key; without an explicit order the position is used"""
+        if order is None:
+            order = len(siblings) + 1
+        if any(sibling['order'] == order for sibling in siblings):
+            raise ValueError(f"Ordre {order} utilisé deux fois dans le même chapitre")
+        values['order'] = order
+        return values
+
+    def commit(self):
+        """Write the declared content, returns a SyncReport
+
+        Chapters of the course that are no longer declared are unpublished
+        rather than deleted so that their exercises and attempts survive.
+        """
+        report = SyncReport()
+        with transaction.atomic():
+            chapters = self._sync_chapters(report.chapters)
+
+            existing_blocks = {
+                (block.chapter_id, block.order): block
+                for block in ContentBlock.objects.filter(chapter__in=chapters.values())
+            }
+            wanted_blocks = {
+                (chapters[spec.slug].pk, values['order']): {'chapter_id': chapters[spec.slug].pk, **values}
+                for spec in self.chapters
+                for values in spec.blocks
+            }
+            leftovers = _sync_children(
+                ContentBlock, existing_blocks, wanted_blocks, report.blocks,
+                on_content_change=_reset_rendered_html
+            )
+            ContentBlock.objects.filter(pk__in=[block.pk for block in leftovers]).delete()
+            report.blocks.removed = len(leftovers)
+
+            # Exercises are only managed for chapters that declare some, so
+            # exercises created from the admin are never touched
+            managed = [spec for spec in self.chapters if spec.exercises]
+            existing_exercises = {
+                (exercise.chapter_id, exercise.order): exercise
+                for exercise in Exercise.objects.filter(chapter__in=[chapters[spec.slug] for spec in managed])
+            }
+            wanted_exercises = {
+                (chapters[spec.slug].pk, values['order']): {'chapter_id': chapters[spec.slug].pk, **values}
+                for spec in managed
+                for values in spec.exercises
+            }
+            leftovers = _sync_children(Exercise, existing_exercises, wanted_exercises, report.exercises)
+            Exercise.objects.filter(pk__in=[exercise.pk for exercise in leftovers]).update(is_published=False)
+            report.exercises.removed = len(leftovers)
+
+        return report
+
+    def _sync_chapters(self, stats):
+        """Upsert the declared chapters by slug, returns them keyed by slug"""
+        slugs = [spec.slug for spec in self.chapters]
+        chapters = Chapter.objects.in_bulk(slugs, field_name='slug')
+
+        to_create, to_update, update_fields = [], [], set()
+        for spec in self.chapters:
+            chapter = chapters.get(spec.slug)
+            if chapter is None:
+                to_create.append(Chapter(slug=spec.slug, **spec.values))
+                continue
+            changed = _diff(chapter, spec.values)
+            if changed:
+                to_update.append(chapter)
+                update_fields.update(changed)
+            else:
+                stats.unchanged += 1
+
+        for chapter in Chapter.objects.bulk_create(to_create):
+            chapters[chapter.slug] = chapter
+        if to_update:
+            Chapter.objects.bulk_update(to_update, sorted(update_fields))
+        stats.created = len(to_create)
+        stats.updated = len(to_update)
+
+        stats.removed = Chapter.objects.filter(
+            course=self.course,
+            is_published=True
+        ).exclude(slug__in=slugs).update(is_published=False)
+        return chapters
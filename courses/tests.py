@@ -0,0 +1,176 @@
+"""
+Tests for course models
+"""
+import io
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from courses.models import Course, Chapter, ChapterProgress, ContentBlock, ContentFingerprint
+from courses.sync import ContentSync
+from exercises.models import Exercise
+
+User = get_user_model()
+
+
+class ChapterCompletionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='test_student',
+            password='test123',
+            role=User.Role.STUDENT
+        )
+        self.course = Course.objects.create(
+            title='Test Course',
+            level=Course.Level.PREMIERE,
+            is_published=True
+        )
+        self.chapter = Chapter.objects.create(
+            course=self.course,
+            title='Test Chapter',
+            slug='test-chapter',
+            is_published=True
+        )
+        self.empty_chapter = Chapter.objects.create(
+            course=self.course,
+            title='Empty Chapter',
+            slug='empty-chapter',
+            is_published=True
+        )
+        for order in range(4):
+            Exercise.objects.create(
+                chapter=self.chapter,
+                title=f'Exercise {order}',
+                type=Exercise.ExerciseType.PYTHON,
+                statement_markdown='Test statement',
+                order=order
+            )
+    
+    def test_record_first_pass(self):
+        """Test first passes are counted in the chapter rollup"""
+        ChapterProgress.objects.record_first_pass(self.user.pk, self.chapter.pk)
+        ChapterProgress.objects.record_first_pass(self.user.pk, self.chapter.pk)
+        
+        progress = ChapterProgress.objects.get(user=self.user, chapter=self.chapter)
+        self.assertEqual(progress.exercises_passed, 2)
+        self.assertEqual(self.chapter.get_completion_for_user(self.user), 50)
+    
+    def test_with_completion_single_query(self):
+        """Test completion for every chapter is fetched in one query"""
+        ChapterProgress.objects.record_first_pass(self.user.pk, self.chapter.pk)
+        
+        with self.assertNumQueries(1):
+            completion = {
+                chapter.slug: chapter.completion
+                for chapter in Chapter.objects.with_completion(self.user)
+            }
+        self.assertEqual(completion, {'test-chapter': 25, 'empty-chapter': 100})
+
+
+class ContentBlockRenderingTest(TestCase):
+    def setUp(self):
+        course = Course.objects.create(title='Test Course', level=Course.Level.PREMIERE)
+        chapter = Chapter.objects.create(course=course, title='Test Chapter', slug='test-chapter')
+        self.block = ContentBlock.objects.create(
+            chapter=chapter,
+            type=ContentBlock.BlockType.TEXT,
+            content_markdown='# Titre\n\n<script>alert(1)</script>'
+        )
+    
+    def test_rendered_html_cached(self):
+        """Test the HTML is rendered once then read from the row"""
+        html = self.block.get_rendered_html()
+        self.assertIn('<h1>Titre</h1>', html)
+        self.assertNotIn('<script>', html)
+        
+        block = ContentBlock.objects.get(pk=self.block.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(block.get_rendered_html(), html)
+    
+    def test_cache_invalidated_on_save(self):
+        """Test editing the markdown drops the cached HTML"""
+        self.block.get_rendered_html()
+        self.block.content_markdown = '## Nouveau'
+        self.block.save()
+        
+        self.assertEqual(self.block.rendered_html, '')
+        self.assertIn('<h2>Nouveau</h2>', self.block.get_rendered_html())
+    
+    def test_prerender_content(self):
+        """Test the management command renders stale blocks"""
+        out = io.StringIO()
+        call_command('prerender_content', workers=1, stdout=out)
+        self.assertIn('✓ 1 content blocks rendered', out.getvalue())
+        block = ContentBlock.objects.get(pk=self.block.pk)
+        self.assertIn('<h1>Titre</h1>', block.rendered_html)
+        
+        out = io.StringIO()
+        call_command('prerender_content', workers=1, stdout=out)
+        self.assertIn('already rendered', out.getvalue())
+
+
+class ContentSyncTest(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(title='Test Course', level=Course.Level.PREMIERE)
+    
+    def declare(self, text='Contenu'):
+        sync = ContentSync(self.course)
+        chapter = sync.chapter(title='Chapitre 1', slug='chapitre-1', order=1, is_published=True)
+        sync.block(chapter=chapter, type='TEXT', title='Intro', content_markdown=text, order=1)
+        sync.block(chapter=chapter, type='TEXT', title='Suite', content_markdown='Suite', order=2)
+        return sync
+    
+    def test_resync_is_noop(self):
+        """Test syncing unchanged content keeps the rows and writes nothing"""
+        self.declare().commit()
+        chapter = Chapter.objects.get(slug='chapitre-1')
+        
+        report = self.declare().commit()
+        self.assertEqual(report.changed, 0)
+        self.assertEqual(report.blocks.unchanged, 2)
+        self.assertEqual(Chapter.objects.get(slug='chapitre-1').pk, chapter.pk)
+    
+    def test_changed_block_updated_in_place(self):
+        """Test an edited block is updated and its cached HTML dropped"""
+        self.declare().commit()
+        block = ContentBlock.objects.get(order=1)
+        block.get_rendered_html()
+        
+        report = self.declare('Nouveau contenu').commit()
+        self.assertEqual(report.blocks.updated, 1)
+        block.refresh_from_db()
+        self.assertEqual(block.content_markdown, 'Nouveau contenu')
+        self.assertEqual(block.rendered_html, '')
+    
+    def test_undeclared_chapter_unpublished(self):
+        """Test chapters no longer declared are unpublished, not deleted"""
+        self.declare().commit()
+        Chapter.objects.create(course=self.course, title='Ancien', slug='ancien', is_published=True)
+        
+        report = self.declare().commit()
+        self.assertEqual(report.chapters.removed, 1)
+        self.assertFalse(Chapter.objects.get(slug='ancien').is_published)
+
+
+class LoadContentTest(TestCase):
+    def load(self, **options):
+        out = io.StringIO()
+        call_command('load_content', stdout=out, **options)
+        return out.getvalue()
+    
+    def test_load_then_skip(self):
+        """Test content is loaded once and skipped while its sources are unchanged"""
+        self.assertIn('✓ Content loaded', self.load())
+        self.assertTrue(Course.objects.filter(slug='snt-internet').exists())
+        self.assertTrue(Chapter.objects.filter(course__slug='nsi-1-reseaux').exists())
+        self.assertFalse(ContentBlock.objects.filter(rendered_hash='').exists())
+        fingerprint = ContentFingerprint.objects.get(name='content')
+        
+        Course.objects.filter(slug='snt-internet').delete()
+        output = self.load()
+        self.assertIn(f'✓ Content unchanged ({fingerprint.fingerprint[:12]}), nothing to load', output)
+        self.assertNotIn('Content loaded', output)
+        self.assertFalse(Course.objects.filter(slug='snt-internet').exists())
+        
+        self.assertIn('✓ Content loaded', self.load(force=True))
+        self.assertTrue(Course.objects.filter(slug='snt-internet').exists())
+        self.assertEqual(ContentFingerprint.objects.get(name='content').fingerprint, fingerprint.fingerprint)
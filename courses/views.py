@@ -2,12 +2,10 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.views.generic import ListView, DetailView, View
-from django.db.models import Prefetch
+from django.db.models import Count, Prefetch
 from django.http import HttpResponse
 from django.template.loader import render_to_string
 from .models import Course, Chapter, ContentBlock, ChapterAssignment
-import markdown
-import bleach
 import json
 from datetime import datetime
 
@@ -19,19 +17,24 @@ class CourseListView(LoginRequiredMixin, ListView):
     context_object_name = 'courses'
     
     def get_queryset(self):
+        chapters = Chapter.objects.filter(is_published=True)
+        if self.request.user.is_student:
+            chapters = chapters.with_completion(self.request.user)
         return Course.objects.filter(is_published=True).prefetch_related(
-            Prefetch('chapters', queryset=Chapter.objects.filter(is_published=True))
+            Prefetch('chapters', queryset=chapters)
         )
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
         
-        # Add completion stats for each chapter
+        # Completion comes from the annotated chapters, no extra queries
         if user.is_student:
             for course in context['courses']:
-                for chapter in course.chapters.all():
-                    chapter.completion = chapter.get_completion_for_user(user)
+                chapters = course.chapters.all()
+                total = sum(chapter.exercise_total for chapter in chapters)
+                passed = sum(chapter.exercises_passed for chapter in chapters)
+                course.completion = int((passed / total) * 100) if total else 0
         
         return context
 
@@ -45,24 +48,21 @@ class CourseDetailView(LoginRequiredMixin, DetailView):
     slug_url_kwarg = 'slug'
 
     def get_queryset(self):
+        chapters = Chapter.objects.filter(is_published=True).order_by('order')
+        if self.request.user.is_student:
+            chapters = chapters.with_completion(self.request.user)
+        else:
+            chapters = chapters.annotate(exercise_total=Count('exercises', distinct=True))
+        chapters = chapters.annotate(block_total=Count('content_blocks', distinct=True))
         return Course.objects.filter(is_published=True).prefetch_related(
-            Prefetch('chapters', queryset=Chapter.objects.filter(is_published=True).order_by('order'))
+            Prefetch('chapters', queryset=chapters)
         )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        course = self.object
 
-        # Get chapters ordered by order field
-        chapters = course.chapters.all().order_by('order')
-        
-        # Add completion stats for each chapter
-        if user.is_student:
-            for chapter in chapters:
-                chapter.completion = chapter.get_completion_for_user(user)
-        
-        context['chapters'] = chapters
+        # Chapters are prefetched in order with their completion annotations
+        context['chapters'] = self.object.chapters.all()
         return context
 
 
@@ -92,26 +92,12 @@ class ChapterDetailView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         chapter = self.object
         
-        # Get content blocks with rendered markdown
+        # Get content blocks with rendered markdown (cached in each block)
         content_blocks = []
         for block in chapter.content_blocks.all():
-            # Convert markdown to HTML
-            html_content = markdown.markdown(
-                block.content_markdown,
-                extensions=['fenced_code', 'codehilite', 'tables']
-            )
-            # Sanitize HTML
-            safe_html = bleach.clean(
-                html_content,
-                tags=['p', 'br', 'strong', 'em', 'u', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-                      'ul', 'ol', 'li', 'a', 'code', 'pre', 'blockquote', 'table', 'thead',
-                      'tbody', 'tr', 'th', 'td', 'div', 'span'],
-                attributes={'a': ['href', 'title'], 'code': ['class'], 'pre': ['class'], 
-                           'div': ['class'], 'span': ['class']}
-            )
             content_blocks.append({
                 'block': block,
-                'html_content': safe_html
+                'html_content': block.get_rendered_html()
             })
         
         context['content_blocks'] = content_blocks
@@ -1,15 +1,26 @@
 from django.contrib import admin
 from .models import (
-    Exercise, Attempt, Hint, HintUsage,
+    Exercise, Attempt, AttemptArchive, Hint, HintUsage,
     Assessment, AssessmentQuestion, AssessmentResult, ClassroomAssessmentStats
 )
 
 
 @admin.register(Exercise)
 class ExerciseAdmin(admin.ModelAdmin):
-    list_display = ['title', 'type', 'chapter', 'xp_reward', 'order', 'is_published']
+    list_display = ['title', 'type', 'chapter', 'xp_reward', 'order', 'is_published', 'attempt_total', 'success_rate']
     list_filter = ['type', 'is_published', 'chapter__course']
     search_fields = ['title', 'statement_markdown']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('chapter__course').with_stats()
+    
+    @admin.display(description='Tentatives', ordering='attempt_total')
+    def attempt_total(self, obj):
+        return obj.attempt_total
+    
+    @admin.display(description='Taux de réussite')
+    def success_rate(self, obj):
+        return f"{obj.get_success_rate()}%"
 
 
 @admin.register(Attempt)
@@ -17,7 +28,17 @@ class AttemptAdmin(admin.ModelAdmin):
     list_display = ['user', 'exercise', 'passed', 'score', 'created_at']
     list_filter = ['passed', 'exercise__type', 'created_at']
     search_fields = ['user__username', 'user__pseudo', 'exercise__title']
-    readonly_fields = ['created_at']
+    exclude = ['code_blob']
+    readonly_fields = ['code', 'created_at']
+
+
+@admin.register(AttemptArchive)
+class AttemptArchiveAdmin(admin.ModelAdmin):
+    list_display = ['user', 'exercise', 'school_year', 'attempt_count', 'pass_count', 'best_score', 'archived_at']
+    list_filter = ['school_year']
+    search_fields = ['user__username', 'user__pseudo', 'exercise__title']
+    exclude = ['data']
+    readonly_fields = ['archived_at']
 
 
 @admin.register(Hint)
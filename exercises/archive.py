@@ -0,0 +1,126 @@
+"""
+Retention of old attempts.
+
+Attempts made before the oldest school year kept live are moved into
+AttemptArchive, one row per user, exercise and school year, holding the
+aggregates and the compressed attempts. Progress, counters and XP do not
+read the Attempt table, so archiving changes nothing for students: it
+only keeps the live table to the current school year(s).
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from exercises.models import Attempt, AttemptArchive, CodeBlob
+
+
+ARCHIVED_FIELDS = ['id', 'passed', 'score', 'attempt_data', 'code_blob_id', 'created_at']
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def school_year(day):
+    """Year in which the school year containing day started"""
+    month, first_day = _setting('SCHOOL_YEAR_START', (9, 1))
+    return day.year if (day.month, day.day) >= (month, first_day) else day.year - 1
+
+
+def retention_cutoff(today=None, keep_years=None):
+    """Start of the oldest school year kept in the live table"""
+    if today is None:
+        today = timezone.localdate()
+    if keep_years is None:
+        keep_years = _setting('ATTEMPT_RETENTION_YEARS', 1)
+    month, day = _setting('SCHOOL_YEAR_START', (9, 1))
+    year = school_year(today) - max(keep_years, 1) + 1
+    return timezone.make_aware(datetime(year, month, day))
+
+
+def _merge(archive, attempts):
+    """Fold attempts, oldest first, into an archive row"""
+    passed = [attempt for attempt in attempts if attempt['passed']]
+    first_passed_at = passed[0]['created_at'] if passed else None
+    if archive.pk is None:
+        archive.first_attempt_at = attempts[0]['created_at']
+        archive.last_attempt_at = attempts[-1]['created_at']
+        archive.first_passed_at = first_passed_at
+    else:
+        archive.first_attempt_at = min(archive.first_attempt_at, attempts[0]['created_at'])
+        archive.last_attempt_at = max(archive.last_attempt_at, attempts[-1]['created_at'])
+        if first_passed_at and (archive.first_passed_at is None or first_passed_at < archive.first_passed_at):
+            archive.first_passed_at = first_passed_at
+    archive.attempt_count += len(attempts)
+    archive.pass_count += len(passed)
+    archive.best_score = max([archive.best_score] + [attempt['score'] for attempt in attempts])
+    archive.attempts = sorted(
+        archive.attempts + [{field: attempt[field] for field in ARCHIVED_FIELDS} for attempt in attempts],
+        key=lambda attempt: attempt['id']
+    )
+
+
+def archive_attempts(cutoff, chunk_size=1000):
+    """Move the attempts created before cutoff into the archive
+
+    Each chunk is archived and deleted in its own transaction, so the
+    command can be interrupted and run again. Returns the number of
+    attempts archived.
+    """
+    old = Attempt.objects.filter(created_at__lt=cutoff).order_by('pk').values(
+        'user_id', 'exercise_id', *ARCHIVED_FIELDS
+    )
+    archived = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(old[:chunk_size])
+            if not chunk:
+                break
+
+            groups = {}
+            for attempt in chunk:
+                year = school_year(timezone.localdate(attempt['created_at']))
+                groups.setdefault((attempt['user_id'], attempt['exercise_id'], year), []).append(attempt)
+
+            existing = {
+                (archive.user_id, archive.exercise_id, archive.school_year): archive
+                for archive in AttemptArchive.objects.select_for_update().filter(
+                    user_id__in={key[0] for key in groups},
+                    exercise_id__in={key[1] for key in groups},
+                    school_year__in={key[2] for key in groups},
+                )
+            }
+            created, updated = [], []
+            for (user_id, exercise_id, year), attempts in groups.items():
+                archive = existing.get((user_id, exercise_id, year))
+                if archive is None:
+                    archive = AttemptArchive(user_id=user_id, exercise_id=exercise_id, school_year=year)
+                    created.append(archive)
+                else:
+                    updated.append(archive)
+                _merge(archive, attempts)
+
+            AttemptArchive.objects.bulk_create(created)
+            AttemptArchive.objects.bulk_update(updated, [
+                'attempt_count', 'pass_count', 'best_score', 'first_passed_at',
+                'first_attempt_at', 'last_attempt_at', 'data'
+            ])
+            Attempt.objects.filter(pk__in=[attempt['id'] for attempt in chunk]).delete()
+        archived += len(chunk)
+    return archived
+
+
+def archived_history(user, exercise):
+    """Archived attempts of a user on an exercise with their code, oldest first"""
+    attempts = [
+        attempt
+        for archive in AttemptArchive.objects.filter(user=user, exercise=exercise).order_by('school_year')
+        for attempt in archive.attempts
+    ]
+    blobs = CodeBlob.objects.resolve({attempt['code_blob_id'] for attempt in attempts})
+    for attempt in attempts:
+        blob = blobs.get(attempt['code_blob_id'])
+        attempt['code'] = blob.code if blob else attempt['attempt_data'].get('code')
+    return attempts
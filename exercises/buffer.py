@@ -0,0 +1,179 @@
+"""
+Write-behind buffer for failed attempts.
+
+When a whole class submits at once, every request used to pay for its
+own INSERT and commit. With ATTEMPT_WRITE_BEHIND enabled, attempts that
+did not pass are kept in memory by the worker process and written by a
+background thread with one bulk_create every ATTEMPT_BUFFER_FLUSH_MS, or
+as soon as ATTEMPT_BUFFER_MAX_ROWS are waiting. Passing attempts are
+still written synchronously since they decide the first pass and the XP.
+
+Durability bound: a worker killed without a clean shutdown loses at most
+the failed attempts of the last flush interval. Buffered rows are
+flushed when the worker exits normally. When a batch cannot be written,
+its rows are retried one by one and the rows that still fail (deleted
+exercise or user) are logged and dropped. If the database itself is
+unreachable, the rows are kept, and no more than
+ATTEMPT_BUFFER_MAX_PENDING rows are held: past that, attempts are written
+synchronously again.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, connection, transaction
+
+from exercises.models import Attempt, ExerciseStatsShard, UserExerciseProgress
+
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def write_attempts(attempts):
+    """Save failed attempts of any users and fold them into progress and counters"""
+    with transaction.atomic():
+        Attempt.objects.bulk_create(attempts)
+
+        groups = {}
+        for attempt in attempts:
+            groups.setdefault((attempt.user_id, attempt.exercise_id), []).append(attempt)
+        for (user_id, exercise_id), group in groups.items():
+            UserExerciseProgress.objects.record_attempts(group)
+            ExerciseStatsShard.objects.record_attempts(exercise_id, group)
+
+
+def _copy(attempt):
+    # Writing sets the pk and the code blob of the instances, which a
+    # rolled back write leaves pointing at rows that do not exist
+    return Attempt(
+        user_id=attempt.user_id,
+        exercise_id=attempt.exercise_id,
+        passed=attempt.passed,
+        score=attempt.score,
+        attempt_data=attempt.attempt_data,
+    )
+
+
+class AttemptBuffer:
+    """Per-process queue of failed attempts flushed by a background thread"""
+
+    def __init__(self, background=True):
+        self.background = background
+        self._rows = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def flush_interval(self):
+        return _setting('ATTEMPT_BUFFER_FLUSH_MS', 200) / 1000
+
+    @property
+    def max_rows(self):
+        return _setting('ATTEMPT_BUFFER_MAX_ROWS', 100)
+
+    @property
+    def max_pending(self):
+        return _setting('ATTEMPT_BUFFER_MAX_PENDING', 1000)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, attempt):
+        """Queue a failed attempt, False when the caller must write it itself"""
+        if attempt.passed:
+            return False
+        with self._lock:
+            if len(self._rows) >= self.max_pending:
+                return False
+            self._rows.append(attempt)
+            full = len(self._rows) >= self.max_rows
+        if self.background:
+            self._ensure_flusher()
+            if full:
+                self._wake.set()
+        return True
+
+    def flush(self):
+        """Write every buffered attempt now, returns the number written"""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            try:
+                write_attempts([_copy(attempt) for attempt in rows])
+                return len(rows)
+            except (OperationalError, InterfaceError):
+                self._requeue(rows)
+                raise
+            except Exception:
+                logger.warning('Could not write %d buffered attempts, retrying one by one', len(rows), exc_info=True)
+            return self._write_one_by_one(rows)
+
+    def _write_one_by_one(self, rows):
+        written = 0
+        for i, attempt in enumerate(rows):
+            try:
+                write_attempts([_copy(attempt)])
+                written += 1
+            except (OperationalError, InterfaceError):
+                self._requeue(rows[i:])
+                raise
+            except Exception:
+                logger.exception(
+                    'Dropping buffered attempt of user %s on exercise %s',
+                    attempt.user_id, attempt.exercise_id
+                )
+        return written
+
+    def _requeue(self, rows):
+        # Keep the rows for the next flush, in submission order
+        with self._lock:
+            self._rows[:0] = rows
+
+    def close(self):
+        """Stop the flusher and write what is left"""
+        self._thread = None
+        self._wake.set()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Could not flush %d buffered attempts at shutdown', len(self))
+
+    def _ensure_flusher(self):
+        # A forked worker does not inherit the parent's thread
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid is None:
+                atexit.register(self.close)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='attempt-buffer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        me = threading.current_thread()
+        while self._thread is me:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not flush %d buffered attempts', len(self))
+            finally:
+                # This thread holds its own connection
+                connection.close_if_unusable_or_obsolete()
+
+
+attempt_buffer = AttemptBuffer()
@@ -0,0 +1,36 @@
+"""
+Line-based deltas between two versions of submitted code.
+
+A delta is a list of operations applied in order: [start, end] copies
+lines start to end of the previous version, a string inserts new text.
+Consecutive attempts usually change a few lines, so a delta is a handful
+of copies around the edited lines.
+"""
+from difflib import SequenceMatcher
+
+
+def diff_code(old, new):
+    """Delta turning old into new"""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append(''.join(new_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(old, ops):
+    """Rebuild the new version from old and a delta"""
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            start, end = op
+            parts.extend(old_lines[start:end])
+    return ''.join(parts)
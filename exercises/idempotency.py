@@ -0,0 +1,89 @@
+"""
+Idempotency keys for the AJAX endpoints that write attempts or XP.
+
+A client sends the same Idempotency-Key header when it retries a POST.
+The first request stores its JSON response under (user, key); replays
+within IDEMPOTENCY_KEY_TTL get that stored response back without running
+the view again. The key row is inserted in the same transaction as the
+view's writes, so a concurrent duplicate waits on the unique constraint
+and then replays the winner's response.
+"""
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse
+from django.utils import timezone
+
+from exercises.models import IdempotencyKey
+
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 64
+
+
+def _cutoff():
+    return timezone.now() - timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 3600))
+
+
+def _replay(record, endpoint):
+    if record.endpoint != endpoint:
+        return JsonResponse({
+            'success': False,
+            'error': 'Clé d\'idempotence déjà utilisée pour une autre requête'
+        }, status=422)
+    if record.status_code is None:
+        return JsonResponse({
+            'success': False,
+            'error': 'Requête déjà en cours de traitement'
+        }, status=409)
+    response = JsonResponse(record.response, status=record.status_code, safe=False)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def purge_expired_keys():
+    """Delete the keys older than the replay window"""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=_cutoff()).delete()
+    return deleted
+
+
+class IdempotentMixin:
+    """Make POST requests carrying an Idempotency-Key header replayable
+
+    Must come after LoginRequiredMixin. Only successful responses are
+    stored; an error releases the key so the client can retry.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if request.method != 'POST' or not key or not request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return JsonResponse({'success': False, 'error': 'Clé d\'idempotence invalide'}, status=400)
+
+        keys = IdempotencyKey.objects.filter(user=request.user, key=key)
+        record = keys.filter(created_at__gte=_cutoff()).first()
+        if record is not None:
+            return _replay(record, request.path)
+
+        try:
+            with transaction.atomic():
+                # An expired key may be reused
+                keys.delete()
+                record = IdempotencyKey.objects.create(user=request.user, key=key, endpoint=request.path)
+                response = super().dispatch(request, *args, **kwargs)
+                if response.status_code >= 400:
+                    transaction.set_rollback(True)
+                    return response
+                record.status_code = response.status_code
+                record.response = json.loads(response.content)
+                record.save(update_fields=['status_code', 'response'])
+        except IntegrityError:
+            # A concurrent request with the same key committed first
+            record = keys.first()
+            if record is None:
+                raise
+            return _replay(record, request.path)
+        return response
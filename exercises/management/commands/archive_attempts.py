@@ -0,0 +1,43 @@
+"""
+Management command moving attempts of past school years into the archive
+"""
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from exercises.archive import archive_attempts, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = 'Archive the attempts older than the retention period (ATTEMPT_RETENTION_YEARS school years)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-years',
+            type=int,
+            help='Number of school years kept live, the current one included'
+        )
+        parser.add_argument(
+            '--before',
+            help='Archive the attempts made before this date (YYYY-MM-DD) instead'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of attempts archived per transaction'
+        )
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                before = date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError('--before must be a date like 2025-09-01')
+            cutoff = timezone.make_aware(datetime.combine(before, datetime.min.time()))
+        else:
+            cutoff = retention_cutoff(keep_years=options['keep_years'])
+
+        self.stdout.write(f'Archiving attempts made before {cutoff:%Y-%m-%d}')
+        archived = archive_attempts(cutoff, options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'✓ {archived} attempts archived'))
@@ -0,0 +1,100 @@
+"""
+Management command to build per-user exercise and chapter progress from existing attempts
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from accounts.models import User
+from courses.models import ChapterProgress
+from exercises.models import Attempt, AttemptArchive, UserExerciseProgress
+
+
+class Command(BaseCommand):
+    help = 'Rebuild UserExerciseProgress and ChapterProgress rows from the Attempt history and its archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of users processed per transaction'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        user_ids = User.objects.order_by('pk').values_list('pk', flat=True)
+
+        rows_written = 0
+        chapter_rows_written = 0
+        last_pk = 0
+        while True:
+            chunk = list(user_ids.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1]
+
+            summaries = Attempt.objects.filter(user_id__in=chunk).values(
+                'user_id', 'exercise_id'
+            ).annotate(
+                attempt_count=Count('pk'),
+                best_score=Max('score'),
+                first_passed_at=Min('created_at', filter=Q(passed=True)),
+                first_pass_attempt_id=Min('pk', filter=Q(passed=True)),
+                last_attempt_at=Max('created_at'),
+            ).order_by()
+
+            rows = [
+                UserExerciseProgress(**summary)
+                for summary in self._with_archives(chunk, summaries)
+            ]
+            with transaction.atomic():
+                UserExerciseProgress.objects.bulk_create(
+                    rows,
+                    batch_size=1000,
+                    update_conflicts=True,
+                    unique_fields=['user', 'exercise'],
+                    update_fields=[
+                        'attempt_count', 'best_score', 'first_passed_at', 'first_pass_attempt', 'last_attempt_at'
+                    ],
+                )
+                chapter_rows = self._chapter_rollups(chunk)
+                ChapterProgress.objects.filter(user_id__in=chunk).delete()
+                ChapterProgress.objects.bulk_create(chapter_rows, batch_size=1000)
+            rows_written += len(rows)
+            chapter_rows_written += len(chapter_rows)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ {rows_written} exercise progress rows rebuilt'))
+        self.stdout.write(self.style.SUCCESS(f'✓ {chapter_rows_written} chapter progress rows rebuilt'))
+
+    def _with_archives(self, user_ids, summaries):
+        """Add the archived attempts of past school years to the live summaries"""
+        merged = {(row['user_id'], row['exercise_id']): row for row in summaries}
+        archived = AttemptArchive.objects.filter(user_id__in=user_ids).values(
+            'user_id', 'exercise_id'
+        ).annotate(
+            attempt_count=Sum('attempt_count'),
+            best_score=Max('best_score'),
+            first_passed_at=Min('first_passed_at'),
+            last_attempt_at=Max('last_attempt_at'),
+        ).order_by()
+        for row in archived:
+            live = merged.get((row['user_id'], row['exercise_id']))
+            if live is None:
+                merged[row['user_id'], row['exercise_id']] = dict(row, first_pass_attempt_id=None)
+                continue
+            live['attempt_count'] += row['attempt_count']
+            live['best_score'] = max(live['best_score'], row['best_score'])
+            # Archived attempts are older than the live ones
+            if row['first_passed_at'] is not None:
+                live['first_passed_at'] = row['first_passed_at']
+                live['first_pass_attempt_id'] = None
+        return merged.values()
+
+    def _chapter_rollups(self, user_ids):
+        """Chapter completion counts derived from the exercise progress rows"""
+        rollups = UserExerciseProgress.objects.passed().filter(
+            user_id__in=user_ids
+        ).values('user_id', chapter_id=F('exercise__chapter_id')).annotate(
+            exercises_passed=Count('pk')
+        ).order_by()
+        return [ChapterProgress(**rollup) for rollup in rollups]
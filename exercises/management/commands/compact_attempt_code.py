@@ -0,0 +1,45 @@
+"""
+Management command moving the code stored in Attempt.attempt_data into CodeBlob rows
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from exercises.models import Attempt, CodeBlob
+
+
+class Command(BaseCommand):
+    help = 'Move submitted code out of existing attempts into deduplicated, compressed blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of attempts converted per transaction'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        pending = Attempt.objects.filter(
+            code_blob__isnull=True,
+            attempt_data__has_key='code'
+        ).order_by('pk').only('pk', 'user_id', 'exercise_id', 'attempt_data', 'code_blob')
+
+        converted = 0
+        blobs = 0
+        last_pk = 0
+        while True:
+            chunk = list(pending.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+
+            with transaction.atomic():
+                blobs += CodeBlob.objects.attach(chunk)
+                attempts = [attempt for attempt in chunk if attempt.code_blob_id]
+                Attempt.objects.bulk_update(attempts, ['attempt_data', 'code_blob'])
+            converted += len(attempts)
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'  {converted} attempts converted (last id {last_pk})')
+
+        self.stdout.write(self.style.SUCCESS(f'✓ {converted} attempts converted'))
+        self.stdout.write(self.style.SUCCESS(f'✓ {CodeBlob.objects.count()} distinct code blobs stored'))
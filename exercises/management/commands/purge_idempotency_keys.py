@@ -0,0 +1,13 @@
+"""
+Management command to delete idempotency keys older than the replay window
+"""
+from django.core.management.base import BaseCommand
+from exercises.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = 'Delete stored idempotency keys older than IDEMPOTENCY_KEY_TTL'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys()
+        self.stdout.write(self.style.SUCCESS(f'✓ {deleted} expired idempotency keys deleted'))
@@ -0,0 +1,31 @@
+"""
+Management command to recompute exercise attempt/pass counters from scratch
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from exercises.models import Attempt, AttemptArchive, ExerciseStatsShard
+
+
+class Command(BaseCommand):
+    help = 'Recompute the sharded exercise attempt/pass counters from the Attempt table and its archive'
+
+    def handle(self, *args, **options):
+        totals = Attempt.objects.values('exercise_id').annotate(
+            attempt_count=Count('pk'),
+            pass_count=Count('pk', filter=Q(passed=True)),
+        ).order_by()
+        archived = AttemptArchive.objects.values('exercise_id').annotate(
+            attempt_count=Sum('attempt_count'),
+            pass_count=Sum('pass_count'),
+        ).order_by()
+        # Archived attempts are counted on a shard of their own
+        shards = [ExerciseStatsShard(shard=0, **row) for row in totals]
+        shards += [ExerciseStatsShard(shard=1, **row) for row in archived]
+
+        with transaction.atomic():
+            ExerciseStatsShard.objects.all().delete()
+            ExerciseStatsShard.objects.bulk_create(shards, batch_size=1000)
+
+        exercises = len({shard.exercise_id for shard in shards})
+        self.stdout.write(self.style.SUCCESS(f'✓ Counters rebuilt for {exercises} exercises'))
@@ -0,0 +1,34 @@
+# Generated by Django 5.0 on 2026-10-17 22:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exercises', '0002_add_assessment_models'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserExerciseProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_passed_at', models.DateTimeField(blank=True, null=True, verbose_name='Réussi pour la première fois le')),
+                ('best_score', models.IntegerField(default=0, verbose_name='Meilleur score')),
+                ('attempt_count', models.IntegerField(default=0, verbose_name='Nombre de tentatives')),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True, verbose_name='Dernière tentative')),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='exercises.exercise')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exercise_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Progression sur un exercice',
+                'verbose_name_plural': 'Progressions sur les exercices',
+                'indexes': [models.Index(fields=['user', 'first_passed_at'], name='exercises_u_user_id_fa1a3c_idx')],
+                'unique_together': {('user', 'exercise')},
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0 on 2026-10-17 22:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    Attempt = apps.get_model('exercises', 'Attempt')
+    ExerciseStatsShard = apps.get_model('exercises', 'ExerciseStatsShard')
+    totals = Attempt.objects.values('exercise_id').annotate(
+        attempt_count=models.Count('pk'),
+        pass_count=models.Count('pk', filter=models.Q(passed=True)),
+    ).order_by()
+    ExerciseStatsShard.objects.bulk_create(
+        [ExerciseStatsShard(shard=0, **row) for row in totals],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exercises', '0003_user_exercise_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExerciseStatsShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField(verbose_name='Shard')),
+                ('attempt_count', models.IntegerField(default=0, verbose_name='Tentatives')),
+                ('pass_count', models.IntegerField(default=0, verbose_name='Réussites')),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats_shards', to='exercises.exercise')),
+            ],
+            options={
+                'verbose_name': "Compteur d'exercice",
+                'verbose_name_plural': "Compteurs d'exercices",
+                'unique_together': {('exercise', 'shard')},
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
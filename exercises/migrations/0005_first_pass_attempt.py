@@ -0,0 +1,34 @@
+# Generated by Django 5.0 on 2026-10-17 22:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def set_first_pass_attempts(apps, schema_editor):
+    Attempt = apps.get_model('exercises', 'Attempt')
+    UserExerciseProgress = apps.get_model('exercises', 'UserExerciseProgress')
+    first_pass = Attempt.objects.filter(
+        user_id=OuterRef('user_id'),
+        exercise_id=OuterRef('exercise_id'),
+        passed=True
+    ).order_by('created_at', 'pk').values('pk')[:1]
+    UserExerciseProgress.objects.filter(first_passed_at__isnull=False).update(
+        first_pass_attempt=Subquery(first_pass)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exercises', '0004_exercise_stats_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userexerciseprogress',
+            name='first_pass_attempt',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='exercises.attempt', verbose_name='Première tentative réussie'),
+        ),
+        migrations.RunPython(set_first_pass_attempts, migrations.RunPython.noop),
+    ]
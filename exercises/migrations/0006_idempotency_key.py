@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-17 22:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exercises', '0005_first_pass_attempt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, verbose_name='Clé')),
+                ('endpoint', models.CharField(max_length=200, verbose_name="Point d'accès")),
+                ('status_code', models.IntegerField(blank=True, null=True, verbose_name='Code HTTP')),
+                ('response', models.JSONField(blank=True, null=True, verbose_name='Réponse')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='idempotency_keys', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': "Clé d'idempotence",
+                'verbose_name_plural': "Clés d'idempotence",
+                'unique_together': {('user', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0 on 2026-10-17 22:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exercises', '0006_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeBlob',
+            fields=[
+                ('hash', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Empreinte SHA-256')),
+                ('data', models.BinaryField(verbose_name='Code compressé')),
+                ('size', models.PositiveIntegerField(verbose_name='Taille (octets)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Code soumis',
+                'verbose_name_plural': 'Codes soumis',
+            },
+        ),
+        migrations.AlterField(
+            model_name='attempt',
+            name='attempt_data',
+            field=models.JSONField(default=dict, help_text='Réponses, temps passé, etc. Le code soumis est dans code_blob', verbose_name='Données de la tentative'),
+        ),
+        migrations.AddField(
+            model_name='attempt',
+            name='code_blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='attempts', to='exercises.codeblob', verbose_name='Code soumis'),
+        ),
+    ]
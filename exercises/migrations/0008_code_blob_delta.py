@@ -0,0 +1,29 @@
+# Generated by Django 5.0 on 2026-10-17 22:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exercises', '0007_code_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codeblob',
+            name='base',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='exercises.codeblob', verbose_name='Version de référence'),
+        ),
+        migrations.AddField(
+            model_name='codeblob',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Deltas depuis la version complète'),
+        ),
+        migrations.AlterField(
+            model_name='codeblob',
+            name='data',
+            field=models.BinaryField(verbose_name='Code ou delta compressé'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0 on 2026-10-17 22:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exercises', '0008_code_blob_delta'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttemptArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('school_year', models.PositiveSmallIntegerField(verbose_name='Année scolaire (année de rentrée)')),
+                ('attempt_count', models.IntegerField(default=0, verbose_name='Tentatives')),
+                ('pass_count', models.IntegerField(default=0, verbose_name='Réussites')),
+                ('best_score', models.IntegerField(default=0, verbose_name='Meilleur score')),
+                ('first_passed_at', models.DateTimeField(blank=True, null=True, verbose_name='Réussi pour la première fois le')),
+                ('first_attempt_at', models.DateTimeField(verbose_name='Première tentative')),
+                ('last_attempt_at', models.DateTimeField(verbose_name='Dernière tentative')),
+                ('data', models.BinaryField(verbose_name='Tentatives compressées')),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attempts', to='exercises.exercise')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attempts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archive de tentatives',
+                'verbose_name_plural': 'Archives de tentatives',
+                'indexes': [models.Index(fields=['school_year'], name='exercises_a_school__2abf9b_idx')],
+                'unique_together': {('user', 'exercise', 'school_year')},
+            },
+        ),
+    ]
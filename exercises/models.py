@@ -1,4 +1,31 @@
-from django.db import models
+import hashlib
+import json
+import random
+import zlib
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models
+from django.db.models import Max, Sum
+from django.db.models.functions import Coalesce
+
+from exercises.delta import diff_code, apply_delta
+
+
+class ExerciseQuerySet(models.QuerySet):
+    def with_stats(self):
+        """Annotate attempt and pass totals from the sharded counters"""
+        return self.annotate(
+            attempt_total=Coalesce(Sum('stats_shards__attempt_count'), 0),
+            pass_total=Coalesce(Sum('stats_shards__pass_count'), 0),
+        )
+
+
+def compute_success_rate(pass_total, attempt_total):
+    """Success rate in percent"""
+    if attempt_total == 0:
+        return 0
+    return int((pass_total / attempt_total) * 100)
 
 
 class Exercise(models.Model):
@@ -34,6 +61,8 @@ class Exercise(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ExerciseQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Exercice'
         verbose_name_plural = 'Exercices'
@@ -44,15 +73,196 @@ class Exercise(models.Model):
     
     def get_success_rate(self):
         """Calculate success rate for this exercise"""
-        attempts = self.attempts.count()
-        if attempts == 0:
-            return 0
-        passed = self.attempts.filter(passed=True).count()
-        return int((passed / attempts) * 100)
+        if not hasattr(self, 'attempt_total'):
+            totals = self.stats_shards.aggregate(
+                attempt_total=Coalesce(Sum('attempt_count'), 0),
+                pass_total=Coalesce(Sum('pass_count'), 0),
+            )
+            self.attempt_total = totals['attempt_total']
+            self.pass_total = totals['pass_total']
+        return compute_success_rate(self.pass_total, self.attempt_total)
     
     def has_user_passed(self, user):
         """Check if user has successfully completed this exercise"""
-        return self.attempts.filter(user=user, passed=True).exists()
+        return self.progress.passed().filter(user=user).exists()
+
+
+class CodeBlobManager(models.Manager):
+    def resolve(self, hashes):
+        """Blobs by hash with their code decoded
+
+        Deltas are taken against their keyframe, so two queries load any
+        blob: the blobs, then their keyframes. Blobs written before that
+        chained deltas, whose bases are loaded one level per query. Every
+        blob is decoded once even when several deltas share a base.
+        """
+        blobs = {}
+        missing = set(hashes) - {None}
+        while missing:
+            fetched = self.filter(pk__in=missing).in_bulk()
+            blobs.update(fetched)
+            missing = {blob.base_id for blob in fetched.values() if blob.base_id} - blobs.keys()
+        for blob in sorted(blobs.values(), key=lambda blob: blob.depth):
+            if blob.base_id:
+                blob.base = blobs[blob.base_id]
+            blob.decode()
+        return blobs
+    
+    def _previous_blobs(self, attempts):
+        """Hash of the code last submitted by each (user, exercise) of the attempts"""
+        pairs = {(attempt.user_id, attempt.exercise_id) for attempt in attempts}
+        previous = Attempt.objects.filter(
+            user_id__in={user_id for user_id, _ in pairs},
+            exercise_id__in={exercise_id for _, exercise_id in pairs},
+            code_blob__isnull=False
+        )
+        saved = [attempt.pk for attempt in attempts if attempt.pk]
+        if saved:
+            previous = previous.filter(pk__lt=min(saved))
+        last_ids = previous.values('user_id', 'exercise_id').annotate(last=Max('pk')).values('last')
+        return {
+            (user_id, exercise_id): code_blob_id
+            for user_id, exercise_id, code_blob_id in Attempt.objects.filter(pk__in=last_ids).values_list(
+                'user_id', 'exercise_id', 'code_blob_id'
+            )
+            if (user_id, exercise_id) in pairs
+        }
+    
+    def attach(self, attempts):
+        """Move the submitted code of attempts into deduplicated blobs
+
+        The code is popped from attempt_data and replaced by a reference to
+        the blob holding it; identical submissions share one blob. New code
+        is stored as a delta against the keyframe of the student's previous
+        submission on the same exercise. Attempts must be in submission
+        order.
+        """
+        pending = []
+        for attempt in attempts:
+            code = attempt.attempt_data.get('code') if isinstance(attempt.attempt_data, dict) else None
+            if isinstance(code, str):
+                pending.append((attempt, code, CodeBlob.hash_code(code)))
+        if not pending:
+            return 0
+        
+        previous = self._previous_blobs([attempt for attempt, _, _ in pending])
+        blobs = self.resolve({digest for _, _, digest in pending} | set(previous.values()))
+        latest = {pair: blobs.get(digest) for pair, digest in previous.items()}
+        created = {}
+        for attempt, code, digest in pending:
+            blob = blobs.get(digest)
+            if blob is None:
+                blob = self.model.encode(code, previous=latest.get((attempt.user_id, attempt.exercise_id)))
+                blobs[digest] = created[digest] = blob
+            latest[attempt.user_id, attempt.exercise_id] = blob
+            attempt.attempt_data = {k: v for k, v in attempt.attempt_data.items() if k != 'code'}
+            attempt.code_blob = blob
+        if created:
+            self.bulk_create(sorted(created.values(), key=lambda blob: blob.depth), ignore_conflicts=True)
+        return len(created)
+
+
+class CodeBlob(models.Model):
+    """Compressed submitted code, stored once per distinct content
+    
+    A keyframe holds the whole code. Other blobs hold a delta against a
+    keyframe, their base, and depth counts the versions submitted since
+    it: a new keyframe is stored every CODE_KEYFRAME_INTERVAL versions.
+    """
+    
+    hash = models.CharField(max_length=64, primary_key=True, verbose_name='Empreinte SHA-256')
+    data = models.BinaryField(verbose_name='Code ou delta compressé')
+    base = models.ForeignKey(
+        'self',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Version de référence'
+    )
+    depth = models.PositiveSmallIntegerField(default=0, verbose_name='Deltas depuis la version complète')
+    size = models.PositiveIntegerField(verbose_name='Taille (octets)')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    objects = CodeBlobManager()
+    
+    class Meta:
+        verbose_name = 'Code soumis'
+        verbose_name_plural = 'Codes soumis'
+    
+    def __str__(self):
+        return f"{self.hash[:12]} ({self.size} o)"
+    
+    @staticmethod
+    def hash_code(code):
+        return hashlib.sha256(code.encode('utf-8', 'surrogatepass')).hexdigest()
+    
+    @classmethod
+    def encode(cls, code, previous=None):
+        """Unsaved blob for a piece of code, a delta against the keyframe of
+        the previous version when that is smaller"""
+        raw = code.encode('utf-8', 'surrogatepass')
+        blob = cls(hash=hashlib.sha256(raw).hexdigest(), data=zlib.compress(raw), size=len(raw))
+        interval = getattr(settings, 'CODE_KEYFRAME_INTERVAL', 10)
+        if previous is not None and previous.depth + 1 < interval:
+            base = previous if previous.is_keyframe else previous.base
+            delta = zlib.compress(json.dumps(diff_code(base.code, code)).encode())
+            if len(delta) < len(blob.data):
+                blob.data, blob.base, blob.depth = delta, base, previous.depth + 1
+        blob._code = code
+        return blob
+    
+    @property
+    def is_keyframe(self):
+        return self.base_id is None
+    
+    def decode(self):
+        """Rebuild the code, from the decoded base blob for a delta"""
+        data = zlib.decompress(bytes(self.data))
+        if self.is_keyframe:
+            self._code = data.decode('utf-8', 'surrogatepass')
+        else:
+            self._code = apply_delta(self.base.code, json.loads(data))
+        return self._code
+    
+    @property
+    def code(self):
+        if not hasattr(self, '_code'):
+            if self.is_keyframe:
+                self.decode()
+            else:
+                self._code = CodeBlob.objects.resolve([self.pk])[self.pk].code
+        return self._code
+
+
+class AttemptQuerySet(models.QuerySet):
+    _with_code = False
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        CodeBlob.objects.attach(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+    
+    def with_code(self):
+        """Decode the submitted code of the fetched attempts in a few queries"""
+        clone = self._chain()
+        clone._with_code = True
+        return clone
+    
+    def _clone(self):
+        clone = super()._clone()
+        clone._with_code = self._with_code
+        return clone
+    
+    def _fetch_all(self):
+        fetching = self._result_cache is None
+        super()._fetch_all()
+        if fetching and self._with_code:
+            attempts = [attempt for attempt in self._result_cache if isinstance(attempt, Attempt)]
+            blobs = CodeBlob.objects.resolve({attempt.code_blob_id for attempt in attempts})
+            for attempt in attempts:
+                if attempt.code_blob_id in blobs:
+                    attempt.code_blob = blobs[attempt.code_blob_id]
 
 
 class Attempt(models.Model):
@@ -73,10 +283,20 @@ class Attempt(models.Model):
     attempt_data = models.JSONField(
         default=dict,
         verbose_name='Données de la tentative',
-        help_text='Code soumis, réponses, temps passé, etc.'
+        help_text='Réponses, temps passé, etc. Le code soumis est dans code_blob'
+    )
+    code_blob = models.ForeignKey(
+        CodeBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='attempts',
+        verbose_name='Code soumis'
     )
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = AttemptQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Tentative'
         verbose_name_plural = 'Tentatives'
@@ -88,6 +308,160 @@ class Attempt(models.Model):
     def __str__(self):
         status = "✓" if self.passed else "✗"
         return f"{status} {self.user} - {self.exercise.title} ({self.score}%)"
+    
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            CodeBlob.objects.attach([self])
+        super().save(*args, **kwargs)
+    
+    @property
+    def code(self):
+        """The submitted code, from the blob or from rows not yet compacted"""
+        if self.code_blob_id:
+            return self.code_blob.code
+        return self.attempt_data.get('code')
+
+
+class ExerciseStatsShardManager(models.Manager):
+    def record_attempt(self, attempt):
+        """Count an attempt on one randomly chosen shard of the exercise counters"""
+        self.record_attempts(attempt.exercise_id, [attempt])
+    
+    def record_attempts(self, exercise_id, attempts):
+        """Count attempts on one exercise with a single increment of a random shard
+
+        Spreading increments over several rows keeps class-wide bursts on
+        the same exercise from serializing on a single row lock.
+        """
+        shard = random.randrange(getattr(settings, 'EXERCISE_STATS_SHARDS', 8))
+        passed = sum(1 for attempt in attempts if attempt.passed)
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        sql = f"""
+            INSERT INTO {table} (exercise_id, shard, attempt_count, pass_count)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (exercise_id, shard) DO UPDATE SET
+                attempt_count = {table}.attempt_count + excluded.attempt_count,
+                pass_count = {table}.pass_count + excluded.pass_count
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [exercise_id, shard, len(attempts), passed])
+
+
+class ExerciseStatsShard(models.Model):
+    """One shard of the attempt/pass counters of an exercise"""
+    
+    exercise = models.ForeignKey(
+        Exercise,
+        on_delete=models.CASCADE,
+        related_name='stats_shards'
+    )
+    shard = models.PositiveSmallIntegerField(verbose_name='Shard')
+    attempt_count = models.IntegerField(default=0, verbose_name='Tentatives')
+    pass_count = models.IntegerField(default=0, verbose_name='Réussites')
+    
+    objects = ExerciseStatsShardManager()
+    
+    class Meta:
+        verbose_name = 'Compteur d\'exercice'
+        verbose_name_plural = 'Compteurs d\'exercices'
+        unique_together = ['exercise', 'shard']
+    
+    def __str__(self):
+        return f"{self.exercise.title} #{self.shard}: {self.pass_count}/{self.attempt_count}"
+
+
+class UserExerciseProgressQuerySet(models.QuerySet):
+    def passed(self):
+        return self.filter(first_passed_at__isnull=False)
+
+
+class UserExerciseProgressManager(models.Manager.from_queryset(UserExerciseProgressQuerySet)):
+    def record_attempt(self, attempt):
+        """Fold an attempt into the user's progress row, returns True on a first pass"""
+        return self.record_attempts([attempt]) is not None
+    
+    def record_attempts(self, attempts):
+        """Fold attempts of one user on one exercise into the progress row with a single upsert
+
+        Attempts must be saved and in submission order. Returns the attempt
+        that became the user's first pass, or None. The first passing
+        attempt is only set while first_passed_at is still empty, under the
+        row lock taken by the upsert, so among concurrent passing
+        submissions exactly one gets its own id back.
+        """
+        first_pass = next((attempt for attempt in attempts if attempt.passed), None)
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        sql = f"""
+            INSERT INTO {table}
+                (user_id, exercise_id, attempt_count, best_score, first_passed_at,
+                 first_pass_attempt_id, last_attempt_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (user_id, exercise_id) DO UPDATE SET
+                attempt_count = {table}.attempt_count + excluded.attempt_count,
+                best_score = CASE WHEN excluded.best_score > {table}.best_score
+                             THEN excluded.best_score ELSE {table}.best_score END,
+                first_pass_attempt_id = CASE WHEN {table}.first_passed_at IS NULL
+                             THEN excluded.first_pass_attempt_id ELSE {table}.first_pass_attempt_id END,
+                first_passed_at = COALESCE({table}.first_passed_at, excluded.first_passed_at),
+                last_attempt_at = excluded.last_attempt_at
+            RETURNING first_pass_attempt_id
+        """
+        params = [
+            attempts[0].user_id,
+            attempts[0].exercise_id,
+            len(attempts),
+            max(attempt.score for attempt in attempts),
+            first_pass.created_at if first_pass else None,
+            first_pass.pk if first_pass else None,
+            max(attempt.created_at for attempt in attempts),
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            first_pass_attempt_id, = cursor.fetchone()
+        if first_pass is not None and first_pass_attempt_id == first_pass.pk:
+            return first_pass
+        return None
+
+
+class UserExerciseProgress(models.Model):
+    """Per-user summary of the attempts made on an exercise"""
+    
+    user = models.ForeignKey(
+        'accounts.User',
+        on_delete=models.CASCADE,
+        related_name='exercise_progress'
+    )
+    exercise = models.ForeignKey(
+        Exercise,
+        on_delete=models.CASCADE,
+        related_name='progress'
+    )
+    first_passed_at = models.DateTimeField(null=True, blank=True, verbose_name='Réussi pour la première fois le')
+    first_pass_attempt = models.ForeignKey(
+        Attempt,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Première tentative réussie'
+    )
+    best_score = models.IntegerField(default=0, verbose_name='Meilleur score')
+    attempt_count = models.IntegerField(default=0, verbose_name='Nombre de tentatives')
+    last_attempt_at = models.DateTimeField(null=True, blank=True, verbose_name='Dernière tentative')
+    
+    objects = UserExerciseProgressManager()
+    
+    class Meta:
+        verbose_name = 'Progression sur un exercice'
+        verbose_name_plural = 'Progressions sur les exercices'
+        unique_together = ['user', 'exercise']
+        indexes = [
+            models.Index(fields=['user', 'first_passed_at']),
+        ]
+    
+    def __str__(self):
+        status = "✓" if self.first_passed_at else "✗"
+        return f"{status} {self.user} - {self.exercise.title} ({self.attempt_count} tentatives)"
 
 
 class Hint(models.Model):
@@ -287,3 +661,76 @@ class ClassroomAssessmentStats(models.Model):
     
     def __str__(self):
         return f'{self.classroom.name} - {self.assessment.title}: {self.average_score:.1f}%'
+
+
+class IdempotencyKey(models.Model):
+    """Response stored for a client-supplied Idempotency-Key, see exercises.idempotency"""
+    
+    user = models.ForeignKey(
+        'accounts.User',
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys'
+    )
+    key = models.CharField(max_length=64, verbose_name='Clé')
+    endpoint = models.CharField(max_length=200, verbose_name='Point d\'accès')
+    status_code = models.IntegerField(null=True, blank=True, verbose_name='Code HTTP')
+    response = models.JSONField(null=True, blank=True, verbose_name='Réponse')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        verbose_name = 'Clé d\'idempotence'
+        verbose_name_plural = 'Clés d\'idempotence'
+        unique_together = ['user', 'key']
+    
+    def __str__(self):
+        return f"{self.user} - {self.key} ({self.endpoint})"
+
+
+class AttemptArchive(models.Model):
+    """Attempts of one user on one exercise during a past school year, see exercises.archive
+    
+    The aggregates are kept as columns so progress and counters can still
+    be rebuilt; the attempts themselves are a compressed JSON list.
+    """
+    
+    user = models.ForeignKey(
+        'accounts.User',
+        on_delete=models.CASCADE,
+        related_name='archived_attempts'
+    )
+    exercise = models.ForeignKey(
+        Exercise,
+        on_delete=models.CASCADE,
+        related_name='archived_attempts'
+    )
+    school_year = models.PositiveSmallIntegerField(verbose_name='Année scolaire (année de rentrée)')
+    attempt_count = models.IntegerField(default=0, verbose_name='Tentatives')
+    pass_count = models.IntegerField(default=0, verbose_name='Réussites')
+    best_score = models.IntegerField(default=0, verbose_name='Meilleur score')
+    first_passed_at = models.DateTimeField(null=True, blank=True, verbose_name='Réussi pour la première fois le')
+    first_attempt_at = models.DateTimeField(verbose_name='Première tentative')
+    last_attempt_at = models.DateTimeField(verbose_name='Dernière tentative')
+    data = models.BinaryField(verbose_name='Tentatives compressées')
+    archived_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Archive de tentatives'
+        verbose_name_plural = 'Archives de tentatives'
+        unique_together = ['user', 'exercise', 'school_year']
+        indexes = [
+            models.Index(fields=['school_year']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user} - {self.exercise.title} ({self.school_year}) : {self.attempt_count} tentatives"
+    
+    @property
+    def attempts(self):
+        """The archived attempts as dicts, oldest first"""
+        if not self.data:
+            return []
+        return json.loads(zlib.decompress(bytes(self.data)))
+    
+    @attempts.setter
+    def attempts(self, attempts):
+        self.data = zlib.compress(json.dumps(attempts, cls=DjangoJSONEncoder).encode())
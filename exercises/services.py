@@ -0,0 +1,149 @@
+"""
+Recording of exercise submissions, shared by the single and batch endpoints.
+"""
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.urls import reverse
+
+from accounts.models import XPTransaction
+from courses.models import ChapterProgress
+from exercises.buffer import attempt_buffer
+from exercises.models import Exercise, Attempt, ExerciseStatsShard, UserExerciseProgress
+
+
+@dataclass
+class SubmissionResult:
+    """What recording a list of attempts changed for the user"""
+    attempts: list
+    first_passes: list = field(default_factory=list)
+    xp_awarded: int = 0
+    rewards: dict = field(default_factory=dict)
+    rewards_url: str = None
+
+    def as_json(self, user):
+        return {
+            'xp_awarded': self.xp_awarded,
+            'total_xp': self.rewards.get('total_xp', user.xp),
+            'level': self.rewards.get('level', user.level),
+            'badges_awarded': self.rewards.get('badges', []),
+            'achievements_awarded': self.rewards.get('achievements', []),
+            'rewards_url': self.rewards_url,
+        }
+
+
+def clean_attempt(data):
+    """Validate one submitted attempt, returns passed, score and attempt_data"""
+    if not isinstance(data, dict):
+        raise ValidationError('Tentative invalide')
+    passed = data.get('passed', False)
+    score = data.get('score', 0)
+    attempt_data = data.get('attempt_data', {})
+    if not isinstance(passed, bool):
+        raise ValidationError('passed doit être un booléen')
+    if isinstance(score, bool) or not isinstance(score, int) or not 0 <= score <= 100:
+        raise ValidationError('score doit être un entier entre 0 et 100')
+    if not isinstance(attempt_data, dict):
+        raise ValidationError('attempt_data doit être un objet')
+    return passed, score, attempt_data
+
+
+def build_attempts(user, items):
+    """Validate a batch of submitted attempts and build the unsaved Attempt rows
+
+    Raises ValidationError with one message per invalid item, prefixed by
+    its position in the batch.
+    """
+    max_size = getattr(settings, 'ATTEMPT_BATCH_MAX_SIZE', 100)
+    if not isinstance(items, list) or not items:
+        raise ValidationError('attempts doit être une liste non vide')
+    if len(items) > max_size:
+        raise ValidationError(f'Au plus {max_size} tentatives par envoi')
+
+    exercise_ids = {item.get('exercise_id') for item in items if isinstance(item, dict)}
+    exercises = Exercise.objects.filter(
+        is_published=True,
+        pk__in=[pk for pk in exercise_ids if isinstance(pk, int)]
+    ).in_bulk()
+
+    attempts, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            passed, score, attempt_data = clean_attempt(item)
+            exercise = exercises.get(item.get('exercise_id'))
+            if exercise is None:
+                raise ValidationError('Exercice inconnu')
+        except ValidationError as e:
+            errors.extend(f'{index}: {message}' for message in e.messages)
+            continue
+        attempts.append(Attempt(
+            user=user,
+            exercise=exercise,
+            passed=passed,
+            score=score,
+            attempt_data=attempt_data
+        ))
+    if errors:
+        raise ValidationError(errors)
+    return attempts
+
+
+def record_submissions(user, attempts):
+    """Save attempts in submission order and apply their progress and rewards
+
+    Progress, counters and the first-pass XP are applied once per
+    exercise; badges, achievements and the streak once for the whole
+    list. Everything runs in a single transaction.
+    """
+    with transaction.atomic():
+        Attempt.objects.bulk_create(attempts)
+
+        by_exercise = {}
+        for attempt in attempts:
+            by_exercise.setdefault(attempt.exercise_id, []).append(attempt)
+
+        result = SubmissionResult(attempts=attempts)
+        for exercise_id, group in by_exercise.items():
+            # The progress upsert decides the first pass, so concurrent
+            # passing submissions can never both award the XP
+            first_pass = UserExerciseProgress.objects.record_attempts(group)
+            ExerciseStatsShard.objects.record_attempts(exercise_id, group)
+            if first_pass is None:
+                continue
+
+            exercise = first_pass.exercise
+            ChapterProgress.objects.record_first_pass(user.pk, exercise.chapter_id)
+            user.add_xp(
+                exercise.xp_reward,
+                reason=XPTransaction.Reason.EXERCISE,
+                source=f'exercise:{exercise.pk}'
+            )
+            result.first_passes.append(exercise)
+            result.xp_awarded += exercise.xp_reward
+
+        if result.first_passes:
+            # Badges, achievements and streak
+            from gamification.jobs import enqueue_rewards, run_rewards
+
+            source = ','.join(f'exercise:{exercise.pk}' for exercise in result.first_passes)[:100]
+            if settings.REWARDS_ASYNC:
+                # Evaluated by `manage.py process_rewards`, the client polls rewards_url
+                job = enqueue_rewards(user, source=source)
+                result.rewards_url = reverse('gamification:reward_job', args=[job.pk])
+            else:
+                result.rewards = run_rewards(user)
+
+    return result
+
+
+def record_submission(user, attempt):
+    """Record a single attempt
+
+    With ATTEMPT_WRITE_BEHIND, a failed attempt is handed to the
+    write-behind buffer and saved by its next flush.
+    """
+    if settings.ATTEMPT_WRITE_BEHIND and attempt_buffer.add(attempt):
+        return SubmissionResult(attempts=[attempt])
+    return record_submissions(user, [attempt])
@@ -1,10 +1,25 @@
 """
 Tests for exercise models
 """
-from django.test import TestCase
+import io
+import json
+from datetime import date, timedelta
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError
+from django.db.models import Sum
 from django.contrib.auth import get_user_model
+from accounts.models import Classroom, Enrollment
 from courses.models import Course, Chapter
-from exercises.models import Exercise, Attempt, Hint, HintUsage
+from exercises.archive import archive_attempts, archived_history, retention_cutoff
+from exercises.buffer import AttemptBuffer, write_attempts
+from exercises.delta import apply_delta, diff_code
+from exercises.models import (
+    Exercise, Attempt, AttemptArchive, CodeBlob, ExerciseStatsShard, UserExerciseProgress, Hint, HintUsage, IdempotencyKey
+)
 
 User = get_user_model()
 
@@ -92,3 +107,487 @@ class ExerciseModelTest(TestCase):
         
         self.assertEqual(self.user.hint_usages.count(), 1)
         self.assertEqual(usage.hint.content, 'This is a hint')
+
+
+class StudentExerciseTestCase(TestCase):
+    """Base test case with one student and one exercise"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='test_student',
+            password='test123',
+            role=User.Role.STUDENT
+        )
+        course = Course.objects.create(title='Test Course', level=Course.Level.PREMIERE)
+        chapter = Chapter.objects.create(course=course, title='Test Chapter', slug='test-chapter')
+        self.exercise = Exercise.objects.create(
+            chapter=chapter,
+            title='Test Exercise',
+            type=Exercise.ExerciseType.PYTHON,
+            statement_markdown='Test statement'
+        )
+    
+    def _create_attempt(self, passed, score=None):
+        return Attempt.objects.create(
+            exercise=self.exercise,
+            user=self.user,
+            attempt_data={},
+            score=(100 if passed else 0) if score is None else score,
+            passed=passed
+        )
+
+
+class UserExerciseProgressTest(StudentExerciseTestCase):
+    def _attempt(self, passed, score):
+        attempt = self._create_attempt(passed, score)
+        UserExerciseProgress.objects.record_attempt(attempt)
+        return attempt
+    
+    def test_record_attempt_upsert(self):
+        """Test attempts are folded into a single progress row"""
+        self._attempt(False, 40)
+        first_pass = self._attempt(True, 80)
+        self._attempt(True, 60)
+        
+        progress = UserExerciseProgress.objects.get(user=self.user, exercise=self.exercise)
+        self.assertEqual(progress.attempt_count, 3)
+        self.assertEqual(progress.best_score, 80)
+        self.assertEqual(progress.first_passed_at, first_pass.created_at)
+        self.assertTrue(self.exercise.has_user_passed(self.user))
+    
+    def test_backfill_progress(self):
+        """Test progress can be rebuilt from the attempt history"""
+        self._attempt(False, 40)
+        self._attempt(True, 100)
+        UserExerciseProgress.objects.all().delete()
+        
+        call_command('backfill_progress', stdout=io.StringIO())
+        progress = UserExerciseProgress.objects.get(user=self.user, exercise=self.exercise)
+        self.assertEqual(progress.attempt_count, 2)
+        self.assertEqual(progress.best_score, 100)
+        self.assertIsNotNone(progress.first_passed_at)
+        self.assertEqual(progress.first_pass_attempt.score, 100)
+    
+    def test_first_pass_decided_by_upsert(self):
+        """Test only the first passing attempt is reported as the first pass"""
+        self.assertFalse(UserExerciseProgress.objects.record_attempt(self._create_attempt(False)))
+        first = self._create_attempt(True)
+        self.assertTrue(UserExerciseProgress.objects.record_attempt(first))
+        self.assertFalse(UserExerciseProgress.objects.record_attempt(self._create_attempt(True)))
+        
+        progress = UserExerciseProgress.objects.get(user=self.user, exercise=self.exercise)
+        self.assertEqual(progress.first_pass_attempt_id, first.pk)
+    
+    def test_submit_awards_xp_once(self):
+        """Test submitting the same passing answer twice awards XP once"""
+        self.client.force_login(self.user)
+        url = reverse('exercises:submit_attempt', args=[self.exercise.pk])
+        payload = json.dumps({'passed': True, 'score': 100})
+        
+        first = self.client.post(url, payload, content_type='application/json').json()
+        second = self.client.post(url, payload, content_type='application/json').json()
+        self.assertEqual(first['xp_awarded'], self.exercise.xp_reward)
+        self.assertEqual(second['xp_awarded'], 0)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.xp, self.exercise.xp_reward)
+
+
+class ExerciseStatsTest(StudentExerciseTestCase):
+    def _attempt(self, passed, score):
+        attempt = self._create_attempt(passed, score)
+        ExerciseStatsShard.objects.record_attempt(attempt)
+        return attempt
+    
+    def test_record_attempt_counters(self):
+        """Test the success rate is read from the sharded counters"""
+        for passed in [False, False, False, True]:
+            self._attempt(passed, 100 if passed else 0)
+        
+        exercise = Exercise.objects.with_stats().get(pk=self.exercise.pk)
+        self.assertEqual(exercise.attempt_total, 4)
+        with self.assertNumQueries(0):
+            self.assertEqual(exercise.get_success_rate(), 25)
+        self.assertEqual(self.exercise.get_success_rate(), 25)
+    
+    def test_reconcile_exercise_stats(self):
+        """Test counters can be recomputed from the attempts"""
+        self._attempt(True, 100)
+        self._attempt(False, 0)
+        ExerciseStatsShard.objects.update(attempt_count=42)
+        
+        call_command('reconcile_exercise_stats', stdout=io.StringIO())
+        self.assertEqual(ExerciseStatsShard.objects.get().attempt_count, 2)
+        self.assertEqual(self.exercise.get_success_rate(), 50)
+
+
+class IdempotencyKeyTest(StudentExerciseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.url = reverse('exercises:submit_attempt', args=[self.exercise.pk])
+    
+    def submit(self, key, passed=True):
+        return self.client.post(
+            self.url,
+            json.dumps({'passed': passed, 'score': 100 if passed else 0}),
+            content_type='application/json',
+            headers={'Idempotency-Key': key}
+        )
+    
+    def test_replay_returns_stored_response(self):
+        """Test a retried submission is answered without recording it again"""
+        first = self.submit('key-1')
+        replay = self.submit('key-1')
+        
+        self.assertEqual(replay.json(), first.json())
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+        self.assertEqual(Attempt.objects.filter(user=self.user).count(), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.xp_transactions.count(), 1)
+    
+    def test_distinct_keys_processed(self):
+        """Test submissions with different keys are both recorded"""
+        self.submit('key-1', passed=False)
+        self.submit('key-2', passed=False)
+        self.assertEqual(Attempt.objects.filter(user=self.user).count(), 2)
+    
+    def test_key_reused_on_other_endpoint(self):
+        """Test a key cannot be replayed against another endpoint"""
+        self.submit('key-1')
+        hint = Hint.objects.create(exercise=self.exercise, content='Indice', xp_cost=5, order=1)
+        response = self.client.post(
+            reverse('exercises:use_hint', args=[hint.pk]),
+            headers={'Idempotency-Key': 'key-1'}
+        )
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(HintUsage.objects.exists())
+    
+    def test_purge_expired_keys(self):
+        """Test keys older than the replay window are deleted"""
+        self.submit('key-1')
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        call_command('purge_idempotency_keys', stdout=io.StringIO())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class SubmitAttemptBatchTest(StudentExerciseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = Exercise.objects.create(
+            chapter=self.exercise.chapter,
+            title='Other Exercise',
+            type=Exercise.ExerciseType.PYTHON,
+            statement_markdown='Test statement',
+            order=2
+        )
+        Exercise.objects.update(is_published=True)
+        self.client.force_login(self.user)
+        self.url = reverse('exercises:submit_attempt_batch')
+    
+    def post(self, attempts):
+        return self.client.post(self.url, json.dumps({'attempts': attempts}), content_type='application/json')
+    
+    def test_batch_recorded_in_order(self):
+        """Test a queue of attempts is stored with one first pass per exercise"""
+        response = self.post([
+            {'exercise_id': self.exercise.pk, 'passed': False, 'score': 20},
+            {'exercise_id': self.exercise.pk, 'passed': True, 'score': 100},
+            {'exercise_id': self.exercise.pk, 'passed': True, 'score': 100},
+            {'exercise_id': self.other.pk, 'passed': True, 'score': 80},
+        ]).json()
+        
+        self.assertTrue(response['success'])
+        self.assertEqual(sorted(response['first_passes']), [self.exercise.pk, self.other.pk])
+        self.assertEqual(response['xp_awarded'], self.exercise.xp_reward + self.other.xp_reward)
+        ids = [attempt['id'] for attempt in response['attempts']]
+        self.assertEqual(ids, sorted(ids))
+        
+        progress = UserExerciseProgress.objects.get(user=self.user, exercise=self.exercise)
+        self.assertEqual(progress.attempt_count, 3)
+        self.assertEqual(progress.first_pass_attempt_id, ids[1])
+        self.assertEqual(self.exercise.get_success_rate(), 66)
+    
+    def test_invalid_batch_rejected(self):
+        """Test one invalid attempt rejects the whole batch"""
+        response = self.post([
+            {'exercise_id': self.exercise.pk, 'passed': True, 'score': 100},
+            {'exercise_id': 9999, 'passed': True, 'score': 100},
+            {'exercise_id': self.other.pk, 'passed': 'yes', 'score': 100},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.json()['errors']), 2)
+        self.assertFalse(Attempt.objects.exists())
+
+
+class AttemptBufferTest(StudentExerciseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.exercise.is_published = True
+        self.exercise.save()
+        self.buffer = AttemptBuffer(background=False)
+    
+    def _attempt(self, passed=False, score=0):
+        return Attempt(user=self.user, exercise=self.exercise, passed=passed, score=score)
+    
+    def test_flush_writes_in_bulk(self):
+        """Test buffered attempts are saved and counted by a flush"""
+        self.assertTrue(self.buffer.add(self._attempt(score=10)))
+        self.assertTrue(self.buffer.add(self._attempt(score=40)))
+        self.assertFalse(Attempt.objects.exists())
+        
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(Attempt.objects.count(), 2)
+        progress = UserExerciseProgress.objects.get(user=self.user, exercise=self.exercise)
+        self.assertEqual(progress.attempt_count, 2)
+        self.assertEqual(progress.best_score, 40)
+        self.assertIsNone(progress.first_passed_at)
+        self.assertEqual(self.exercise.get_success_rate(), 0)
+        self.assertEqual(self.buffer.flush(), 0)
+    
+    def test_passing_attempt_not_buffered(self):
+        """Test a passing attempt is left to the synchronous path"""
+        self.assertFalse(self.buffer.add(self._attempt(passed=True, score=100)))
+        self.assertEqual(len(self.buffer), 0)
+    
+    @override_settings(ATTEMPT_BUFFER_MAX_PENDING=2)
+    def test_pending_rows_bounded(self):
+        """Test the buffer refuses attempts past its bound"""
+        self.assertTrue(self.buffer.add(self._attempt()))
+        self.assertTrue(self.buffer.add(self._attempt()))
+        self.assertFalse(self.buffer.add(self._attempt()))
+    
+    def test_failed_flush_keeps_rows(self):
+        """Test rows are kept for the next flush when the database is unreachable"""
+        self.buffer.add(self._attempt())
+        with mock.patch('exercises.buffer.write_attempts', side_effect=OperationalError('gone')):
+            with self.assertRaises(OperationalError):
+                self.buffer.flush()
+        self.assertEqual(len(self.buffer), 1)
+        self.assertEqual(self.buffer.flush(), 1)
+    
+    def test_bad_row_dropped(self):
+        """Test one row that cannot be written does not block the rest of its batch"""
+        def write(rows):
+            if any(attempt.score == 13 for attempt in rows):
+                raise IntegrityError('FOREIGN KEY constraint failed')
+            write_attempts(rows)
+        
+        for score in (10, 13, 40):
+            self.buffer.add(self._attempt(score=score))
+        with mock.patch('exercises.buffer.write_attempts', side_effect=write), self.assertLogs('exercises.buffer'):
+            self.assertEqual(self.buffer.flush(), 2)
+        
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(sorted(Attempt.objects.values_list('score', flat=True)), [10, 40])
+        self.assertEqual(self.buffer.flush(), 0)
+    
+    @override_settings(ATTEMPT_WRITE_BEHIND=True)
+    def test_submit_view_buffers_failures(self):
+        """Test the submit endpoint defers failed attempts and writes passes at once"""
+        self.client.force_login(self.user)
+        url = reverse('exercises:submit_attempt', args=[self.exercise.pk])
+        with mock.patch('exercises.services.attempt_buffer', self.buffer):
+            response = self.client.post(url, json.dumps({'passed': False, 'score': 30}), content_type='application/json')
+            self.assertTrue(response.json()['success'])
+            self.assertFalse(Attempt.objects.exists())
+            
+            response = self.client.post(url, json.dumps({'passed': True, 'score': 100}), content_type='application/json')
+            self.assertEqual(response.json()['xp_awarded'], self.exercise.xp_reward)
+            self.assertEqual(Attempt.objects.count(), 1)
+        
+        self.buffer.flush()
+        progress = UserExerciseProgress.objects.get(user=self.user, exercise=self.exercise)
+        self.assertEqual(progress.attempt_count, 2)
+        self.assertIsNotNone(progress.first_passed_at)
+
+
+class CodeBlobTest(StudentExerciseTestCase):
+    def _attempt(self, code, **data):
+        return Attempt(user=self.user, exercise=self.exercise, attempt_data={'code': code, **data})
+    
+    def test_code_deduplicated(self):
+        """Test identical submissions share one compressed blob"""
+        code = 'def f(x):\n    return x * 2\n' * 20
+        first = self._attempt(code, type='PYTHON')
+        first.save()
+        Attempt.objects.bulk_create([self._attempt(code), self._attempt('print(1)')])
+        
+        self.assertEqual(CodeBlob.objects.count(), 2)
+        blob = CodeBlob.objects.get(pk=first.code_blob_id)
+        self.assertEqual(blob.size, len(code))
+        self.assertLess(len(bytes(blob.data)), blob.size)
+        
+        attempt = Attempt.objects.with_code().get(pk=first.pk)
+        self.assertEqual(attempt.attempt_data, {'type': 'PYTHON'})
+        self.assertEqual(attempt.code, code)
+        self.assertEqual(
+            sorted(a.code for a in Attempt.objects.all()),
+            sorted([code, code, 'print(1)'])
+        )
+    
+    def test_compact_existing_attempts(self):
+        """Test the command moves code out of attempts saved before the blob table"""
+        ids = []
+        for code in ['a = 1', 'a = 1', 'b = 2', None]:
+            attempt = Attempt.objects.create(user=self.user, exercise=self.exercise)
+            data = {'code': code, 'type': 'PYTHON'} if code else {'answer': 'B'}
+            Attempt.objects.filter(pk=attempt.pk).update(attempt_data=data)
+            ids.append(attempt.pk)
+        
+        self.assertEqual(Attempt.objects.get(pk=ids[0]).code, 'a = 1')
+        call_command('compact_attempt_code', chunk_size=2, stdout=io.StringIO())
+        
+        self.assertEqual(CodeBlob.objects.count(), 2)
+        attempts = Attempt.objects.in_bulk(ids)
+        self.assertEqual([attempts[pk].code for pk in ids[:3]], ['a = 1', 'a = 1', 'b = 2'])
+        self.assertEqual(attempts[ids[0]].attempt_data, {'type': 'PYTHON'})
+        self.assertEqual(attempts[ids[3]].attempt_data, {'answer': 'B'})
+        self.assertIsNone(attempts[ids[3]].code_blob_id)
+    
+    def test_compact_queries_per_chunk(self):
+        """Test the command runs a fixed number of queries per chunk, whatever its size"""
+        attempts = Attempt.objects.bulk_create([
+            Attempt(user=self.user, exercise=self.exercise) for _ in range(50)
+        ])
+        for i, attempt in enumerate(attempts):
+            Attempt.objects.filter(pk=attempt.pk).update(attempt_data={'code': f'a = {i % 10}'})
+        
+        with self.assertNumQueries(9):
+            call_command('compact_attempt_code', chunk_size=50, stdout=io.StringIO())
+        self.assertEqual(Attempt.objects.filter(code_blob__isnull=True).count(), 0)
+
+
+class CodeDeltaTest(StudentExerciseTestCase):
+    def setUp(self):
+        super().setUp()
+        base = ''.join(f'line_{i} = {i}\n' for i in range(40))
+        self.versions = [base.replace('line_5 = 5', f'line_5 = {n}') + f'print({n})\n' for n in range(25)]
+    
+    def _submit(self, versions):
+        Attempt.objects.bulk_create([
+            Attempt(user=self.user, exercise=self.exercise, attempt_data={'code': code})
+            for code in versions
+        ])
+    
+    def test_diff_roundtrip(self):
+        """Test a delta rebuilds the new version from the old one"""
+        old, new = 'a\nb\nc\n', 'a\nB\nc\nd'
+        self.assertEqual(apply_delta(old, diff_code(old, new)), new)
+        self.assertEqual(apply_delta('', diff_code('', new)), new)
+        self.assertEqual(apply_delta(old, diff_code(old, '')), '')
+    
+    @override_settings(CODE_KEYFRAME_INTERVAL=10)
+    def test_progression_stored_as_deltas(self):
+        """Test resubmissions are deltas with a keyframe every interval"""
+        self._submit(self.versions[:12])
+        for code in self.versions[12:]:
+            Attempt.objects.create(user=self.user, exercise=self.exercise, attempt_data={'code': code})
+        
+        attempts = list(Attempt.objects.order_by('pk').select_related('code_blob'))
+        depths = [attempt.code_blob.depth for attempt in attempts]
+        self.assertEqual(depths[:12], list(range(10)) + [0, 1])
+        self.assertEqual(max(depths), 9)
+        delta = attempts[1].code_blob
+        self.assertFalse(delta.is_keyframe)
+        self.assertLess(len(bytes(delta.data)), len(bytes(attempts[0].code_blob.data)))
+        
+        with self.assertNumQueries(2):
+            attempts = list(Attempt.objects.order_by('pk').with_code())
+        self.assertEqual([attempt.code for attempt in attempts], self.versions)
+        self.assertEqual(CodeBlob.objects.get(pk=attempts[-1].code_blob_id).code, self.versions[-1])
+    
+    @override_settings(CODE_KEYFRAME_INTERVAL=10)
+    def test_delta_resolved_from_keyframe(self):
+        """Test deltas are taken against their keyframe, so any version loads in two queries"""
+        self._submit(self.versions[:9])
+        keyframe, *deltas = CodeBlob.objects.order_by('depth')
+        self.assertTrue(keyframe.is_keyframe)
+        self.assertEqual({delta.base_id for delta in deltas}, {keyframe.pk})
+        
+        last = Attempt.objects.order_by('pk').last().code_blob_id
+        with self.assertNumQueries(2):
+            self.assertEqual(CodeBlob.objects.resolve([last])[last].code, self.versions[8])
+        # Submitting the next version resolves the previous one the same way
+        with self.assertNumQueries(4):
+            CodeBlob.objects.attach([
+                Attempt(user=self.user, exercise=self.exercise, attempt_data={'code': self.versions[9]})
+            ])
+    
+    def test_attempt_list_replays_progression(self):
+        """Test a teacher can replay the progression of a student of their classroom"""
+        self._submit(self.versions[:3])
+        teacher = User.objects.create_user(username='teacher', password='test123', role=User.Role.TEACHER)
+        classroom = Classroom.objects.create(name='1NSI', school_name='Lycée Test', teacher=teacher)
+        Enrollment.objects.create(user=self.user, classroom=classroom)
+        url = reverse('exercises:attempt_list')
+        
+        self.client.force_login(teacher)
+        response = self.client.get(url, {'student': self.user.pk, 'exercise': self.exercise.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([attempt.code for attempt in response.context['attempts']], self.versions[:3])
+        
+        other = User.objects.create_user(username='other', password='test123', role=User.Role.TEACHER)
+        self.client.force_login(other)
+        response = self.client.get(url, {'student': self.user.pk})
+        self.assertEqual(response.status_code, 404)
+    
+    def test_attempt_list_invalid_ids(self):
+        """Test non-numeric ids in the query string give a 404"""
+        self.client.force_login(self.user)
+        url = reverse('exercises:attempt_list')
+        self.assertEqual(self.client.get(url, {'student': 'abc'}).status_code, 404)
+        self.assertEqual(self.client.get(url, {'exercise': '1;'}).status_code, 404)
+        self.assertEqual(self.client.get(url, {'student': self.user.pk}).status_code, 200)
+
+
+class AttemptArchiveTest(StudentExerciseTestCase):
+    def _attempt(self, when, passed=False, score=0, code=None):
+        attempt = Attempt.objects.create(
+            user=self.user,
+            exercise=self.exercise,
+            passed=passed,
+            score=score,
+            attempt_data={'code': code} if code else {}
+        )
+        Attempt.objects.filter(pk=attempt.pk).update(created_at=when)
+        UserExerciseProgress.objects.record_attempt(Attempt.objects.get(pk=attempt.pk))
+        ExerciseStatsShard.objects.record_attempt(attempt)
+        return attempt
+    
+    def test_retention_cutoff(self):
+        """Test the cutoff is the start of the oldest school year kept"""
+        self.assertEqual(retention_cutoff(date(2025, 10, 3), keep_years=1).date(), date(2025, 9, 1))
+        self.assertEqual(retention_cutoff(date(2025, 6, 30), keep_years=1).date(), date(2024, 9, 1))
+        self.assertEqual(retention_cutoff(date(2025, 10, 3), keep_years=2).date(), date(2024, 9, 1))
+    
+    def test_old_attempts_archived(self):
+        """Test past school years leave the live table while progress and counters still add up"""
+        old = timezone.now() - timedelta(days=800)
+        self._attempt(old, score=20, code='a = 1')
+        self._attempt(old + timedelta(minutes=5), passed=True, score=90, code='a = 2')
+        self._attempt(old + timedelta(days=200), score=10)
+        recent = self._attempt(timezone.now(), passed=True, score=100)
+        
+        archived = archive_attempts(timezone.now() - timedelta(days=30), chunk_size=2)
+        
+        self.assertEqual(archived, 3)
+        self.assertEqual(list(Attempt.objects.values_list('pk', flat=True)), [recent.pk])
+        self.assertEqual(AttemptArchive.objects.aggregate(total=Sum('attempt_count'))['total'], 3)
+        history = archived_history(self.user, self.exercise)
+        self.assertEqual([attempt['score'] for attempt in history], [20, 90, 10])
+        self.assertEqual([attempt['code'] for attempt in history[:2]], ['a = 1', 'a = 2'])
+        
+        progress = UserExerciseProgress.objects.get(user=self.user, exercise=self.exercise)
+        self.assertEqual(progress.attempt_count, 4)
+        self.assertIsNone(progress.first_pass_attempt_id)
+        
+        call_command('backfill_progress', stdout=io.StringIO())
+        out = io.StringIO()
+        call_command('reconcile_exercise_stats', stdout=out)
+        self.assertIn('Counters rebuilt for 1 exercises', out.getvalue())
+        progress.refresh_from_db()
+        self.assertEqual(progress.attempt_count, 4)
+        self.assertEqual(progress.best_score, 100)
+        self.assertEqual(progress.first_passed_at, old + timedelta(minutes=5))
+        self.assertIsNone(progress.first_pass_attempt_id)
+        self.assertEqual(self.exercise.get_success_rate(), 50)
@@ -9,6 +9,7 @@ urlpatterns = [
     
     # Submit attempt (AJAX)
     path('<int:pk>/submit/', views.SubmitAttemptView.as_view(), name='submit_attempt'),
+    path('submit/batch/', views.SubmitAttemptBatchView.as_view(), name='submit_attempt_batch'),
     
     # Get hint (AJAX)
     path('hint/<int:pk>/use/', views.UseHintView.as_view(), name='use_hint'),
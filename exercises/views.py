@@ -2,11 +2,15 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.views.generic import DetailView, ListView, View
-from django.http import JsonResponse
+from django.core.exceptions import ValidationError
+from django.http import Http404, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 import json
+from accounts.models import User, XPTransaction
+from .idempotency import IdempotentMixin
 from .models import Exercise, Attempt, Hint, HintUsage
+from .services import build_attempts, clean_attempt, record_submission, record_submissions
 
 
 class ExerciseDetailView(LoginRequiredMixin, DetailView):
@@ -16,7 +20,7 @@ class ExerciseDetailView(LoginRequiredMixin, DetailView):
     context_object_name = 'exercise'
     
     def get_queryset(self):
-        return Exercise.objects.filter(is_published=True).select_related('chapter__course')
+        return Exercise.objects.filter(is_published=True).select_related('chapter__course').with_stats()
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -36,7 +40,7 @@ class ExerciseDetailView(LoginRequiredMixin, DetailView):
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class SubmitAttemptView(LoginRequiredMixin, View):
+class SubmitAttemptView(LoginRequiredMixin, IdempotentMixin, View):
     """Submit an exercise attempt (AJAX endpoint)"""
     
     def post(self, request, pk):
@@ -48,55 +52,21 @@ class SubmitAttemptView(LoginRequiredMixin, View):
             )
             user = request.user
             
-            passed = data.get('passed', False)
-            score = data.get('score', 0)
-            attempt_data = data.get('attempt_data', {})
-            
-            # Create attempt
-            attempt = Attempt.objects.create(
+            passed, score, attempt_data = clean_attempt(data)
+            attempt = Attempt(
                 user=user,
                 exercise=exercise,
                 passed=passed,
                 score=score,
                 attempt_data=attempt_data
             )
-            
-            # Award XP if passed for the first time
-            xp_awarded = 0
-            if passed:
-                # Check if first pass (optimized with exists())
-                is_first_pass = not Attempt.objects.filter(
-                    user=user,
-                    exercise=exercise,
-                    passed=True
-                ).exclude(pk=attempt.pk).exists()
-                
-                if is_first_pass:
-                    user.add_xp(exercise.xp_reward)
-                    
-                    # Check for badges and achievements (can be moved to async task)
-                    from gamification.models import Badge
-                    from gamification.utils import check_achievements, update_user_streak
-                    
-                    # Check only active badges
-                    for badge in Badge.objects.filter(is_active=True).only('id', 'code', 'xp_requirement'):
-                        badge.check_and_award(user)
-                    
-                    # Check achievements
-                    check_achievements(user)
-                    
-                    # Update streak
-                    update_user_streak(user)
-                    
-                    xp_awarded = exercise.xp_reward
+            result = record_submission(user, attempt)
             
             return JsonResponse({
                 'success': True,
                 'passed': passed,
                 'score': score,
-                'xp_awarded': xp_awarded,
-                'total_xp': user.xp,
-                'level': user.level
+                **result.as_json(user)
             })
         
         except Exception as e:
@@ -107,7 +77,40 @@ class SubmitAttemptView(LoginRequiredMixin, View):
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class UseHintView(LoginRequiredMixin, View):
+class SubmitAttemptBatchView(LoginRequiredMixin, IdempotentMixin, View):
+    """Submit a queue of attempts recorded offline, in order (AJAX endpoint)"""
+    
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+            user = request.user
+            attempts = build_attempts(user, data.get('attempts'))
+            result = record_submissions(user, attempts)
+            
+            return JsonResponse({
+                'success': True,
+                'attempts': [
+                    {'id': attempt.pk, 'exercise_id': attempt.exercise_id, 'passed': attempt.passed}
+                    for attempt in result.attempts
+                ],
+                'first_passes': [exercise.pk for exercise in result.first_passes],
+                **result.as_json(user)
+            })
+        
+        except ValidationError as e:
+            return JsonResponse({
+                'success': False,
+                'errors': e.messages
+            }, status=400)
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            }, status=400)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class UseHintView(LoginRequiredMixin, IdempotentMixin, View):
     """Use a hint (AJAX endpoint)"""
     
     def post(self, request, pk):
@@ -128,8 +131,11 @@ class UseHintView(LoginRequiredMixin, View):
             
             # Deduct XP if cost > 0
             if hint.xp_cost > 0:
-                user.xp = max(0, user.xp - hint.xp_cost)
-                user.save()
+                user.add_xp(
+                    -hint.xp_cost,
+                    reason=XPTransaction.Reason.HINT,
+                    source=f'hint:{hint.pk}'
+                )
             
             return JsonResponse({
                 'success': True,
@@ -146,11 +152,51 @@ class UseHintView(LoginRequiredMixin, View):
 
 
 class AttemptListView(LoginRequiredMixin, ListView):
-    """List user's attempts"""
+    """List user's attempts with their code
+    
+    ?exercise= replays the progression on one exercise, oldest first.
+    Teachers can review a student of their classrooms with ?student=.
+    """
     model = Attempt
     template_name = 'exercises/attempt_list.html'
     context_object_name = 'attempts'
     paginate_by = 20
     
+    def get_id_param(self, name):
+        """Id given in the query string, 404 when it is not a number"""
+        value = self.request.GET.get(name)
+        if not value:
+            return None
+        if not value.isdigit():
+            raise Http404(f'Invalid {name} id')
+        return int(value)
+    
+    def get_student(self):
+        user = self.request.user
+        student_id = self.get_id_param('student')
+        if student_id is None or student_id == user.pk:
+            return user
+        students = User.objects.all()
+        if not user.is_staff:
+            students = students.filter(enrollments__classroom__teacher=user).distinct()
+        return get_object_or_404(students, pk=student_id)
+    
+    def get_exercise(self):
+        exercise_id = self.get_id_param('exercise')
+        if exercise_id is None:
+            return None
+        return get_object_or_404(Exercise, pk=exercise_id)
+    
     def get_queryset(self):
-        return Attempt.objects.filter(user=self.request.user).select_related('exercise__chapter')
+        self.student = self.get_student()
+        self.exercise = self.get_exercise()
+        attempts = Attempt.objects.filter(user=self.student).select_related('exercise__chapter').with_code()
+        if self.exercise is not None:
+            attempts = attempts.filter(exercise=self.exercise).order_by('created_at', 'pk')
+        return attempts
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['student'] = self.student
+        context['exercise'] = self.exercise
+        return context
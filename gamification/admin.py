@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Badge, UserBadge, Streak, Achievement, UserAchievement
+from .models import Badge, UserBadge, Streak, Achievement, UserAchievement, RewardJob
 
 
 @admin.register(Badge)
@@ -25,7 +25,8 @@ class StreakAdmin(admin.ModelAdmin):
 
 @admin.register(Achievement)
 class AchievementAdmin(admin.ModelAdmin):
-    list_display = ['name', 'icon', 'xp_reward']
+    list_display = ['name', 'icon', 'rule', 'threshold', 'xp_reward', 'is_active']
+    list_filter = ['rule', 'is_active']
     search_fields = ['name', 'code', 'description']
 
 
@@ -35,3 +36,11 @@ class UserAchievementAdmin(admin.ModelAdmin):
     list_filter = ['achievement', 'earned_at']
     search_fields = ['user__username', 'user__pseudo', 'achievement__name']
     readonly_fields = ['earned_at']
+
+
+@admin.register(RewardJob)
+class RewardJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'source', 'status', 'tries', 'worker', 'created_at', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['user__username', 'source']
+    readonly_fields = ['result', 'error', 'created_at', 'claimed_at', 'finished_at']
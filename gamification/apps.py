@@ -5,3 +5,6 @@ class GamificationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gamification'
     verbose_name = 'Gamification'
+
+    def ready(self):
+        from gamification import signals  # noqa: F401
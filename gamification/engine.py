@@ -0,0 +1,175 @@
+"""
+Set-based reward engine: works out what a user has newly earned and
+writes it in bulk instead of checking rewards one by one.
+"""
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+
+from accounts.models import User, XPTransaction
+from gamification.models import Badge, UserBadge, Achievement, UserAchievement
+
+
+ACHIEVEMENTS_VERSION_KEY = 'gamification:achievements:version'
+
+
+def _eligible_badges(xp):
+    """Active badges unlocked by the given amount of XP"""
+    return Badge.objects.filter(is_active=True).filter(
+        Q(xp_requirement__lte=0) | Q(xp_requirement__lte=xp)
+    )
+
+
+def award_badges(user):
+    """Award every badge the user has newly earned.
+
+    The set of missing badges is computed in a single query and written
+    with one bulk insert. Returns the list of awarded badges.
+    """
+    badges = list(
+        _eligible_badges(user.xp)
+        .exclude(pk__in=UserBadge.objects.filter(user=user).values('badge_id'))
+        .only('id', 'code', 'name', 'icon', 'xp_requirement')
+    )
+    if badges:
+        UserBadge.objects.bulk_create(
+            [UserBadge(user=user, badge=badge) for badge in badges],
+            ignore_conflicts=True
+        )
+    return badges
+
+
+def award_badges_bulk(users, batch_size=1000):
+    """Re-evaluate badges for a cohort of users.
+
+    Uses the same rules as award_badges() but loads the badge catalogue and
+    the already-earned pairs once for the whole cohort. Returns a dict
+    mapping user id to the list of badges awarded.
+    """
+    users = list(users)
+    if not users:
+        return {}
+
+    badges = list(Badge.objects.filter(is_active=True).only('id', 'code', 'name', 'icon', 'xp_requirement'))
+    earned = set(
+        UserBadge.objects.filter(user__in=users).values_list('user_id', 'badge_id')
+    )
+
+    awarded = {}
+    new_rows = []
+    for user in users:
+        for badge in badges:
+            if badge.xp_requirement > 0 and user.xp < badge.xp_requirement:
+                continue
+            if (user.pk, badge.pk) in earned:
+                continue
+            new_rows.append(UserBadge(user=user, badge=badge))
+            awarded.setdefault(user.pk, []).append(badge)
+
+    UserBadge.objects.bulk_create(new_rows, batch_size=batch_size, ignore_conflicts=True)
+    return awarded
+
+
+@dataclass(frozen=True)
+class UserStats:
+    """Snapshot of the statistics achievement rules are evaluated against"""
+    exercises_passed: int = 0
+    best_score: int = 0
+    current_streak: int = 0
+
+
+def get_user_stats(user):
+    """Build the stats snapshot for a user in a single query"""
+    passed = Q(exercise_progress__first_passed_at__isnull=False)
+    row = User.objects.filter(pk=user.pk).annotate(
+        exercises_passed=Count('exercise_progress', filter=passed),
+        best_score=Max('exercise_progress__best_score', filter=passed),
+    ).values('exercises_passed', 'best_score', 'streak__current_streak').first()
+
+    if row is None:
+        return UserStats()
+    return UserStats(
+        exercises_passed=row['exercises_passed'] or 0,
+        best_score=row['best_score'] or 0,
+        current_streak=row['streak__current_streak'] or 0,
+    )
+
+
+RULES = {
+    Achievement.Rule.EXERCISES_PASSED: lambda stats: stats.exercises_passed,
+    Achievement.Rule.PERFECT_SCORE: lambda stats: stats.best_score,
+    Achievement.Rule.STREAK: lambda stats: stats.current_streak,
+}
+
+
+_definitions = None
+_definitions_version = None
+
+
+def get_achievement_definitions():
+    """Active achievements, loaded once per worker.
+
+    The local copy is dropped when an Achievement row changes (see
+    gamification.signals). The version stored in the cache lets other
+    workers notice the change when a shared cache backend is configured.
+    """
+    global _definitions, _definitions_version
+
+    version = cache.get(ACHIEVEMENTS_VERSION_KEY)
+    if _definitions is None or version != _definitions_version:
+        _definitions = tuple(Achievement.objects.filter(is_active=True))
+        _definitions_version = version
+    return _definitions
+
+
+def invalidate_achievement_definitions():
+    """Force every worker to reload achievement definitions"""
+    global _definitions
+
+    _definitions = None
+    try:
+        cache.incr(ACHIEVEMENTS_VERSION_KEY)
+    except ValueError:
+        cache.set(ACHIEVEMENTS_VERSION_KEY, 1, None)
+
+
+def award_achievements(user, stats=None):
+    """Evaluate every achievement rule and award the newly unlocked ones.
+
+    Rules are checked in memory against one stats snapshot; awards are
+    written with a single bulk insert and their XP is granted at once.
+    Returns the list of awarded achievements.
+    """
+    if stats is None:
+        stats = get_user_stats(user)
+
+    unlocked = [
+        achievement for achievement in get_achievement_definitions()
+        if RULES[achievement.rule](stats) >= achievement.threshold
+    ]
+    if not unlocked:
+        return []
+
+    already_earned = set(
+        UserAchievement.objects.filter(
+            user=user,
+            achievement__in=unlocked
+        ).values_list('achievement_id', flat=True)
+    )
+    awarded = [a for a in unlocked if a.pk not in already_earned]
+    if not awarded:
+        return []
+
+    UserAchievement.objects.bulk_create(
+        [UserAchievement(user=user, achievement=achievement) for achievement in awarded],
+        ignore_conflicts=True
+    )
+    xp_reward = sum(achievement.xp_reward for achievement in awarded)
+    if xp_reward:
+        user.add_xp(
+            xp_reward,
+            reason=XPTransaction.Reason.ACHIEVEMENT,
+            source=','.join(f'achievement:{a.pk}' for a in awarded)[:100]
+        )
+    return awarded
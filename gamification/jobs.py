@@ -0,0 +1,119 @@
+"""
+Database-backed queue for reward evaluation.
+
+The submit endpoint enqueues a RewardJob in its own transaction; the
+process_rewards command claims pending jobs and awards badges,
+achievements and the streak off the request path. On Postgres jobs are
+claimed with SELECT ... FOR UPDATE SKIP LOCKED so several workers never
+block each other. Backends without SKIP LOCKED (SQLite) claim each job
+with a conditional UPDATE, which only one worker can win.
+"""
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from gamification.models import RewardJob, Streak
+from gamification.engine import award_badges, award_achievements
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def default_worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def run_rewards(user):
+    """Award badges, achievements and the streak, returns what was earned"""
+    badges = award_badges(user)
+    achievements = award_achievements(user)
+    streak, _ = Streak.objects.get_or_create(user=user)
+    streak.update_streak(timezone.localdate())
+    # Achievements grant XP, which can unlock more badges
+    if achievements:
+        badges += award_badges(user)
+
+    return {
+        'badges': [{'code': b.code, 'name': b.name, 'icon': b.icon} for b in badges],
+        'achievements': [{'code': a.code, 'name': a.name, 'icon': a.icon} for a in achievements],
+        'streak': streak.current_streak,
+        'total_xp': user.xp,
+        'level': user.level,
+    }
+
+
+def enqueue_rewards(user, source=''):
+    """Queue a reward evaluation for the user"""
+    return RewardJob.objects.create(user=user, source=source)
+
+
+def requeue_stale_jobs(now=None):
+    """Give back jobs whose worker died while running them"""
+    now = now or timezone.now()
+    timeout = timedelta(seconds=_setting('REWARD_JOB_TIMEOUT', 300))
+    return RewardJob.objects.filter(
+        status=RewardJob.Status.RUNNING,
+        claimed_at__lt=now - timeout
+    ).update(status=RewardJob.Status.PENDING, worker='', claimed_at=None)
+
+
+def claim_jobs(worker, limit=10):
+    """Mark up to `limit` pending jobs as running for this worker and return them"""
+    now = timezone.now()
+    pending = RewardJob.objects.filter(
+        status=RewardJob.Status.PENDING,
+        available_at__lte=now
+    ).order_by('id')
+    claim = {'status': RewardJob.Status.RUNNING, 'worker': worker, 'claimed_at': now}
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(pending.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            RewardJob.objects.filter(pk__in=ids).update(**claim)
+    else:
+        ids = [
+            pk for pk in pending.values_list('id', flat=True)[:limit]
+            if RewardJob.objects.filter(pk=pk, status=RewardJob.Status.PENDING).update(**claim)
+        ]
+    return list(RewardJob.objects.filter(pk__in=ids).select_related('user'))
+
+
+def process_job(job):
+    """Run one claimed job; failures are retried with a backoff, then given up"""
+    try:
+        with transaction.atomic():
+            result = run_rewards(job.user)
+    except Exception as e:
+        job.tries += 1
+        job.error = str(e)
+        job.worker = ''
+        if job.tries >= _setting('REWARD_JOB_MAX_TRIES', 5):
+            job.status = RewardJob.Status.FAILED
+            job.finished_at = timezone.now()
+        else:
+            job.status = RewardJob.Status.PENDING
+            job.available_at = timezone.now() + timedelta(seconds=2 ** job.tries)
+        job.save(update_fields=['tries', 'error', 'worker', 'status', 'finished_at', 'available_at'])
+        return False
+
+    job.status = RewardJob.Status.DONE
+    job.result = result
+    job.tries += 1
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'tries', 'finished_at'])
+    return True
+
+
+def process_pending(worker=None, limit=10):
+    """Claim and run one batch of jobs, returns the number of jobs handled"""
+    worker = worker or default_worker_name()
+    requeue_stale_jobs()
+    jobs = claim_jobs(worker, limit)
+    for job in jobs:
+        process_job(job)
+    return len(jobs)
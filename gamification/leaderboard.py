@@ -0,0 +1,352 @@
+"""
+Precomputed leaderboard.
+
+Ranks are stored in LeaderboardEntry so the top of the board and any
+user's rank are read through the rank and primary key indexes instead of
+sorting and counting every student on each page view. Once an XP change
+is committed only that student's entry is written: the students passed
+on the way move by one rank and the new rank is an indexed count of the
+entries with more XP. The whole table is only rebuilt when it is first
+read, and refreshed every LEADERBOARD_TTL seconds to add the students
+without XP, drop the inactive ones and update the badge and exercise
+counts: by the reward worker (process_rewards) with REWARDS_ASYNC, or
+else in a background thread started by the first read after the TTL.
+
+Weekly, monthly and per-term boards, optionally restricted to a
+classroom or a school, are summed from the DailyXP rollups instead and
+paginated with a (score, user id) keyset cursor.
+"""
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Count, F, Q, Sum, Window
+from django.db.models.functions import Rank
+from django.utils import timezone
+
+from accounts.models import User, Enrollment
+from gamification.models import LeaderboardEntry, DailyXP
+
+
+BUILT_AT_KEY = 'gamification:leaderboard:built_at'
+LOCK_KEY = 'gamification:leaderboard:lock'
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _students():
+    """Active students with the counters shown on the board"""
+    return User.objects.filter(
+        role=User.Role.STUDENT,
+        is_active=True
+    ).annotate(
+        badges_count=Count('earned_badges', distinct=True),
+        exercises_solved=Count(
+            'exercise_progress',
+            filter=Q(exercise_progress__first_passed_at__isnull=False),
+            distinct=True
+        ),
+    )
+
+
+def needs_rebuild(now=None):
+    """True when the table was never built or is older than the TTL"""
+    if now is None:
+        now = time.time()
+    built_at = cache.get(BUILT_AT_KEY)
+    return built_at is None or now - built_at >= _setting('LEADERBOARD_TTL', 300)
+
+
+def rebuild_leaderboard():
+    """Recompute every rank in one query and replace the table"""
+    rows = _students().annotate(
+        rank=Window(Rank(), order_by=F('xp').desc()),
+    ).values_list('pk', 'rank', 'xp', 'level', 'badges_count', 'exercises_solved')
+
+    entries = [
+        LeaderboardEntry(
+            user_id=pk,
+            rank=rank,
+            xp=xp,
+            level=level,
+            badges_count=badges_count,
+            exercises_solved=exercises_solved
+        )
+        for pk, rank, xp, level, badges_count, exercises_solved in rows
+    ]
+
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=500)
+    cache.set(BUILT_AT_KEY, time.time(), None)
+    return len(entries)
+
+
+def _rebuild_once():
+    """Rebuild unless another process holds the lock, returns whether it rebuilt"""
+    if not cache.add(LOCK_KEY, True, _setting('LEADERBOARD_LOCK_TIMEOUT', 60)):
+        return False
+    try:
+        rebuild_leaderboard()
+    finally:
+        cache.delete(LOCK_KEY)
+    return True
+
+
+def refresh_leaderboard():
+    """Rebuild the table when it is older than the TTL, run by the reward worker"""
+    return needs_rebuild() and _rebuild_once()
+
+
+def _refresh_locked():
+    # Runs in its own thread with its own connection, the caller holds LOCK_KEY
+    try:
+        rebuild_leaderboard()
+    except Exception:
+        logger.exception('Leaderboard refresh failed')
+    finally:
+        cache.delete(LOCK_KEY)
+        connections.close_all()
+
+
+def schedule_refresh():
+    """Rebuild a stale table in a background thread, returns whether one was started"""
+    if not cache.add(LOCK_KEY, True, _setting('LEADERBOARD_LOCK_TIMEOUT', 60)):
+        return False
+    threading.Thread(target=_refresh_locked, name='leaderboard-refresh', daemon=True).start()
+    return True
+
+
+def ensure_leaderboard():
+    """Build the table the first time it is read, refresh it in the background after the TTL"""
+    if cache.get(BUILT_AT_KEY) is not None:
+        if not _setting('REWARDS_ASYNC', False) and needs_rebuild():
+            schedule_refresh()
+        return False
+    if LeaderboardEntry.objects.exists():
+        # Built by another process and kept up to date by update_entry
+        cache.set(BUILT_AT_KEY, time.time(), None)
+        return False
+    return _rebuild_once()
+
+
+def update_entry(user_id):
+    """Move a student to their current XP on the board
+
+    Only the students between the old and the new XP change rank, by one.
+    Their rows and the student's own entry are locked together in primary
+    key order, after the user row, so concurrent updates wait for each
+    other instead of deadlocking.
+    Returns the new rank, None when the user is not on the board.
+    """
+    with transaction.atomic():
+        list(User.objects.select_for_update().filter(pk=user_id).values_list('pk', flat=True))
+        student = _students().filter(pk=user_id).values(
+            'xp', 'level', 'badges_count', 'exercises_solved'
+        ).first()
+        old_xp = LeaderboardEntry.objects.filter(user_id=user_id).values_list('xp', flat=True).first()
+        if student is None:
+            # No longer an active student: the next rebuild drops the entry
+            return None
+        if old_xp is None and not LeaderboardEntry.objects.exists():
+            # Never built: ranking this student alone would hide the others
+            rebuild_leaderboard()
+            return LeaderboardEntry.objects.filter(user_id=user_id).values_list('rank', flat=True).first()
+
+        xp = student['xp']
+        if old_xp is None:
+            passed, shift = Q(xp__lt=xp), 1
+        elif xp > old_xp:
+            passed, shift = Q(xp__gte=old_xp, xp__lt=xp), 1
+        elif xp < old_xp:
+            passed, shift = Q(xp__gte=xp, xp__lt=old_xp), -1
+        else:
+            passed = None
+
+        others = LeaderboardEntry.objects.exclude(user_id=user_id)
+        if passed is not None:
+            locked = LeaderboardEntry.objects.filter(passed | Q(user_id=user_id)).select_for_update()
+            moved = [pk for pk in locked.order_by('pk').values_list('pk', flat=True) if pk != user_id]
+            if moved:
+                LeaderboardEntry.objects.filter(pk__in=moved).update(rank=F('rank') + shift)
+        student['rank'] = others.filter(xp__gt=xp).count() + 1
+        LeaderboardEntry.objects.update_or_create(user_id=user_id, defaults=student)
+    return student['rank']
+
+
+def get_leaderboard():
+    """Ranked entries, best first"""
+    ensure_leaderboard()
+    return LeaderboardEntry.objects.select_related('user')
+
+
+def get_top(n=10):
+    """The n best ranked entries"""
+    return list(get_leaderboard()[:n])
+
+
+def get_rank(user):
+    """Rank of a user, or None if they are not on the leaderboard"""
+    ensure_leaderboard()
+    return LeaderboardEntry.objects.filter(user_id=user.pk).values_list('rank', flat=True).first()
+
+
+# Windowed and scoped leaderboards, summed from the DailyXP rollups
+
+WINDOWS = ('week', 'month', 'term', 'all')
+SCOPES = ('global', 'school', 'classroom')
+
+# First day (month, day) of each school term: French trimesters by default
+DEFAULT_TERM_STARTS = ((9, 1), (12, 1), (3, 1))
+
+
+@dataclass
+class RankedUser:
+    """A user's position on a windowed leaderboard"""
+    user: User
+    rank: int
+    xp: int
+    exercises_solved: int = None
+
+    @property
+    def user_id(self):
+        return self.user.pk
+
+    @property
+    def level(self):
+        return self.user.level
+
+    @property
+    def badges_count(self):
+        return len(self.user.earned_badges.all())
+
+
+def window_bounds(window, today=None):
+    """First and last day of the week, month or school term containing today"""
+    if today is None:
+        today = timezone.localdate()
+    if window == 'week':
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=6)
+    if window == 'month':
+        start = today.replace(day=1)
+        return start, (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    if window == 'term':
+        starts = sorted(
+            date(year, month, day)
+            for year in (today.year - 1, today.year, today.year + 1)
+            for month, day in _setting('LEADERBOARD_TERM_STARTS', DEFAULT_TERM_STARTS)
+        )
+        start = max(d for d in starts if d <= today)
+        return start, min(d for d in starts if d > today) - timedelta(days=1)
+    if window == 'all':
+        return None, None
+    raise ValueError(f"Unknown leaderboard window: {window}")
+
+
+def _scores(window, scope, scope_id, today=None):
+    """(user_id, total) rows for every student of the scope with XP in the window"""
+    if window == 'all':
+        scores = User.objects.annotate(user_id=F('pk'), total=F('xp'))
+        prefix = ''
+    else:
+        start, end = window_bounds(window, today)
+        scores = DailyXP.objects.filter(day__range=(start, end)).values('user_id').annotate(total=Sum('xp'))
+        prefix = 'user__'
+
+    scores = scores.filter(**{
+        f'{prefix}role': User.Role.STUDENT,
+        f'{prefix}is_active': True,
+    })
+    # Membership goes through a subquery so a student in several classrooms is counted once
+    if scope == 'classroom':
+        members = Enrollment.objects.filter(classroom_id=scope_id)
+    elif scope == 'school':
+        members = Enrollment.objects.filter(classroom__school_name=scope_id)
+    elif scope == 'global':
+        members = None
+    else:
+        raise ValueError(f"Unknown leaderboard scope: {scope}")
+    if members is not None:
+        scores = scores.filter(**{f'{prefix}pk__in': members.values('user_id')})
+
+    return scores.filter(total__gt=0).values('user_id', 'total')
+
+
+def parse_cursor(after):
+    """Decode a 'total.user_id' keyset cursor, None when missing or invalid"""
+    try:
+        total, user_id = after.split('.')
+        return int(total), int(user_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _ranked_page(scores, cursor, limit):
+    """One page of (user_id, total, rank) after the cursor, and whether more rows follow"""
+    page = scores.order_by('-total', 'user_id')
+    if cursor is not None:
+        total, user_id = cursor
+        page = page.filter(Q(total__lt=total) | Q(total=total, user_id__gt=user_id))
+    page = list(page.values_list('user_id', 'total')[:limit + 1])
+    has_next = len(page) > limit
+    page = page[:limit]
+    if not page:
+        return [], False
+
+    # Rows before the page all have a higher score, or the cursor's score
+    if cursor is None:
+        offset, first_rank = 0, 1
+    else:
+        total, user_id = cursor
+        offset = scores.filter(Q(total__gt=total) | Q(total=total, user_id__lte=user_id)).count()
+        if page[0][1] == total:
+            first_rank = scores.filter(total__gt=total).count() + 1
+        else:
+            first_rank = offset + 1
+
+    rows, rank = [], first_rank
+    for i, (user_id, total) in enumerate(page):
+        if i and total != page[i - 1][1]:
+            rank = offset + i + 1
+        rows.append((user_id, total, rank))
+    return rows, has_next
+
+
+def windowed_leaderboard(window, scope='global', scope_id=None, after=None, limit=50, today=None):
+    """A page of the leaderboard for a window and a scope
+
+    Returns the RankedUser list and the cursor of the next page (None on
+    the last page). The first page is cached for LEADERBOARD_PAGE_TTL.
+    """
+    cursor = parse_cursor(after)
+    key = None
+    if cursor is None:
+        start, _ = window_bounds(window, today)
+        scope_key = hashlib.md5(str(scope_id).encode()).hexdigest()[:12]
+        key = f'gamification:leaderboard:{window}:{start}:{scope}:{scope_key}:{limit}'
+        cached = cache.get(key)
+    if key is None or cached is None:
+        cached = _ranked_page(_scores(window, scope, scope_id, today), cursor, limit)
+        if key is not None:
+            cache.set(key, cached, _setting('LEADERBOARD_PAGE_TTL', 60))
+    rows, has_next = cached
+
+    users = User.objects.prefetch_related('earned_badges__badge').in_bulk([row[0] for row in rows])
+    entries = [
+        RankedUser(user=users[user_id], rank=rank, xp=total)
+        for user_id, total, rank in rows
+        if user_id in users
+    ]
+    next_cursor = f'{rows[-1][1]}.{rows[-1][0]}' if has_next else None
+    return entries, next_cursor
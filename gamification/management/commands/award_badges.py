@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from accounts.models import User
+from gamification.engine import award_badges_bulk
+
+
+class Command(BaseCommand):
+    help = 'Re-evaluate badges for all students in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of users evaluated per batch'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        students = User.objects.filter(role=User.Role.STUDENT, is_active=True).only('id', 'xp').order_by('pk')
+
+        users_rewarded = 0
+        badges_awarded = 0
+        last_pk = 0
+        while True:
+            batch = list(students.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            awarded = award_badges_bulk(batch)
+            users_rewarded += len(awarded)
+            badges_awarded += sum(len(badges) for badges in awarded.values())
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Awarded {badges_awarded} badges to {users_rewarded} users'
+            )
+        )
@@ -79,28 +79,36 @@ class Command(BaseCommand):
                 'name': 'Premier pas',
                 'description': 'Réussir votre premier exercice',
                 'icon': '🎯',
-                'xp_reward': 50
+                'xp_reward': 50,
+                'rule': Achievement.Rule.EXERCISES_PASSED,
+                'threshold': 1
             },
             {
                 'code': 'TEN_EXERCISES',
                 'name': 'Persévérant',
                 'description': 'Réussir 10 exercices différents',
                 'icon': '🔟',
-                'xp_reward': 100
+                'xp_reward': 100,
+                'rule': Achievement.Rule.EXERCISES_PASSED,
+                'threshold': 10
             },
             {
                 'code': 'PERFECT_SCORE',
                 'name': 'Perfectionniste',
                 'description': 'Obtenir un score parfait',
                 'icon': '💯',
-                'xp_reward': 75
+                'xp_reward': 75,
+                'rule': Achievement.Rule.PERFECT_SCORE,
+                'threshold': 100
             },
             {
                 'code': 'WEEK_STREAK',
                 'name': 'Régulier',
                 'description': 'Connexion 7 jours d\'affilée',
                 'icon': '🔥',
-                'xp_reward': 150
+                'xp_reward': 150,
+                'rule': Achievement.Rule.STREAK,
+                'threshold': 7
             }
         ]
         
@@ -0,0 +1,51 @@
+"""
+Management command running the reward job queue
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from gamification.jobs import default_worker_name, process_pending
+from gamification.leaderboard import refresh_leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Process queued reward jobs (badges, achievements, streaks) and refresh the leaderboard'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Number of jobs claimed at once'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.5,
+            help='Seconds to wait when the queue is empty'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the jobs currently queued, then exit'
+        )
+
+    def handle(self, *args, **options):
+        worker = default_worker_name()
+        self.stdout.write(f'Reward worker {worker} started')
+
+        total = 0
+        try:
+            while True:
+                processed = process_pending(worker, options['batch_size'])
+                total += processed
+                refresh_leaderboard()
+                if processed:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'✓ {total} reward jobs processed'))
@@ -0,0 +1,43 @@
+# Generated by Django 5.0 on 2026-10-17 21:59
+
+from django.db import migrations, models
+
+
+DEFAULT_RULES = {
+    'FIRST_EXERCISE': ('EXERCISES_PASSED', 1),
+    'TEN_EXERCISES': ('EXERCISES_PASSED', 10),
+    'PERFECT_SCORE': ('PERFECT_SCORE', 100),
+    'WEEK_STREAK': ('STREAK', 7),
+}
+
+
+def set_default_rules(apps, schema_editor):
+    Achievement = apps.get_model('gamification', 'Achievement')
+    for code, (rule, threshold) in DEFAULT_RULES.items():
+        Achievement.objects.filter(code=code).update(rule=rule, threshold=threshold)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='achievement',
+            name='is_active',
+            field=models.BooleanField(default=True, verbose_name='Actif'),
+        ),
+        migrations.AddField(
+            model_name='achievement',
+            name='rule',
+            field=models.CharField(choices=[('EXERCISES_PASSED', 'Exercices différents réussis'), ('PERFECT_SCORE', 'Meilleur score atteint'), ('STREAK', "Jours d'affilée")], default='EXERCISES_PASSED', help_text="Statistique de l'élève comparée au seuil", max_length=20, verbose_name='Règle'),
+        ),
+        migrations.AddField(
+            model_name='achievement',
+            name='threshold',
+            field=models.IntegerField(default=1, help_text="Valeur minimale de la statistique pour débloquer l'accomplissement", verbose_name='Seuil'),
+        ),
+        migrations.RunPython(set_default_rules, migrations.RunPython.noop),
+    ]
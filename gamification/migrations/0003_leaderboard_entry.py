@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-17 22:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_xp_ledger'),
+        ('gamification', '0002_achievement_rules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='leaderboard_entry', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('rank', models.PositiveIntegerField(db_index=True, verbose_name='Rang')),
+                ('xp', models.IntegerField(default=0, verbose_name='XP')),
+                ('level', models.IntegerField(default=1, verbose_name='Niveau')),
+                ('badges_count', models.IntegerField(default=0, verbose_name='Badges')),
+                ('exercises_solved', models.IntegerField(default=0, verbose_name='Exercices réussis')),
+            ],
+            options={
+                'verbose_name': 'Entrée du classement',
+                'verbose_name_plural': 'Entrées du classement',
+                'ordering': ['rank', '-level', 'user_id'],
+            },
+        ),
+    ]
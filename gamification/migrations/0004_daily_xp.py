@@ -0,0 +1,49 @@
+# Generated by Django 5.0 on 2026-10-17 22:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_daily_xp(apps, schema_editor):
+    """Roll the XP ledger up by day; opening balances have no date to fall on"""
+    XPTransaction = apps.get_model('accounts', 'XPTransaction')
+    DailyXP = apps.get_model('gamification', 'DailyXP')
+    rows = XPTransaction.objects.exclude(reason='OPENING').annotate(
+        day=TruncDate('created_at', tzinfo=timezone.get_current_timezone())
+    ).values('user_id', 'day').annotate(total=Sum('amount')).order_by()
+    DailyXP.objects.bulk_create(
+        [DailyXP(user_id=row['user_id'], day=row['day'], xp=row['total']) for row in rows],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0003_leaderboard_entry'),
+        ('accounts', '0002_xp_ledger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyXP',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Jour')),
+                ('xp', models.IntegerField(default=0, verbose_name='XP')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_xp', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'XP quotidienne',
+                'verbose_name_plural': 'XP quotidiennes',
+                'indexes': [models.Index(fields=['day', 'user'], name='gamificatio_day_eaf400_idx')],
+                'unique_together': {('user', 'day')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_xp, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0 on 2026-10-17 22:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0004_daily_xp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RewardJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(blank=True, help_text="Objet à l'origine du calcul, par exemple exercise:12", max_length=100, verbose_name='Source')),
+                ('status', models.CharField(choices=[('PENDING', 'En attente'), ('RUNNING', 'En cours'), ('DONE', 'Terminé'), ('FAILED', 'Échoué')], default='PENDING', max_length=10, verbose_name='Statut')),
+                ('result', models.JSONField(blank=True, default=dict, verbose_name='Récompenses obtenues')),
+                ('error', models.TextField(blank=True, verbose_name='Erreur')),
+                ('tries', models.IntegerField(default=0, verbose_name='Tentatives')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Disponible à partir de')),
+                ('claimed_at', models.DateTimeField(blank=True, null=True, verbose_name='Pris en charge le')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Terminé le')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reward_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Calcul de récompenses',
+                'verbose_name_plural': 'Calculs de récompenses',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='gamificatio_status_7e9c98_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-17 23:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0005_reward_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='leaderboardentry',
+            name='xp',
+            field=models.IntegerField(db_index=True, default=0, verbose_name='XP'),
+        ),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import connection, models
+from django.utils import timezone
 
 
 class Badge(models.Model):
@@ -123,11 +124,29 @@ class Streak(models.Model):
 class Achievement(models.Model):
     """Track specific achievements (first exercise, 10 exercises, etc.)"""
     
+    class Rule(models.TextChoices):
+        EXERCISES_PASSED = 'EXERCISES_PASSED', 'Exercices différents réussis'
+        PERFECT_SCORE = 'PERFECT_SCORE', 'Meilleur score atteint'
+        STREAK = 'STREAK', 'Jours d\'affilée'
+    
     code = models.CharField(max_length=50, unique=True, verbose_name='Code')
     name = models.CharField(max_length=100, verbose_name='Nom')
     description = models.TextField(verbose_name='Description')
     icon = models.CharField(max_length=50, default='⭐', verbose_name='Icône')
     xp_reward = models.IntegerField(default=50, verbose_name='XP récompensé')
+    rule = models.CharField(
+        max_length=20,
+        choices=Rule.choices,
+        default=Rule.EXERCISES_PASSED,
+        verbose_name='Règle',
+        help_text='Statistique de l\'élève comparée au seuil'
+    )
+    threshold = models.IntegerField(
+        default=1,
+        verbose_name='Seuil',
+        help_text='Valeur minimale de la statistique pour débloquer l\'accomplissement'
+    )
+    is_active = models.BooleanField(default=True, verbose_name='Actif')
     
     class Meta:
         verbose_name = 'Accomplissement'
@@ -160,3 +179,113 @@ class UserAchievement(models.Model):
     
     def __str__(self):
         return f"{self.user} - {self.achievement.name}"
+
+
+class LeaderboardEntry(models.Model):
+    """Precomputed leaderboard row, maintained by gamification.leaderboard"""
+    
+    user = models.OneToOneField(
+        'accounts.User',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='leaderboard_entry'
+    )
+    rank = models.PositiveIntegerField(db_index=True, verbose_name='Rang')
+    xp = models.IntegerField(default=0, db_index=True, verbose_name='XP')
+    level = models.IntegerField(default=1, verbose_name='Niveau')
+    badges_count = models.IntegerField(default=0, verbose_name='Badges')
+    exercises_solved = models.IntegerField(default=0, verbose_name='Exercices réussis')
+    
+    class Meta:
+        verbose_name = 'Entrée du classement'
+        verbose_name_plural = 'Entrées du classement'
+        ordering = ['rank', '-level', 'user_id']
+    
+    def __str__(self):
+        return f"#{self.rank} {self.user} - {self.xp} XP"
+
+
+class DailyXPManager(models.Manager):
+    def record(self, user_id, day, amount):
+        """Add an XP movement to the user's total for the day"""
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        sql = f"""
+            INSERT INTO {table} (user_id, day, xp)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (user_id, day) DO UPDATE SET
+                xp = {table}.xp + excluded.xp
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user_id, day, amount])
+
+
+class DailyXP(models.Model):
+    """XP earned by a user on a given day, summed for windowed leaderboards"""
+    
+    user = models.ForeignKey(
+        'accounts.User',
+        on_delete=models.CASCADE,
+        related_name='daily_xp'
+    )
+    day = models.DateField(verbose_name='Jour')
+    xp = models.IntegerField(default=0, verbose_name='XP')
+    
+    objects = DailyXPManager()
+    
+    class Meta:
+        verbose_name = 'XP quotidienne'
+        verbose_name_plural = 'XP quotidiennes'
+        unique_together = ['user', 'day']
+        indexes = [
+            models.Index(fields=['day', 'user']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user} - {self.day} : {self.xp} XP"
+
+
+class RewardJob(models.Model):
+    """Reward evaluation queued by the submit endpoint, run by process_rewards"""
+    
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'En attente'
+        RUNNING = 'RUNNING', 'En cours'
+        DONE = 'DONE', 'Terminé'
+        FAILED = 'FAILED', 'Échoué'
+    
+    user = models.ForeignKey(
+        'accounts.User',
+        on_delete=models.CASCADE,
+        related_name='reward_jobs'
+    )
+    source = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Source',
+        help_text='Objet à l\'origine du calcul, par exemple exercise:12'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Statut'
+    )
+    result = models.JSONField(default=dict, blank=True, verbose_name='Récompenses obtenues')
+    error = models.TextField(blank=True, verbose_name='Erreur')
+    tries = models.IntegerField(default=0, verbose_name='Tentatives')
+    worker = models.CharField(max_length=100, blank=True, verbose_name='Worker')
+    available_at = models.DateTimeField(default=timezone.now, verbose_name='Disponible à partir de')
+    claimed_at = models.DateTimeField(null=True, blank=True, verbose_name='Pris en charge le')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Terminé le')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Calcul de récompenses'
+        verbose_name_plural = 'Calculs de récompenses'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+    
+    def __str__(self):
+        return f"#{self.pk} {self.user} ({self.get_status_display()})"
@@ -0,0 +1,38 @@
+"""
+Signal handlers for gamification models
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts.models import XPTransaction
+from gamification.models import Achievement, DailyXP
+from gamification.engine import invalidate_achievement_definitions
+from gamification.leaderboard import update_entry
+
+
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Achievement)
+def achievement_changed(sender, **kwargs):
+    """Reload achievement definitions after any change"""
+    invalidate_achievement_definitions()
+
+
+@receiver(post_save, sender=XPTransaction)
+def xp_changed(sender, instance, created, **kwargs):
+    """Every XP change goes through the ledger: roll it up by day and
+    move the user on the leaderboard once it is committed
+
+    The leaderboard update is robust: if it fails, the error is logged and
+    the periodic rebuild fixes the ranks, while the XP change stays saved.
+    """
+    if not created:
+        return
+    if instance.reason != XPTransaction.Reason.OPENING:
+        DailyXP.objects.record(
+            instance.user_id,
+            timezone.localdate(instance.created_at),
+            instance.amount
+        )
+    transaction.on_commit(lambda: update_entry(instance.user_id), robust=True)
@@ -1,9 +1,22 @@
 """
 Tests for gamification models
 """
-from django.test import TestCase
+import json
+import time
+from datetime import date, timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
-from gamification.models import Badge, UserBadge, Achievement, UserAchievement
+from django.core.cache import cache
+from django.db import OperationalError
+from django.urls import reverse
+from django.utils import timezone
+from courses.models import Course, Chapter
+from exercises.models import Exercise
+from gamification.models import Badge, UserBadge, Achievement, UserAchievement, DailyXP, RewardJob
+from gamification.engine import award_badges, award_badges_bulk, award_achievements, UserStats
+from gamification import jobs, leaderboard, signals
 
 User = get_user_model()
 
@@ -105,3 +118,350 @@ class AchievementModelTest(TestCase):
             self.user.achievements.first().achievement.code,
             'FIRST_EXERCISE'
         )
+
+
+class BadgeEngineTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='test_student',
+            password='test123',
+            role=User.Role.STUDENT
+        )
+        self.badge_beginner = Badge.objects.create(
+            name='Beginner', code='BEGINNER', description='Start', xp_requirement=0
+        )
+        self.badge_bronze = Badge.objects.create(
+            name='Bronze', code='BRONZE', description='Reach 100 XP', xp_requirement=100
+        )
+        Badge.objects.create(
+            name='Retired', code='RETIRED', description='Inactive', xp_requirement=0, is_active=False
+        )
+
+    def test_award_badges_only_missing(self):
+        """Test the engine awards every qualifying badge exactly once"""
+        self.user.xp = 150
+        self.user.save()
+
+        awarded = award_badges(self.user)
+        self.assertEqual({b.code for b in awarded}, {'BEGINNER', 'BRONZE'})
+        self.assertEqual(self.user.earned_badges.count(), 2)
+
+        self.assertEqual(award_badges(self.user), [])
+        self.assertEqual(self.user.earned_badges.count(), 2)
+
+    def test_award_badges_query_count(self):
+        """Test the engine uses one lookup and one bulk insert"""
+        self.user.xp = 150
+        self.user.save()
+
+        with self.assertNumQueries(2):
+            award_badges(self.user)
+
+    def test_award_badges_bulk(self):
+        """Test batch mode evaluates a cohort with the same rules"""
+        other = User.objects.create_user(username='other', password='test123', xp=20)
+        UserBadge.objects.create(user=other, badge=self.badge_beginner)
+        self.user.xp = 120
+        self.user.save()
+
+        awarded = award_badges_bulk([self.user, other])
+        self.assertEqual(len(awarded[self.user.pk]), 2)
+        self.assertNotIn(other.pk, awarded)
+        self.assertEqual(UserBadge.objects.count(), 3)
+
+
+class AchievementRulesTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='test_student',
+            password='test123',
+            role=User.Role.STUDENT
+        )
+        Achievement.objects.create(
+            code='FIRST_EXERCISE', name='First', description='First pass',
+            xp_reward=50, rule=Achievement.Rule.EXERCISES_PASSED, threshold=1
+        )
+        Achievement.objects.create(
+            code='TEN_EXERCISES', name='Ten', description='Ten passes',
+            xp_reward=100, rule=Achievement.Rule.EXERCISES_PASSED, threshold=10
+        )
+        Achievement.objects.create(
+            code='PERFECT_SCORE', name='Perfect', description='Perfect score',
+            xp_reward=75, rule=Achievement.Rule.PERFECT_SCORE, threshold=100
+        )
+
+    def test_rules_evaluated_against_snapshot(self):
+        """Test every unlocked rule is awarded at once with its XP"""
+        stats = UserStats(exercises_passed=1, best_score=100)
+        awarded = award_achievements(self.user, stats=stats)
+
+        self.assertEqual({a.code for a in awarded}, {'FIRST_EXERCISE', 'PERFECT_SCORE'})
+        self.assertEqual(self.user.achievements.count(), 2)
+        self.assertEqual(self.user.xp, 125)
+
+        self.assertEqual(award_achievements(self.user, stats=stats), [])
+        self.assertEqual(self.user.xp, 125)
+
+    def test_definitions_refreshed_on_change(self):
+        """Test a new achievement is picked up without restarting"""
+        stats = UserStats(current_streak=7)
+        self.assertEqual(award_achievements(self.user, stats=stats), [])
+
+        Achievement.objects.create(
+            code='WEEK_STREAK', name='Week', description='Seven days',
+            xp_reward=150, rule=Achievement.Rule.STREAK, threshold=7
+        )
+        awarded = award_achievements(self.user, stats=stats)
+        self.assertEqual([a.code for a in awarded], ['WEEK_STREAK'])
+
+
+class LeaderboardTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.students = [
+            User.objects.create_user(
+                username=f'student_{xp}_{i}',
+                password='test123',
+                role=User.Role.STUDENT,
+                xp=xp
+            )
+            for i, xp in enumerate([300, 100, 300, 50])
+        ]
+        User.objects.create_user(username='teacher', password='test123', role=User.Role.TEACHER, xp=1000)
+
+    def test_ranks(self):
+        """Test students are ranked by XP with ties sharing a rank"""
+        top = leaderboard.get_top(4)
+        self.assertEqual([entry.rank for entry in top], [1, 1, 3, 4])
+        self.assertEqual(leaderboard.get_rank(self.students[3]), 4)
+
+    def test_rank_read_from_index(self):
+        """Test a fresh leaderboard is read without rebuilding"""
+        leaderboard.ensure_leaderboard()
+        with self.assertNumQueries(1):
+            self.assertEqual(leaderboard.get_rank(self.students[1]), 3)
+
+    def ranks(self):
+        return dict(leaderboard.LeaderboardEntry.objects.values_list('user_id', 'rank'))
+
+    def test_entry_moved_after_xp_change(self):
+        """Test an XP change only moves the students passed on the way, as a rebuild would"""
+        leaderboard.ensure_leaderboard()
+        newcomer = User.objects.create_user(username='newcomer', password='test123', role=User.Role.STUDENT)
+        changes = [(newcomer, 100), (self.students[3], 500), (self.students[0], -250), (self.students[1], 200)]
+        for student, points in changes:
+            with self.captureOnCommitCallbacks(execute=True):
+                student.add_xp(points)
+            ranks = self.ranks()
+            leaderboard.rebuild_leaderboard()
+            self.assertEqual(ranks, self.ranks())
+        self.assertEqual(leaderboard.get_rank(self.students[3]), 1)
+        self.assertEqual(leaderboard.get_rank(newcomer), 4)
+
+    def test_xp_change_does_not_rebuild(self):
+        """Test the table is not rebuilt when a student earns XP"""
+        leaderboard.ensure_leaderboard()
+        with mock.patch.object(leaderboard, 'rebuild_leaderboard') as rebuild, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.students[3].add_xp(100)
+        rebuild.assert_not_called()
+        self.assertEqual(leaderboard.get_rank(self.students[3]), 3)
+
+    def test_first_update_builds_table(self):
+        """Test the first XP change ranks every student, not only the one who earned it"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.students[1].add_xp(10)
+        self.assertEqual(self.ranks(), {
+            self.students[0].pk: 1, self.students[2].pk: 1, self.students[1].pk: 3, self.students[3].pk: 4,
+        })
+
+    def test_failed_update_keeps_xp(self):
+        """Test a leaderboard error after the commit is logged and the XP change kept"""
+        leaderboard.ensure_leaderboard()
+        with mock.patch.object(signals, 'update_entry', side_effect=OperationalError('deadlock detected')), \
+                self.assertLogs(level='ERROR'), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.students[3].add_xp(100)
+        self.students[3].refresh_from_db()
+        self.assertEqual(self.students[3].xp, 150)
+
+    @override_settings(REWARDS_ASYNC=False)
+    def test_stale_table_refreshed_in_background(self):
+        """Test the first read after the TTL starts one background rebuild without the worker"""
+        leaderboard.ensure_leaderboard()
+        newcomer = User.objects.create_user(username='newcomer', password='test123', role=User.Role.STUDENT)
+        cache.set(leaderboard.BUILT_AT_KEY, time.time() - 3600, None)
+        with mock.patch.object(leaderboard.threading, 'Thread') as thread:
+            leaderboard.get_rank(newcomer)
+            leaderboard.get_rank(newcomer)
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+
+        with mock.patch.object(leaderboard.connections, 'close_all'):
+            thread.call_args.kwargs['target']()
+        self.assertEqual(leaderboard.get_rank(newcomer), 5)
+        self.assertIsNone(cache.get(leaderboard.LOCK_KEY))
+
+    @override_settings(REWARDS_ASYNC=True)
+    def test_worker_refreshes_stale_table(self):
+        """Test reads leave the refresh to the reward worker when it runs"""
+        leaderboard.ensure_leaderboard()
+        cache.set(leaderboard.BUILT_AT_KEY, time.time() - 3600, None)
+        with mock.patch.object(leaderboard.threading, 'Thread') as thread:
+            leaderboard.get_rank(self.students[0])
+        thread.assert_not_called()
+
+    def test_refresh_after_ttl(self):
+        """Test the worker refresh only rebuilds a table older than the TTL"""
+        leaderboard.ensure_leaderboard()
+        self.assertFalse(leaderboard.refresh_leaderboard())
+        cache.set(leaderboard.BUILT_AT_KEY, time.time() - 3600, None)
+        cache.add(leaderboard.LOCK_KEY, True)
+        self.assertFalse(leaderboard.refresh_leaderboard())
+        cache.delete(leaderboard.LOCK_KEY)
+        self.assertTrue(leaderboard.refresh_leaderboard())
+
+    def test_leaderboard_view(self):
+        """Test the leaderboard page lists ranked students"""
+        self.client.force_login(self.students[1])
+        response = self.client.get(reverse('gamification:leaderboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['students']), 4)
+        self.assertEqual(response.context['user_rank'], 3)
+
+
+class WindowedLeaderboardTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        from accounts.models import Classroom, Enrollment
+        teacher = User.objects.create_user(username='teacher', password='test123', role=User.Role.TEACHER)
+        self.classroom = Classroom.objects.create(name='1NSI', school_name='Lycée Test', teacher=teacher)
+        self.students = []
+        for i, xp in enumerate([40, 30, 30, 30, 10]):
+            student = User.objects.create_user(username=f'student{i}', password='test123', role=User.Role.STUDENT)
+            student.add_xp(xp)
+            self.students.append(student)
+        for student in self.students[:3]:
+            Enrollment.objects.create(user=student, classroom=self.classroom)
+        # XP from an earlier week only counts for the month and the term
+        DailyXP.objects.record(self.students[4].pk, date(2000, 1, 1), 1000)
+
+    def test_daily_rollup_written_from_ledger(self):
+        """Test XP changes are summed per user and day"""
+        self.students[0].add_xp(-5)
+        rollup = DailyXP.objects.get(user=self.students[0], day=timezone.localdate())
+        self.assertEqual(rollup.xp, 35)
+
+    def test_window_bounds(self):
+        """Test week, month and term windows"""
+        today = date(2025, 1, 15)
+        self.assertEqual(leaderboard.window_bounds('week', today), (date(2025, 1, 13), date(2025, 1, 19)))
+        self.assertEqual(leaderboard.window_bounds('month', today), (date(2025, 1, 1), date(2025, 1, 31)))
+        self.assertEqual(leaderboard.window_bounds('term', today), (date(2024, 12, 1), date(2025, 2, 28)))
+
+    def test_keyset_pages_keep_ranks(self):
+        """Test ties keep their rank across keyset pages"""
+        first, cursor = leaderboard.windowed_leaderboard('week', limit=2)
+        self.assertEqual([(e.user, e.rank, e.xp) for e in first], [
+            (self.students[0], 1, 40), (self.students[1], 2, 30)
+        ])
+        second, cursor = leaderboard.windowed_leaderboard('week', after=cursor, limit=2)
+        self.assertEqual([(e.user, e.rank) for e in second], [(self.students[2], 2), (self.students[3], 2)])
+        last, cursor = leaderboard.windowed_leaderboard('week', after=cursor, limit=2)
+        self.assertEqual([(e.user, e.rank) for e in last], [(self.students[4], 5)])
+        self.assertIsNone(cursor)
+
+    def test_classroom_scope(self):
+        """Test a classroom board only ranks its students"""
+        entries, _ = leaderboard.windowed_leaderboard('term', 'classroom', self.classroom.pk)
+        self.assertEqual([e.user for e in entries], self.students[:3])
+
+    def test_top_page_cached(self):
+        """Test the first page is served from the cache"""
+        leaderboard.windowed_leaderboard('month')
+        with self.assertNumQueries(2):
+            leaderboard.windowed_leaderboard('month')
+
+    def test_classroom_view_permission(self):
+        """Test students only see the boards of their classrooms"""
+        self.client.force_login(self.students[0])
+        url = reverse('gamification:leaderboard')
+        response = self.client.get(url, {'period': 'week', 'classroom': self.classroom.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['students']), 3)
+
+        self.client.force_login(self.students[4])
+        response = self.client.get(url, {'classroom': self.classroom.pk})
+        self.assertEqual(response.status_code, 404)
+
+    def test_classroom_view_invalid_id(self):
+        """Test a non-numeric classroom id gives a 404"""
+        self.client.force_login(self.students[0])
+        response = self.client.get(reverse('gamification:leaderboard'), {'classroom': 'abc'})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(REWARDS_ASYNC=True)
+class RewardJobTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='test_student',
+            password='test123',
+            role=User.Role.STUDENT
+        )
+        Badge.objects.create(code='BEGINNER', name='Beginner', description='Start', xp_requirement=0)
+        course = Course.objects.create(title='Test Course', level=Course.Level.PREMIERE)
+        chapter = Chapter.objects.create(course=course, title='Test Chapter', slug='test-chapter')
+        self.exercise = Exercise.objects.create(
+            chapter=chapter,
+            title='Test Exercise',
+            type=Exercise.ExerciseType.PYTHON,
+            statement_markdown='Test statement'
+        )
+
+    def submit(self):
+        self.client.force_login(self.user)
+        return self.client.post(
+            reverse('exercises:submit_attempt', args=[self.exercise.pk]),
+            json.dumps({'passed': True, 'score': 100}),
+            content_type='application/json'
+        ).json()
+
+    def test_rewards_delivered_after_processing(self):
+        """Test submit enqueues a job whose rewards are polled once processed"""
+        data = self.submit()
+        self.assertEqual(data['badges_awarded'], [])
+        self.assertFalse(UserBadge.objects.filter(user=self.user).exists())
+        self.assertFalse(self.client.get(data['rewards_url']).json()['done'])
+
+        self.assertEqual(jobs.process_pending(worker='test'), 1)
+        rewards = self.client.get(data['rewards_url']).json()
+        self.assertTrue(rewards['done'])
+        self.assertEqual([b['code'] for b in rewards['badges_awarded']], ['BEGINNER'])
+        self.assertEqual(self.user.streak.current_streak, 1)
+
+    def test_job_claimed_once(self):
+        """Test a claimed job cannot be claimed by another worker"""
+        job = jobs.enqueue_rewards(self.user)
+        self.assertEqual(jobs.claim_jobs('worker-1'), [job])
+        self.assertEqual(jobs.claim_jobs('worker-2'), [])
+
+    def test_failed_job_retried(self):
+        """Test a failing job goes back to the queue with a delay"""
+        job = jobs.enqueue_rewards(self.user)
+        with mock.patch('gamification.jobs.run_rewards', side_effect=RuntimeError('boom')):
+            jobs.process_pending(worker='test')
+        job.refresh_from_db()
+        self.assertEqual(job.status, RewardJob.Status.PENDING)
+        self.assertEqual(job.tries, 1)
+        self.assertGreater(job.available_at, timezone.now())
+
+    def test_stale_job_requeued(self):
+        """Test jobs left running by a dead worker are given back"""
+        job = jobs.enqueue_rewards(self.user)
+        jobs.claim_jobs('dead-worker')
+        RewardJob.objects.filter(pk=job.pk).update(claimed_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(jobs.process_pending(worker='test'), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, RewardJob.Status.DONE)
@@ -9,4 +9,7 @@ urlpatterns = [
     
     # Leaderboard
     path('leaderboard/', views.LeaderboardView.as_view(), name='leaderboard'),
+    
+    # Reward job polling (AJAX)
+    path('rewards/<int:pk>/', views.RewardJobView.as_view(), name='reward_job'),
 ]
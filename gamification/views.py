@@ -1,9 +1,13 @@
-from django.shortcuts import render
+from urllib.parse import urlencode
+
+from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.views.generic import ListView
-from django.db.models import Count, Q
-from .models import Badge, UserBadge
-from accounts.models import User
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.views.generic import ListView, View
+from .models import Badge, UserBadge, RewardJob
+from .leaderboard import WINDOWS, get_leaderboard, get_top, get_rank, windowed_leaderboard
+from accounts.models import Classroom
 
 
 class BadgeListView(LoginRequiredMixin, ListView):
@@ -27,31 +31,111 @@ class BadgeListView(LoginRequiredMixin, ListView):
 
 
 class LeaderboardView(LoginRequiredMixin, ListView):
-    """Display leaderboard of top users"""
-    model = User
+    """Display leaderboard of top users
+    
+    ?period=week|month|term|all and ?classroom=<id> or ?scope=school pick
+    the board. The all-time global board reads the precomputed ranks, the
+    others are summed from daily XP rollups and paginated with ?after=.
+    """
     template_name = 'gamification/leaderboard.html'
-    context_object_name = 'users'
+    context_object_name = 'students'
     paginate_by = 50
     
+    def get(self, request, *args, **kwargs):
+        self.period = request.GET.get('period', 'all')
+        if self.period not in WINDOWS:
+            self.period = 'all'
+        self.classroom = None
+        self.scope, self.scope_id = 'global', None
+        
+        classroom_id = request.GET.get('classroom')
+        if classroom_id:
+            if not classroom_id.isdigit():
+                raise Http404('Invalid classroom id')
+            self.classroom = get_object_or_404(self.visible_classrooms(), pk=classroom_id)
+            self.scope, self.scope_id = 'classroom', self.classroom.pk
+        if request.GET.get('scope') == 'school':
+            classroom = self.classroom or self.visible_classrooms().first()
+            if classroom is not None:
+                self.scope, self.scope_id = 'school', classroom.school_name
+        
+        self.next_cursor = None
+        return super().get(request, *args, **kwargs)
+    
+    def visible_classrooms(self):
+        """Classrooms whose leaderboard the user may see"""
+        user = self.request.user
+        if user.is_staff:
+            return Classroom.objects.all()
+        return Classroom.objects.filter(
+            Q(teacher=user) | Q(enrollments__user=user)
+        ).distinct()
+    
+    @property
+    def is_windowed(self):
+        return self.period != 'all' or self.scope != 'global'
+    
+    def get_paginate_by(self, queryset):
+        # Windowed boards are paginated with a keyset cursor instead
+        return None if self.is_windowed else self.paginate_by
+    
     def get_queryset(self):
-        return User.objects.filter(
-            role=User.Role.STUDENT,
-            is_active=True
-        ).annotate(
-            badges_count=Count('earned_badges')
-        ).order_by('-xp', '-level')
+        if self.is_windowed:
+            students, self.next_cursor = windowed_leaderboard(
+                self.period, self.scope, self.scope_id,
+                after=self.request.GET.get('after'),
+                limit=self.paginate_by
+            )
+            return students
+        # Ranks are precomputed, see gamification.leaderboard
+        return get_leaderboard().prefetch_related('user__earned_badges__badge')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Add user's rank
-        user = self.request.user
-        if user.is_student:
-            users_above = User.objects.filter(
-                role=User.Role.STUDENT,
-                is_active=True,
-                xp__gt=user.xp
-            ).count()
-            context['user_rank'] = users_above + 1
+        scope_params = {}
+        if self.classroom:
+            scope_params['classroom'] = self.classroom.pk
+        if self.scope == 'school':
+            scope_params['scope'] = 'school'
+        context.update({
+            'period': self.period,
+            'classroom': self.classroom,
+            'scope': self.scope,
+            'school_name': self.scope_id if self.scope == 'school' else None,
+            'scope_query': ''.join(f'&{key}={value}' for key, value in scope_params.items()),
+        })
+        
+        if self.is_windowed:
+            context['top_students'] = windowed_leaderboard(
+                self.period, self.scope, self.scope_id, limit=self.paginate_by
+            )[0][:3]
+            if self.next_cursor:
+                context['next_url'] = '?' + urlencode({'period': self.period, **scope_params, 'after': self.next_cursor})
+        else:
+            context['top_students'] = get_top(3)
+            page = context['page_obj']
+            if page and page.has_next():
+                context['next_url'] = '?' + urlencode({'page': page.next_page_number()})
+            
+            # Add user's rank
+            user = self.request.user
+            if user.is_student:
+                context['user_rank'] = get_rank(user)
         
         return context
+
+
+class RewardJobView(LoginRequiredMixin, View):
+    """Status and rewards of a queued reward job (AJAX polling endpoint)"""
+    
+    def get(self, request, pk):
+        job = get_object_or_404(RewardJob, pk=pk, user=request.user)
+        return JsonResponse({
+            'status': job.status,
+            'done': job.status in (RewardJob.Status.DONE, RewardJob.Status.FAILED),
+            'badges_awarded': job.result.get('badges', []),
+            'achievements_awarded': job.result.get('achievements', []),
+            'total_xp': job.result.get('total_xp'),
+            'level': job.result.get('level'),
+        })
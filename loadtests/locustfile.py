@@ -0,0 +1,195 @@
+"""
+Classroom burst: a class works on the same chapter while its teacher watches.
+
+The students log in over the first minute, open the chapter and an
+exercise, sometimes take a hint, then wait for each other and submit
+together, as when the teacher says "run your code now". They then move to
+the next exercise of the plan and start again. The teacher reloads the
+classroom page every few seconds.
+
+    python -m loadtests.prepare
+    python manage.py runserver --noreload      # or gunicorn, see start.py
+    locust -f loadtests/locustfile.py --headless --host http://127.0.0.1:8000
+
+Environment:
+    LOADTEST_PLAN       plan written by loadtests.prepare (loadtests/plan.json)
+    LOADTEST_DURATION   length of the run in seconds (300)
+    LOADTEST_REPORT     also write the per-endpoint report to this JSON file
+
+Requests are named after their URL name, like the /metrics histograms,
+and a throughput and latency table per endpoint is printed at the end.
+"""
+import json
+import os
+import random
+from itertools import count
+from pathlib import Path
+
+from gevent.event import Event
+from locust import HttpUser, LoadTestShape, between, constant, events, task
+
+
+PLAN = json.loads(Path(os.environ.get('LOADTEST_PLAN', Path(__file__).with_name('plan.json'))).read_text())
+DURATION = int(os.environ.get('LOADTEST_DURATION', 300))
+LOGIN_WINDOW = 60
+# Longer than the login window, so the first burst waits for the whole class
+BURST_TIMEOUT = 90
+HINT_RATE = 0.4
+PASS_RATE = 0.6
+
+CODE = 'def somme(t):\n    s = 0\n    for x in t:\n        s += x\n    return s\n'
+
+
+class Burst:
+    """Releases the waiting students together once the whole class is ready
+
+    Users are greenlets of one process, so no lock is needed. After
+    BURST_TIMEOUT seconds the students already waiting go anyway, so a
+    student whose requests failed cannot block the class.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.waiting = 0
+        self.event = Event()
+
+    def _release(self, event):
+        if self.event is event:
+            self.waiting = 0
+            self.event = Event()
+            event.set()
+
+    def wait(self):
+        event = self.event
+        self.waiting += 1
+        if self.waiting >= self.size:
+            self._release(event)
+        elif not event.wait(BURST_TIMEOUT):
+            self._release(event)
+
+
+burst = Burst(len(PLAN['students']))
+_usernames = count()
+
+
+def check_json(response):
+    """Fail AJAX responses with the error message of the view"""
+    try:
+        body = response.json()
+    except ValueError:
+        if not response.ok:
+            response.failure(f'HTTP {response.status_code}')
+        return
+    if not body.get('success'):
+        response.failure(body.get('error') or f'HTTP {response.status_code}')
+    elif not response.ok:
+        response.failure(f'HTTP {response.status_code}')
+
+
+class ClassUser(HttpUser):
+    abstract = True
+    username = None
+
+    def on_start(self):
+        self.client.get('/accounts/login/', name='accounts:login')
+        with self.client.post(
+            '/accounts/login/',
+            data={
+                'username': self.username,
+                'password': PLAN['password'],
+                'csrfmiddlewaretoken': self.client.cookies.get('csrftoken', ''),
+            },
+            name='accounts:login',
+            catch_response=True,
+        ) as response:
+            if 'sessionid' not in self.client.cookies:
+                response.failure(f'login failed for {self.username}')
+
+
+class Student(ClassUser):
+    fixed_count = len(PLAN['students'])
+    wait_time = between(1, 5)
+
+    def on_start(self):
+        self.username = PLAN['students'][next(_usernames) % len(PLAN['students'])]
+        self.round = 0
+        super().on_start()
+
+    @task
+    def work_on_exercise(self):
+        exercise = PLAN['exercises'][self.round % len(PLAN['exercises'])]
+        self.round += 1
+        self.client.get(PLAN['chapter_url'], name='courses:chapter_detail')
+        self.client.get(exercise['url'], name='exercises:exercise_detail')
+        if exercise['hint_urls'] and random.random() < HINT_RATE:
+            with self.client.post(
+                random.choice(exercise['hint_urls']), name='exercises:use_hint', catch_response=True
+            ) as response:
+                check_json(response)
+
+        burst.wait()
+        passed = random.random() < PASS_RATE
+        with self.client.post(
+            exercise['submit_url'],
+            json={
+                'passed': passed,
+                'score': 100 if passed else random.randrange(0, 100, 10),
+                'attempt_data': {'type': 'PYTHON', 'code': CODE, 'duration': random.randint(30, 600)},
+            },
+            name='exercises:submit_attempt',
+            catch_response=True,
+        ) as response:
+            check_json(response)
+
+
+class Teacher(ClassUser):
+    fixed_count = 1
+    wait_time = constant(5)
+
+    def on_start(self):
+        self.username = PLAN['teacher']
+        super().on_start()
+
+    @task
+    def watch_classroom(self):
+        self.client.get(PLAN['classroom_url'], name='accounts:classroom_detail')
+
+
+class ClassroomShape(LoadTestShape):
+    """The whole class logs in within LOGIN_WINDOW, then stays until DURATION"""
+
+    def tick(self):
+        if self.get_run_time() > DURATION:
+            return None
+        users = len(PLAN['students']) + 1
+        return users, users / LOGIN_WINDOW
+
+
+def report(stats):
+    """Throughput and latency per endpoint"""
+    rows = []
+    for entry in sorted(stats.entries.values(), key=lambda entry: (entry.name, entry.method)):
+        rows.append({
+            'endpoint': f'{entry.method} {entry.name}',
+            'requests': entry.num_requests,
+            'failures': entry.num_failures,
+            'rps': round(entry.total_rps, 2),
+            'p50_ms': round(entry.get_response_time_percentile(0.5)),
+            'p95_ms': round(entry.get_response_time_percentile(0.95)),
+            'p99_ms': round(entry.get_response_time_percentile(0.99)),
+            'max_ms': round(entry.max_response_time or 0),
+        })
+    return rows
+
+
+@events.quitting.add_listener
+def print_report(environment, **kwargs):
+    rows = report(environment.stats)
+    print(f'\n{"endpoint":<36} {"requests":>8} {"fail":>5} {"req/s":>7} {"p50":>6} {"p95":>6} {"p99":>6} {"max":>6}')
+    for row in rows:
+        print(
+            f'{row["endpoint"]:<36} {row["requests"]:>8} {row["failures"]:>5} {row["rps"]:>7} '
+            f'{row["p50_ms"]:>6} {row["p95_ms"]:>6} {row["p99_ms"]:>6} {row["max_ms"]:>6}'
+        )
+    if os.environ.get('LOADTEST_REPORT'):
+        Path(os.environ['LOADTEST_REPORT']).write_text(json.dumps(rows, indent=2) + '\n')
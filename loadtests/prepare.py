@@ -0,0 +1,83 @@
+"""
+Create the class used by the load-test scenarios and write its plan.
+
+    python -m loadtests.prepare                  # 30 students, loadtests/plan.json
+    python -m loadtests.prepare --students 60
+
+Runs against the database of nsi_project.settings: SQLite by default, or
+the local Postgres given by DATABASE_URL (the server must use the same). The students and their teacher are
+generated by create_sample_data with a short history, once per prefix.
+The plan lists their usernames and the chapter, exercises and hints the
+class works on; the locustfile reads it.
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+
+
+PLAN = Path(__file__).with_name('plan.json')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m loadtests.prepare', description='Prepare the load-test class')
+    parser.add_argument('--students', type=int, default=30, help='Number of students in the class')
+    parser.add_argument('--exercises', type=int, default=5, help='Number of exercises worked on in turn')
+    parser.add_argument('--prefix', default='burst', help='Prefix of the generated usernames')
+    parser.add_argument('--password', default='eleve123', help='Password of the generated users')
+    parser.add_argument('--out', default=str(PLAN), help='Plan file (default loadtests/plan.json)')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nsi_project.settings')
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db.models import Count
+    from django.urls import reverse
+    from accounts.models import User, Classroom
+    from courses.models import Chapter
+
+    if not User.objects.filter(username__startswith=f'{args.prefix}_').exists():
+        call_command(
+            'create_sample_data',
+            students=args.students,
+            classrooms=1,
+            attempts=args.students * 20,
+            days=30,
+            prefix=args.prefix,
+            password=args.password,
+        )
+    students = list(User.objects.filter(
+        username__startswith=f'{args.prefix}_student'
+    ).order_by('pk').values_list('username', flat=True))
+    classroom = Classroom.objects.select_related('teacher').get(teacher__username__startswith=f'{args.prefix}_')
+
+    chapter = Chapter.objects.filter(
+        is_published=True, course__is_published=True
+    ).annotate(
+        exercise_count=Count('exercises', distinct=True)
+    ).filter(exercise_count__gt=0).select_related('course').order_by('-exercise_count', 'pk').first()
+    exercises = chapter.exercises.filter(is_published=True).prefetch_related('hints').order_by('order', 'pk')
+    plan = {
+        'password': args.password,
+        'students': students,
+        'teacher': classroom.teacher.username,
+        'classroom_url': reverse('accounts:classroom_detail', args=[classroom.pk]),
+        'chapter_url': reverse('courses:chapter_detail', args=[chapter.course.slug, chapter.slug]),
+        'exercises': [
+            {
+                'url': reverse('exercises:exercise_detail', args=[exercise.pk]),
+                'submit_url': reverse('exercises:submit_attempt', args=[exercise.pk]),
+                'hint_urls': [reverse('exercises:use_hint', args=[hint.pk]) for hint in exercise.hints.all()],
+            }
+            for exercise in exercises[:args.exercises]
+        ],
+    }
+    Path(args.out).write_text(json.dumps(plan, indent=2) + '\n')
+    print(f'✓ Plan for {len(students)} students of {classroom} written to {args.out}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,199 @@
+"""
+Per-URL latency, DB time and query count histograms.
+
+MetricsMiddleware observes every request under its resolved URL name.
+Observations are accumulated in the worker process and added to
+fixed-bucket counters in the METRICS_CACHE cache every
+METRICS_FLUSH_INTERVAL seconds with cache.incr, so every gunicorn worker
+adds to the same counters when the cache is shared (Redis, see
+REDIS_SETUP.md). With the default local-memory cache each worker only
+sees its own numbers.
+
+The /metrics endpoint renders the counters in the Prometheus text
+format. It requires `Authorization: Bearer <METRICS_TOKEN>` or a staff
+session.
+"""
+import atexit
+import hmac
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.http import HttpResponse
+from django.urls import URLPattern, URLResolver, get_resolver
+
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# name: (help, upper bounds, scale of the stored integer sum)
+HISTOGRAMS = {
+    'nsi_request_duration_seconds': ('Request latency by URL name', SECONDS_BUCKETS, 1_000_000),
+    'nsi_request_db_seconds': ('Database time per request by URL name', SECONDS_BUCKETS, 1_000_000),
+    'nsi_request_queries': ('SQL queries per request by URL name', QUERY_BUCKETS, 1),
+}
+
+UNRESOLVED = 'unresolved'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _cache():
+    return caches[_setting('METRICS_CACHE', 'default')]
+
+
+def _key(metric, url_name, part):
+    return f'metrics:{metric}:{url_name}:{part}'
+
+
+def _bucket(bounds, value):
+    """Index of the first bucket holding value, len(bounds) for +Inf"""
+    for i, bound in enumerate(bounds):
+        if value <= bound:
+            return i
+    return len(bounds)
+
+
+def url_names(patterns=None, namespace=None):
+    """Every named URL of the project, with its namespace"""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    names = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            ns = pattern.namespace
+            if namespace and ns:
+                ns = f'{namespace}:{ns}'
+            names += url_names(pattern.url_patterns, ns or namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.append(f'{namespace}:{pattern.name}' if namespace else pattern.name)
+    return names
+
+
+class Recorder:
+    """Observations of this process not yet added to the shared counters"""
+
+    def __init__(self):
+        self.pending = {}
+        self.flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def observe(self, url_name, duration, db_time, queries):
+        values = {
+            'nsi_request_duration_seconds': duration,
+            'nsi_request_db_seconds': db_time,
+            'nsi_request_queries': queries,
+        }
+        with self._lock:
+            for metric, value in values.items():
+                _, bounds, scale = HISTOGRAMS[metric]
+                for part, delta in (
+                    (_bucket(bounds, value), 1),
+                    ('sum', round(value * scale)),
+                    ('count', 1),
+                ):
+                    key = _key(metric, url_name, part)
+                    self.pending[key] = self.pending.get(key, 0) + delta
+        if time.monotonic() - self.flushed_at >= _setting('METRICS_FLUSH_INTERVAL', 10):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self.pending = self.pending, {}
+            self.flushed_at = time.monotonic()
+        cache = _cache()
+        for key, delta in pending.items():
+            if not delta:
+                continue
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                # First observation: another worker may create the key meanwhile
+                if not cache.add(key, delta, None):
+                    cache.incr(key, delta)
+
+
+recorder = Recorder()
+atexit.register(recorder.flush)
+
+
+class QueryCounter:
+    """execute_wrapper counting queries and their time, without looking at the SQL"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.view_name if match and match.url_name else UNRESOLVED
+        recorder.observe(url_name, duration, stats.duration, stats.count)
+        return response
+
+
+def render_metrics():
+    """Prometheus text exposition of every histogram"""
+    names = sorted(set(url_names())) + [UNRESOLVED]
+    keys = [
+        _key(metric, url_name, part)
+        for metric, (_, bounds, _) in HISTOGRAMS.items()
+        for url_name in names
+        for part in [*range(len(bounds) + 1), 'sum', 'count']
+    ]
+    values = _cache().get_many(keys)
+
+    lines = []
+    for metric, (help_text, bounds, scale) in HISTOGRAMS.items():
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} histogram')
+        for url_name in names:
+            count = values.get(_key(metric, url_name, 'count'))
+            if not count:
+                continue
+            label = f'url_name="{url_name}"'
+            cumulative = 0
+            for i, bound in enumerate([*bounds, '+Inf']):
+                cumulative += values.get(_key(metric, url_name, i), 0)
+                lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+            total = values.get(_key(metric, url_name, 'sum'), 0) / scale
+            lines.append(f'{metric}_sum{{{label}}} {total}')
+            lines.append(f'{metric}_count{{{label}}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint"""
+    token = _setting('METRICS_TOKEN', '')
+    auth = request.headers.get('Authorization', '')
+    allowed = bool(token) and hmac.compare_digest(auth.encode(), f'Bearer {token}'.encode())
+    if not allowed and not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+
+    recorder.flush()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
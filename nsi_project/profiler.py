@@ -0,0 +1,188 @@
+"""
+Opt-in sampling profiler for slow requests.
+
+With PROFILER_ENABLED, every request is registered with the sampler of
+its process when its view is resolved. The sampler thread sleeps until a
+request has been running for longer than the threshold of its URL name
+(PROFILER_THRESHOLDS, else PROFILER_DEFAULT_THRESHOLD seconds), then
+samples that request's stack every PROFILER_INTERVAL seconds until it
+returns. A PROFILER_SAMPLE_RATE share of the requests is sampled from
+the start.
+
+Requests run in gunicorn's worker threads, where Python cannot deliver
+timer signals, so the stacks are read with sys._current_frames() from
+the sampler thread instead. A request that stays under its threshold
+costs a dictionary insert and the SQL trace list.
+
+Each sampled request leaves two files in PROFILER_DIR: the collapsed
+stacks (`.folded`, the input of flamegraph.pl or speedscope) and the SQL
+trace without parameters (`.sql`). Only the PROFILER_MAX_DUMPS most
+recent requests are kept.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    base = str(settings.BASE_DIR)
+    if filename.startswith(base):
+        filename = filename[len(base) + 1:]
+    elif 'site-packages' in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[1]
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+def collapse(frame):
+    """Stack of a frame in the collapsed format, root first"""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame).replace(';', ':'))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class ProfiledRequest:
+    def __init__(self, request, url_name, arm_at):
+        self.path = request.path
+        self.method = request.method
+        self.url_name = url_name
+        self.thread_id = threading.get_ident()
+        self.started = time.perf_counter()
+        self.arm_at = arm_at
+        self.samples = Counter()
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((start - self.started, time.perf_counter() - start, sql))
+
+
+class Sampler:
+    """Background thread sampling the stacks of the armed requests of this process"""
+
+    def __init__(self):
+        self.active = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def register(self, profiled):
+        with self._lock:
+            self.active[profiled.thread_id] = profiled
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='request-sampler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def unregister(self, profiled):
+        with self._lock:
+            if self.active.get(profiled.thread_id) is profiled:
+                del self.active[profiled.thread_id]
+
+    def _run(self):
+        while True:
+            now = time.perf_counter()
+            with self._lock:
+                armed = [profiled for profiled in self.active.values() if profiled.arm_at <= now]
+                if armed:
+                    frames = sys._current_frames()
+                    for profiled in armed:
+                        frame = frames.get(profiled.thread_id)
+                        if frame is not None:
+                            profiled.samples[collapse(frame)] += 1
+                    timeout = _setting('PROFILER_INTERVAL', 0.005)
+                elif self.active:
+                    timeout = min(profiled.arm_at for profiled in self.active.values()) - now
+                else:
+                    timeout = None
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+
+sampler = Sampler()
+
+
+def dump(profiled, duration):
+    """Write the collapsed stacks and the SQL trace, then drop the oldest dumps"""
+    directory = Path(_setting('PROFILER_DIR', settings.BASE_DIR / 'profiles'))
+    directory.mkdir(parents=True, exist_ok=True)
+    name = '{}-{}-{}ms'.format(
+        datetime.now().strftime('%Y%m%d-%H%M%S-%f'),
+        (profiled.url_name or 'unresolved').replace(':', '_'),
+        round(duration * 1000)
+    )
+    stacks = sorted(profiled.samples.items(), key=lambda item: -item[1])
+    (directory / f'{name}.folded').write_text(''.join(f'{stack} {count}\n' for stack, count in stacks))
+
+    lines = [
+        f'-- {profiled.method} {profiled.path} ({profiled.url_name})',
+        f'-- {duration * 1000:.1f} ms, {len(profiled.queries)} queries, '
+        f'{sum(q[1] for q in profiled.queries) * 1000:.1f} ms in the database, '
+        f'{sum(profiled.samples.values())} samples',
+    ]
+    for offset, query_time, sql in profiled.queries:
+        lines.append(f'-- at {offset * 1000:.1f} ms, took {query_time * 1000:.1f} ms\n{sql};')
+    (directory / f'{name}.sql').write_text('\n'.join(lines) + '\n')
+
+    keep = _setting('PROFILER_MAX_DUMPS', 100)
+    # Names start with the timestamp
+    dumps = sorted(directory.glob('*.folded'))
+    for old in dumps[:-keep]:
+        old.unlink(missing_ok=True)
+        old.with_suffix('.sql').unlink(missing_ok=True)
+
+
+class SamplingProfilerMiddleware:
+    def __init__(self, get_response):
+        if not _setting('PROFILER_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request._profiled = None
+        response = self.get_response(request)
+        profiled = request._profiled
+        if profiled is not None:
+            sampler.unregister(profiled)
+            for connection in connections.all():
+                if profiled in connection.execute_wrappers:
+                    connection.execute_wrappers.remove(profiled)
+            if profiled.samples:
+                dump(profiled, time.perf_counter() - profiled.started)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        url_name = request.resolver_match.view_name
+        if random.random() < _setting('PROFILER_SAMPLE_RATE', 0.0):
+            threshold = 0
+        else:
+            threshold = _setting('PROFILER_THRESHOLDS', {}).get(
+                url_name, _setting('PROFILER_DEFAULT_THRESHOLD', 2.0)
+            )
+            if threshold is None:
+                return None
+        profiled = ProfiledRequest(request, url_name, time.perf_counter() + threshold)
+        for connection in connections.all():
+            connection.execute_wrappers.append(profiled)
+        request._profiled = profiled
+        sampler.register(profiled)
+        return None
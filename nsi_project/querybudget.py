@@ -0,0 +1,148 @@
+"""
+Per-request query instrumentation.
+
+QueryBudgetMiddleware counts the queries and the database time of every
+request through connection.execute_wrapper, and groups them by SQL shape
+(the parameterized SQL, IN lists collapsed) to spot N+1 patterns. With
+DEBUG the numbers are returned in X-DB-* response headers, otherwise
+requests over budget or with repeated shapes are logged as JSON.
+
+Budgets are set per URL name in DEFAULT_QUERY_BUDGETS, overridden by the
+QUERY_BUDGETS setting. With QUERY_BUDGET_STRICT (turned on by the test
+runner below) a request over budget raises QueryBudgetExceeded.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of queries per URL name. The batch endpoint is left out:
+# its work grows with the number of exercises in the batch.
+DEFAULT_QUERY_BUDGETS = {
+    'home': 5,
+    'dashboard': 10,
+    'courses:course_list': 10,
+    'courses:course_detail': 15,
+    'courses:chapter_detail': 25,
+    'exercises:exercise_detail': 15,
+    'exercises:submit_attempt': 50,
+    'exercises:use_hint': 30,
+    'exercises:attempt_list': 15,
+    'accounts:profile': 15,
+    'accounts:classroom_detail': 15,
+    'gamification:leaderboard': 20,
+    'gamification:badge_list': 10,
+    'gamification:reward_job': 5,
+}
+
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more queries than the budget of its URL name"""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def sql_shape(sql):
+    """SQL with parameter lists collapsed, identical for every row of an N+1 loop"""
+    return ' '.join(IN_LIST.sub('IN (...)', sql).split())
+
+
+def query_budget(url_name):
+    """Query budget of a URL name, None when unlimited"""
+    budgets = {**DEFAULT_QUERY_BUDGETS, **_setting('QUERY_BUDGETS', {})}
+    return budgets.get(url_name, _setting('QUERY_BUDGET_DEFAULT', None))
+
+
+class QueryStats:
+    """execute_wrapper counting queries, time and SQL shapes"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.shapes[sql_shape(sql)] += 1
+
+    def repeated(self, threshold):
+        """(count, shape) of the shapes run at least threshold times, most frequent first"""
+        return [(count, shape) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.view_name if match else None
+        budget = query_budget(url_name)
+        repeated = stats.repeated(_setting('QUERY_REPEAT_THRESHOLD', 5))
+        over_budget = budget is not None and stats.count > budget
+
+        if settings.DEBUG:
+            response['X-DB-Query-Count'] = str(stats.count)
+            response['X-DB-Query-Time-Ms'] = f'{stats.duration * 1000:.1f}'
+            if budget is not None:
+                response['X-DB-Query-Budget'] = str(budget)
+            if repeated:
+                response['X-DB-Repeated-Queries'] = ' | '.join(
+                    f'{count}x {shape[:200]}' for count, shape in repeated[:3]
+                ).encode('ascii', 'replace').decode()
+        elif repeated or over_budget:
+            record = {
+                'event': 'query_budget',
+                'path': request.path,
+                'url_name': url_name,
+                'queries': stats.count,
+                'db_time_ms': round(stats.duration * 1000, 1),
+                'budget': budget,
+                'repeated': [{'count': count, 'sql': shape[:500]} for count, shape in repeated[:5]],
+            }
+            logger.warning(json.dumps(record), extra={'query_stats': record})
+
+        if over_budget and _setting('QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(
+                f'{url_name} ran {stats.count} queries, budget is {budget}. '
+                f'Most repeated: {repeated[:1] or stats.shapes.most_common(1)}'
+            )
+        return response
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """Test runner failing the requests that go over their query budget"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.strict_budget = override_settings(QUERY_BUDGET_STRICT=True)
+        self.strict_budget.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.strict_budget.disable()
+        super().teardown_test_environment(**kwargs)
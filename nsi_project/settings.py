@@ -4,6 +4,7 @@ Django settings for nsi_project project.
 
 from pathlib import Path
 import os
+import dj_database_url
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -40,6 +41,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'nsi_project.metrics.MetricsMiddleware',  # Histogrammes de latence exposés sur /metrics
+    'nsi_project.querybudget.QueryBudgetMiddleware',  # Comptage des requêtes SQL et budgets
+    'nsi_project.profiler.SamplingProfilerMiddleware',  # Profilage des requêtes lentes (PROFILER_ENABLED)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -70,26 +74,15 @@ WSGI_APPLICATION = 'nsi_project.wsgi.application'
 
 
 # Database
-# Utiliser SQLite en développement, PostgreSQL en production
+# SQLite en développement ; DATABASE_URL pour un PostgreSQL local,
+# par exemple DATABASE_URL=postgres://postgres:@localhost:5432/nsi_platform
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': dj_database_url.config(
+        default=f'sqlite:///{BASE_DIR / "db.sqlite3"}',
+        conn_max_age=600,
+    )
 }
 
-# Pour PostgreSQL, décommentez ci-dessous et commentez SQLite
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.postgresql',
-#         'NAME': os.getenv('DATABASE_NAME', 'nsi_platform'),
-#         'USER': os.getenv('DATABASE_USER', 'postgres'),
-#         'PASSWORD': os.getenv('DATABASE_PASSWORD', ''),
-#         'HOST': os.getenv('DATABASE_HOST', 'localhost'),
-#         'PORT': os.getenv('DATABASE_PORT', '5432'),
-#     }
-# }
-
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -126,6 +119,9 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Requests over their query budget fail the tests (see nsi_project/querybudget.py)
+TEST_RUNNER = 'nsi_project.querybudget.QueryBudgetTestRunner'
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -133,3 +129,20 @@ AUTH_USER_MODEL = 'accounts.User'
 LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'home'
+
+# Evaluate badges, achievements and streaks in `manage.py process_rewards`
+# instead of inside the submit request. The worker also refreshes the
+# leaderboard every LEADERBOARD_TTL seconds; without it a background thread
+# of the web process does (see gamification/leaderboard.py)
+REWARDS_ASYNC = os.getenv('REWARDS_ASYNC', 'False') == 'True'
+
+# Buffer failed attempts in each worker and write them in bulk every
+# ATTEMPT_BUFFER_FLUSH_MS (see exercises/buffer.py)
+ATTEMPT_WRITE_BEHIND = os.getenv('ATTEMPT_WRITE_BEHIND', 'False') == 'True'
+
+# Bearer token of the Prometheus scraper on /metrics (staff sessions are
+# always allowed)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Sample the stacks of slow requests into PROFILER_DIR (see nsi_project/profiler.py)
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'False') == 'True'
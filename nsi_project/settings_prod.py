@@ -48,6 +48,9 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Pour servir les fichiers statiques
+    'nsi_project.metrics.MetricsMiddleware',  # Histogrammes de latence exposés sur /metrics
+    'nsi_project.querybudget.QueryBudgetMiddleware',  # Comptage des requêtes SQL et budgets
+    'nsi_project.profiler.SamplingProfilerMiddleware',  # Profilage des requêtes lentes (PROFILER_ENABLED)
     'django.middleware.gzip.GZipMiddleware',  # Compression des réponses
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -134,6 +137,23 @@ LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'home'
 
+# Evaluate badges, achievements and streaks in `manage.py process_rewards`
+# instead of inside the submit request. The worker also refreshes the
+# leaderboard every LEADERBOARD_TTL seconds; without it a background thread
+# of the web process does (see gamification/leaderboard.py)
+REWARDS_ASYNC = os.getenv('REWARDS_ASYNC', 'False') == 'True'
+
+# Buffer failed attempts in each worker and write them in bulk every
+# ATTEMPT_BUFFER_FLUSH_MS (see exercises/buffer.py)
+ATTEMPT_WRITE_BEHIND = os.getenv('ATTEMPT_WRITE_BEHIND', 'False') == 'True'
+
+# Bearer token of the Prometheus scraper on /metrics (staff sessions are
+# always allowed)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Sample the stacks of slow requests into PROFILER_DIR (see nsi_project/profiler.py)
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'False') == 'True'
+
 # Security settings for production
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
@@ -0,0 +1,194 @@
+"""
+Tests for the query budget, metrics and profiler middlewares
+"""
+import json
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from nsi_project import querybudget
+from nsi_project.metrics import recorder
+from nsi_project.profiler import SamplingProfilerMiddleware
+from nsi_project.querybudget import QueryBudgetExceeded, QueryBudgetMiddleware, QueryBudgetTestRunner, sql_shape
+
+User = get_user_model()
+
+
+class QueryBudgetMiddlewareTest(TestCase):
+    def setUp(self):
+        for i in range(6):
+            User.objects.create_user(username=f'student{i}', password='test123')
+
+    def _n_plus_one(self, request):
+        for user in User.objects.all():
+            User.objects.filter(pk=user.pk).exists()
+        return HttpResponse('ok')
+
+    def _request(self, path='/courses/'):
+        request = RequestFactory().get(path)
+        request.resolver_match = resolve(path)
+        return request
+
+    def test_sql_shape(self):
+        """Test parameter lists of any length give the same shape"""
+        self.assertEqual(
+            sql_shape('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            sql_shape('SELECT *\n  FROM t WHERE id IN (%s)')
+        )
+
+    @override_settings(DEBUG=True)
+    def test_debug_headers(self):
+        """Test counts and repeated shapes are returned in headers with DEBUG"""
+        response = QueryBudgetMiddleware(self._n_plus_one)(self._request())
+        self.assertEqual(response['X-DB-Query-Count'], '7')
+        self.assertIn('X-DB-Query-Time-Ms', response)
+        self.assertTrue(response['X-DB-Repeated-Queries'].startswith('6x SELECT'))
+
+    @override_settings(DEBUG=False, QUERY_BUDGET_STRICT=False, QUERY_BUDGETS={'courses:course_list': 3})
+    def test_structured_log(self):
+        """Test requests over budget are logged as JSON without DEBUG"""
+        with self.assertLogs('nsi_project.querybudget', 'WARNING') as logs:
+            response = QueryBudgetMiddleware(self._n_plus_one)(self._request())
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-DB-Query-Count', response)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['url_name'], 'courses:course_list')
+        self.assertEqual((record['queries'], record['budget']), (7, 3))
+        self.assertEqual(record['repeated'][0]['count'], 6)
+
+    @override_settings(QUERY_BUDGETS={'courses:course_list': 1})
+    def test_budget_fails_in_tests(self):
+        """Test the test runner turns a request over budget into an error"""
+        self.client.force_login(User.objects.first())
+        with self.assertLogs('nsi_project.querybudget', 'WARNING'), self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('courses:course_list'))
+
+    def test_runner_restores_setting(self):
+        """Test the strict budget is only enabled while the runner's environment is set up"""
+        strict = settings.QUERY_BUDGET_STRICT
+        runner = QueryBudgetTestRunner()
+        with override_settings(QUERY_BUDGET_STRICT=False):
+            with mock.patch('django.test.runner.setup_test_environment'), \
+                    mock.patch('django.test.runner.teardown_test_environment'):
+                runner.setup_test_environment()
+                self.assertTrue(settings.QUERY_BUDGET_STRICT)
+                runner.teardown_test_environment()
+            self.assertFalse(settings.QUERY_BUDGET_STRICT)
+        self.assertEqual(settings.QUERY_BUDGET_STRICT, strict)
+
+
+@override_settings(METRICS_FLUSH_INTERVAL=0, METRICS_TOKEN='secret')
+class MetricsTest(TestCase):
+    def setUp(self):
+        # Drop what the requests of other tests left in this process
+        recorder.pending.clear()
+        cache.clear()
+        self.user = User.objects.create_user(username='student', password='test123')
+        self.staff = User.objects.create_user(username='admin', password='test123', is_staff=True)
+
+    def test_histograms_exposed(self):
+        """Test each request is counted in the histograms of its URL name"""
+        self.client.force_login(self.user)
+        self.client.get(reverse('courses:course_list'))
+        self.client.get(reverse('courses:course_list'))
+        self.client.get('/no-such-page/')
+
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE nsi_request_duration_seconds histogram', body)
+        self.assertIn('nsi_request_duration_seconds_bucket{url_name="courses:course_list",le="+Inf"} 2', body)
+        self.assertIn('nsi_request_queries_count{url_name="courses:course_list"} 2', body)
+        self.assertIn('nsi_request_db_seconds_count{url_name="unresolved"} 1', body)
+        self.assertNotIn('url_name="exercises:submit_attempt"', body)
+
+    def test_sql_parsed_once(self):
+        """Test only the query budget middleware parses the SQL of each query"""
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries, \
+                mock.patch.object(querybudget, 'sql_shape', wraps=sql_shape) as shape:
+            self.client.get(reverse('courses:course_list'))
+        self.assertGreater(len(queries), 0)
+        self.assertEqual(shape.call_count, len(queries))
+
+    def test_metrics_protected(self):
+        """Test the endpoint needs the token or a staff session"""
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer nope').status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+class SamplingProfilerTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.dumps = Path(self.directory.name)
+
+    def _run(self, seconds):
+        request = RequestFactory().get('/courses/')
+        request.resolver_match = resolve('/courses/')
+
+        def slow_view(request):
+            middleware.process_view(request, slow_view, (), {})
+            User.objects.count()
+            busy_loop(seconds)
+            return HttpResponse('ok')
+
+        middleware = SamplingProfilerMiddleware(slow_view)
+        return middleware(request)
+
+    @override_settings(PROFILER_ENABLED=False)
+    def test_disabled(self):
+        """Test the middleware removes itself unless enabled"""
+        with self.assertRaises(MiddlewareNotUsed):
+            SamplingProfilerMiddleware(lambda request: None)
+
+    def test_slow_request_dumped(self):
+        """Test a request over its threshold leaves its stacks and SQL trace"""
+        with self.settings(PROFILER_ENABLED=True, PROFILER_DIR=self.dumps,
+                           PROFILER_THRESHOLDS={'courses:course_list': 0.05}):
+            self._run(0.3)
+        folded, = self.dumps.glob('*.folded')
+        self.assertIn('courses_course_list', folded.name)
+        stacks = folded.read_text().splitlines()
+        self.assertTrue(any('busy_loop (nsi_project/tests.py' in line for line in stacks))
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in stacks))
+        trace = folded.with_suffix('.sql').read_text()
+        self.assertIn('COUNT(*)', trace)
+
+    def test_fast_request_not_dumped(self):
+        """Test nothing is written for requests under their threshold"""
+        with self.settings(PROFILER_ENABLED=True, PROFILER_DIR=self.dumps, PROFILER_DEFAULT_THRESHOLD=5):
+            self._run(0.05)
+        self.assertEqual(list(self.dumps.iterdir()), [])
+
+    def test_dumps_rotated(self):
+        """Test only the most recent dumps are kept"""
+        with self.settings(PROFILER_ENABLED=True, PROFILER_DIR=self.dumps, PROFILER_SAMPLE_RATE=1,
+                           PROFILER_MAX_DUMPS=2):
+            self._run(0.05)
+            first, = self.dumps.glob('*.folded')
+            self._run(0.05)
+            self._run(0.05)
+        self.assertEqual(len(list(self.dumps.glob('*.folded'))), 2)
+        self.assertEqual(len(list(self.dumps.glob('*.sql'))), 2)
+        self.assertFalse(first.exists())
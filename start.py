@@ -27,26 +27,19 @@ if __name__ == "__main__":
             capture_output=True, text=True)
         if result.stdout: print(result.stdout)
 
-    print("\nCreating course content...")
-    subprocess.run(["python", "manage.py", "create_snt_content", "--clean"], capture_output=True, text=True)
-
-    print("\nPopulating Python content...")
-    subprocess.run(["python", "manage.py", "populate_python_content"], capture_output=True, text=True)
-    print("\nInitializing gamification...")
-    subprocess.run(["python", "manage.py", "init_gamification"], capture_output=True, text=True)
-
-    snt_commands = ["populate_snt_internet", "populate_snt_web", "populate_snt_donnees", "populate_snt_reseaux_sociaux", "populate_snt_photo", "populate_snt_localisation"]
-    for cmd in snt_commands:
-        print(f"\nPopulating {cmd}...")
-        subprocess.run(["python", "manage.py", cmd], capture_output=True, text=True)
-
-    nsi_commands = ["populate_nsi_python", "populate_nsi_algorithmique", "populate_nsi_representation", "populate_nsi_web", "populate_nsi_traitement_donnees", "populate_nsi_architecture", "populate_nsi_reseaux"]
-    for cmd in nsi_commands:
-        print(f"\nPopulating {cmd}...")
-        subprocess.run(["python", "manage.py", cmd], capture_output=True, text=True)
+    # All content commands run in one process and one transaction, and are
+    # skipped entirely when the content sources did not change
+    print("\nLoading course content...")
+    result = subprocess.run(["python", "manage.py", "load_content"])
+    if result.returncode != 0:
+        print("WARNING: content loading failed, the previous content is kept")
 
     run_command("python manage.py collectstatic --noinput --clear")
 
+    if os.environ.get('REWARDS_ASYNC') == 'True':
+        print("\nStarting reward worker...")
+        subprocess.Popen(["python", "manage.py", "process_rewards"])
+
     port = os.environ.get('PORT', '8000')
     workers = int(os.environ.get('WEB_CONCURRENCY', '4'))  # 2*CPU+1 recommandé
     threads = int(os.environ.get('GUNICORN_THREADS', '2'))
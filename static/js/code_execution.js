@@ -217,37 +217,151 @@ async function runSQLTests(userQuery, tests) {
     }
 }
 
+// POST that can safely be retried: every try carries the same Idempotency-Key,
+// so the server replays its first response instead of recording twice
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return Date.now().toString(36) + Math.random().toString(36).slice(2);
+}
+
+async function postIdempotent(url, options = {}, retries = 2) {
+    const key = newIdempotencyKey();
+    for (let i = 0; ; i++) {
+        try {
+            return await fetch(url, {
+                ...options,
+                method: 'POST',
+                headers: { ...(options.headers || {}), 'Idempotency-Key': key }
+            });
+        } catch (error) {
+            // Network failure: the request may or may not have reached the server
+            if (i >= retries) {
+                throw error;
+            }
+            await new Promise(resolve => setTimeout(resolve, 500 * (i + 1)));
+        }
+    }
+}
+
 // Exercise submission
 async function submitExercise(exerciseId, exerciseType, code, testsPassed, score) {
+    const attempt = {
+        exercise_id: exerciseId,
+        passed: testsPassed,
+        score: score,
+        attempt_data: {
+            code: code,
+            type: exerciseType,
+            timestamp: new Date().toISOString()
+        }
+    };
     try {
-        const response = await fetch(`/exercises/${exerciseId}/submit/`, {
-            method: 'POST',
+        const response = await postIdempotent(`/exercises/${exerciseId}/submit/`, {
             headers: {
                 'Content-Type': 'application/json',
                 'X-CSRFToken': getCookie('csrftoken')
             },
-            body: JSON.stringify({
-                passed: testsPassed,
-                score: score,
-                attempt_data: {
-                    code: code,
-                    type: exerciseType,
-                    timestamp: new Date().toISOString()
-                }
-            })
+            body: JSON.stringify(attempt)
         });
         
         const data = await response.json();
         return data;
     } catch (error) {
+        // Offline: keep the attempt and send it with the next batch
         console.error("Error submitting exercise:", error);
+        queueAttempt(attempt);
         return {
             success: false,
+            queued: true,
             error: error.message
         };
     }
 }
 
+// Offline queue of attempts, flushed in one request to the batch endpoint
+const PENDING_ATTEMPTS_KEY = 'nsiPendingAttempts';
+const PENDING_FLUSH_KEY = 'nsiPendingFlush';
+const MAX_BATCH_SIZE = 100;
+
+function loadPendingAttempts() {
+    try {
+        return JSON.parse(localStorage.getItem(PENDING_ATTEMPTS_KEY)) || [];
+    } catch (error) {
+        return [];
+    }
+}
+
+function savePendingAttempts(attempts) {
+    localStorage.setItem(PENDING_ATTEMPTS_KEY, JSON.stringify(attempts));
+}
+
+function queueAttempt(attempt) {
+    const attempts = loadPendingAttempts();
+    attempts.push(attempt);
+    savePendingAttempts(attempts);
+}
+
+async function flushPendingAttempts() {
+    const attempts = loadPendingAttempts();
+    if (attempts.length === 0 || !navigator.onLine) {
+        return null;
+    }
+    // The same key is reused until the batch is acknowledged, so a lost
+    // response is replayed by the server instead of recorded twice
+    let flush = JSON.parse(localStorage.getItem(PENDING_FLUSH_KEY) || 'null');
+    if (!flush) {
+        flush = { key: newIdempotencyKey(), count: Math.min(attempts.length, MAX_BATCH_SIZE) };
+        localStorage.setItem(PENDING_FLUSH_KEY, JSON.stringify(flush));
+    }
+    try {
+        const response = await fetch('/exercises/submit/batch/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken'),
+                'Idempotency-Key': flush.key
+            },
+            body: JSON.stringify({ attempts: attempts.slice(0, flush.count) })
+        });
+        if (response.status >= 500) {
+            return null;
+        }
+        const data = await response.json();
+        // Accepted or rejected as invalid, these attempts leave the queue
+        savePendingAttempts(loadPendingAttempts().slice(flush.count));
+        localStorage.removeItem(PENDING_FLUSH_KEY);
+        return data;
+    } catch (error) {
+        console.error("Error flushing pending attempts:", error);
+        return null;
+    }
+}
+
+window.addEventListener('online', flushPendingAttempts);
+document.addEventListener('DOMContentLoaded', flushPendingAttempts);
+
+// Rewards are evaluated in the background when the server returns a rewards_url
+async function waitForRewards(submitResult, maxPolls = 20, interval = 1000) {
+    if (!submitResult.rewards_url) {
+        return submitResult;
+    }
+    for (let i = 0; i < maxPolls; i++) {
+        await new Promise(resolve => setTimeout(resolve, interval));
+        try {
+            const response = await fetch(submitResult.rewards_url);
+            const data = await response.json();
+            if (data.done) {
+                return data;
+            }
+        } catch (error) {
+            console.error("Error fetching rewards:", error);
+        }
+    }
+    return { badges_awarded: [], achievements_awarded: [] };
+}
+
 // Utility function to get CSRF token
 function getCookie(name) {
     let cookieValue = null;
@@ -270,4 +384,7 @@ window.runPythonTests = runPythonTests;
 window.initDatabase = initDatabase;
 window.runSQLQuery = runSQLQuery;
 window.runSQLTests = runSQLTests;
+window.postIdempotent = postIdempotent;
 window.submitExercise = submitExercise;
+window.flushPendingAttempts = flushPendingAttempts;
+window.waitForRewards = waitForRewards;